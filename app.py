@@ -1,42 +1,362 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+
 import dash
+import flask
 import dash_bootstrap_components as dbc
 import pandas as pd
 import numpy as np
 import regex as re
 import plotly.graph_objects as go
-from dash import Input, Output, State, html, dcc
-from dash.exceptions import PreventUpdate
+import plotly.io as pio
+from dash import ClientsideFunction, Input, Output, State, html, dcc, dash_table
+from dash.exceptions import MissingCallbackContextException, PreventUpdate
+
+from data_source import PandasSource, SQLSource, id_column
+from dataset_registry import Dataset, DatasetRegistry
+from figure_patch import figure_patch
+from memory_profiling import MemoryProfiler, deep_size, read_rss
+from quantile_sketch import box_stats_frame, freedman_diaconis_width, merge_sketches, merged_sketch, sketch_groups
+from sampling import SampleSource, StratifiedReservoir
+from segments import SegmentMiner, segment_categories
+from churn_model import ChurnModel, FeatureEncoder
+from snapshot_diff import SnapshotDiff
+from survival import survival_curves
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Data Loading Section
 
-df = pd.read_csv('Telco-Customer-Churn.csv')
-df.columns = [' '.join(re.findall('[a-zA-Z][A-Z]{1}|[a-zA-Z][^A-Z]+', x[0].upper() + x[1:])) for x in df.columns]
-senior_citizen_map = {0: 'No', 1: 'Yes'}
-df['Senior Citizen'] = df['Senior Citizen'].map(senior_citizen_map)
-df.loc[df['Total Charges'] == ' ', 'Total Charges'] = 0.0
-df['Total Charges'] = df['Total Charges'].astype('float')
+data_file = os.environ.get('DATA_FILE', 'Telco-Customer-Churn.csv')
+background_loading = os.environ.get('BACKGROUND_LOADING', 'false').lower() in ('1', 'true', 'yes')
+data_backend = os.environ.get('DATA_BACKEND', 'pandas').lower()
+aggregated_figures = os.environ.get('AGGREGATED_FIGURES', 'false').lower() in ('1', 'true', 'yes')
+data_db = os.environ.get('DATA_DB', os.path.splitext(data_file)[0] + ('.duckdb' if data_backend == 'duckdb' else '.sqlite'))
+sql_pool_size = int(os.environ.get('SQL_POOL_SIZE', '4'))
+sql_chunk_size = int(os.environ.get('SQL_CHUNK_SIZE', '100000'))
+scatter_limit = int(os.environ.get('SCATTER_LIMIT', '50000'))
+histogram_bins = int(os.environ.get('HISTOGRAM_BINS', '40'))
+sketch_k = int(os.environ.get('SKETCH_K', '200'))
+exact_quantiles = os.environ.get('EXACT_QUANTILES', 'false').lower() in ('1', 'true', 'yes')
+approximate_sample_size = os.environ.get('APPROXIMATE_SAMPLE_SIZE', 'auto').lower()
+data_reload_interval = float(os.environ.get('DATA_RELOAD_INTERVAL', '0'))
+data_dir = os.environ.get('DATA_DIR', os.path.dirname(data_file) or '.')
+dataset_memory_budget = int(float(os.environ.get('DATASET_MEMORY_BUDGET', '2048')) * 1024 * 1024)
+segment_min_support = float(os.environ.get('SEGMENT_MIN_SUPPORT', '0.01'))
+segment_max_order = int(os.environ.get('SEGMENT_MAX_ORDER', '3'))
+segment_top_k = int(os.environ.get('SEGMENT_TOP_K', '10'))
+segment_cache_size = int(os.environ.get('SEGMENT_CACHE_SIZE', '8'))
+
+record_page_size = int(os.environ.get('RECORD_PAGE_SIZE', '10'))
+customer_search_limit = int(os.environ.get('CUSTOMER_SEARCH_LIMIT', '20'))
+
+data_type = ['Categorical', 'Numerical', 'Categorical Vs Numerical', 'Numerical Vs Numerical', 'Tenure Survival',
+             'Snapshot Comparison', 'Churn Segments', 'Customer Records']
+
+data_ready = threading.Event()
+data_error = None
+logger = logging.getLogger(__name__)
+
+df = None
+all_var = []
+cat_var = []
+num_var = []
+all_options_num = {}
+churn_table = None
+churned_cust = None
+total_cust = None
+churn_rate = None
+data_version = None
+data_mtime = None
+data_source = None
+data_listeners = []
+
+default_dataset_name = os.path.splitext(os.path.basename(data_file))[0]
+default_dataset = None
+
+
+def file_hash(path):
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()[:16]
+
+
+def prepare_data(data):
+    data.columns = [' '.join(re.findall('[a-zA-Z][A-Z]{1}|[a-zA-Z][^A-Z]+', x[0].upper() + x[1:]))
+                    for x in data.columns]
+    senior_citizen_map = {0: 'No', 1: 'Yes'}
+    data['Senior Citizen'] = data['Senior Citizen'].map(senior_citizen_map)
+    data.loc[data['Total Charges'] == ' ', 'Total Charges'] = 0.0
+    data['Total Charges'] = data['Total Charges'].astype('float')
+
+    cat_columns, num_columns = split_columns(data)
+    for i in cat_columns:
+        data[i] = data[i].apply(lambda x: x.title() if x.isupper == False else x)
+    return data
+
+
+def split_columns(data):
+    columns = list(data.columns)
+    cat_columns = [x for x in columns if ((data[x].dtype == 'object') and x not in ('Customer ID', 'Churn'))]
+    num_columns = [x for x in columns if data[x].dtype != 'object']
+    return cat_columns, num_columns
+
+
+def dataset_db(path):
+    if path == data_file:
+        return data_db
+    else:
+        return os.path.splitext(path)[0] + ('.duckdb' if data_backend == 'duckdb' else '.sqlite')
+
+
+def read_dataset(name, path):
+    mtime = os.path.getmtime(path)
+    version = file_hash(path)
+    if data_backend == 'pandas':
+        data = prepare_data(pd.read_csv(path))
+        source = PandasSource(data, aggregated_figures)
+        sample = data
+    else:
+        data = None
+        source = SQLSource(dataset_db(path), data_backend, sql_pool_size)
+        if source.stored_version() != version:
+            source.ingest((prepare_data(x) for x in pd.read_csv(path, chunksize=sql_chunk_size)), version)
+        source.create_index()
+        sample = source.schema()
+
+    cat_columns, num_columns = split_columns(sample)
+    return Dataset(name, path, version, mtime, data, source, list(sample.columns), cat_columns, num_columns,
+                   source.churn_counts())
+
+
+def load_data():
+    global df, all_var, cat_var, num_var, all_options_num, churn_table, churned_cust, total_cust, churn_rate, \
+        data_version, data_mtime, data_source, data_error, default_dataset
+    start = time.perf_counter()
+    try:
+        loaded = read_dataset(default_dataset_name, data_file)
+    except Exception as e:
+        data_error = '{}: {}'.format(type(e).__name__, e)
+        raise
+
+    dataset_registry.put(loaded, pinned=True, load_seconds=time.perf_counter() - start)
+    default_dataset = loaded
+    df = loaded.df
+    data_source = loaded.source
+    all_var = loaded.all_var
+    cat_var = loaded.cat_var
+    num_var = loaded.num_var
+    all_options_num = loaded.all_options_num
+    churn_table = loaded.churn_table
+    churned_cust = loaded.churned_cust
+    total_cust = loaded.total_cust
+    churn_rate = loaded.churn_rate
+    data_version = loaded.version
+    data_mtime = loaded.mtime
+    data_error = None
+    data_ready.set()
+    for listener in data_listeners:
+        listener()
+
+
+def watch_data():
+    while True:
+        time.sleep(data_reload_interval)
+        try:
+            if (os.path.getmtime(data_file) != data_mtime) and (file_hash(data_file) != data_version):
+                load_data()
+        except Exception:
+            logger.exception('Data reload failed')
+
+
+def evict_aggregates(evicted, replaced=False):
+    versions = (evicted.version, sample_version(evicted.version))
+    with aggregate_cache_lock:
+        # the snapshot comparisons are cached under the current dataset, and dropped with either of the two
+        for x in [x for x in aggregate_cache if (x[0] in versions) or (x[1][:2] == ('diff', evicted.version))]:
+            del aggregate_cache[x]
+    with sample_lock:
+        sample_datasets.pop(evicted.version, None)
+    with segment_lock:
+        for x in [x for x in segment_datasets if x[0] in versions]:
+            del segment_datasets[x]
+    # the figures are cached per dataset name, the selected dataset being the last value of a figure request. The
+    # figures of a replaced version stay the bases of the patches to the new one, only its cached responses go.
+    with response_cache_lock:
+        if replaced:
+            stale = [x for x in response_cache if x[0] == evicted.version]
+        else:
+            stale = [x for x, y in response_cache.items() if y.get('dataset') == evicted.name]
+        for x in stale:
+            del response_cache[x]
+    if replaced:
+        return
+    with figure_store_lock:
+        for x in [x for x in figure_store if json.loads(x)[1][-1:] == [evicted.name]]:
+            del figure_store[x]
+
+
+def get_dataset(name=None):
+    return dataset_registry.get(name or default_dataset_name)
+
+
+dataset_paths = {os.path.splitext(x)[0]: os.path.join(data_dir, x) for x in sorted(os.listdir(data_dir))
+                 if x.lower().endswith('.csv')}
+dataset_paths[default_dataset_name] = data_file
+dataset_registry = DatasetRegistry(dataset_paths, read_dataset, dataset_memory_budget,
+                                   on_evict=evict_aggregates)
+
+aggregate_cache = {}
+aggregate_cache_lock = threading.Lock()
+
+sample_datasets = {}
+sample_lock = threading.Lock()
+sample_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sample')
+
+segment_datasets = OrderedDict()
+segment_lock = threading.Lock()
+
+if background_loading:
+    threading.Thread(target=load_data, name='data-loader', daemon=True).start()
+else:
+    load_data()
+
+if data_reload_interval > 0:
+    threading.Thread(target=watch_data, name='data-watcher', daemon=True).start()
+
+
+# Figure Serialization
+
+figure_graphs = ['cat-main-body', 'no', 'yes', 'num-main-body', 'catnum-main-body', 'num2-main-body',
+                 'survival-main-body', 'diff-main-body', 'segments-main-body']
+client_cache_size = int(os.environ.get('CLIENT_CACHE_SIZE', '16'))
+version_poll_interval = float(os.environ.get('VERSION_POLL_INTERVAL', '30'))
+
+# the browser sends the key of a figure it has with every request, and the figure is sent as the changes from that
+# figure when they are smaller than FIGURE_PATCH_RATIO of the whole figure, e.g. the same layout with other counts
+figure_patches = os.environ.get('FIGURE_PATCHES', 'true').lower() in ('1', 'true', 'yes')
+figure_store_size = int(os.environ.get('FIGURE_PATCH_CACHE', '32'))
+figure_patch_ratio = float(os.environ.get('FIGURE_PATCH_RATIO', '0.9'))
+
+fast_serialization = os.environ.get('FAST_SERIALIZATION', 'true').lower() in ('1', 'true', 'yes')
+
+if fast_serialization and orjson is not None:
+    pio.json.config.default_engine = 'orjson'
+
+
+figure_template = None
+
+
+def merge_dict(target, source):
+    for k, v in source.items():
+        if isinstance(v, dict) and isinstance(target.get(k), dict):
+            merge_dict(target[k], v)
+        elif isinstance(v, dict):
+            target[k] = merge_dict({}, v)
+        else:
+            target[k] = v
+    return target
+
+
+def encode_array(value):
+    if isinstance(value, (pd.Series, pd.Index)):
+        value = value.to_numpy()
+    if isinstance(value, np.ndarray):
+        if value.dtype.kind in ('b', 'i', 'u', 'f'):
+            return np.ascontiguousarray(value)
+        else:
+            return value.tolist()
+    return value
+
+
+class TrustedFigure(dict):
+    # Plain-dict figure for internally built figures: skips Plotly property validation and keeps
+    # numeric arrays as numpy buffers, so orjson can encode the callback response without cleaning.
+
+    def __init__(self):
+        global figure_template
+        if figure_template is None:
+            figure_template = pio.templates[pio.templates.default].to_plotly_json()
+        super().__init__(data=[], layout={'template': figure_template})
 
-all_var = list(df.columns)
-cat_var = [x for x in all_var if ((df[x].dtype == 'object') and x not in ('Customer ID', 'Churn'))]
-num_var = [x for x in all_var if df[x].dtype != 'object']
+    def add_trace(self, trace):
+        self['data'].append(trace)
+        return self
 
-for i in cat_var:
-    df[i] = df[i].apply(lambda x: x.title() if x.isupper == False else x)
+    def update_traces(self, **kwargs):
+        for trace in self['data']:
+            merge_dict(trace, kwargs)
+        return self
 
-data_type = ['Categorical', 'Numerical', 'Categorical Vs Numerical', 'Numerical Vs Numerical']
+    def update_layout(self, **kwargs):
+        merge_dict(self['layout'], kwargs)
+        return self
 
-all_options_num = {x: [y for y in num_var if y != x] for x in num_var}
 
-churn_table = pd.DataFrame(df.groupby('Churn')['Churn'].count())
-churn_table = churn_table.rename(columns={'Churn': 'Count'}).reset_index()
+def new_figure():
+    if fast_serialization:
+        return TrustedFigure()
+    else:
+        return go.Figure()
+
 
-churned_cust = churn_table.loc[churn_table['Churn'] == 'Yes', 'Count'].values[0]
-total_cust = churned_cust + churn_table.loc[churn_table['Churn'] == 'No', 'Count'].values[0]
-churn_rate = (churned_cust / total_cust) * 100
+def new_trace(trace_type, **kwargs):
+    if fast_serialization:
+        trace = {k: encode_array(v) for k, v in kwargs.items()}
+        trace['type'] = trace_type.__name__.lower()
+        return trace
+    else:
+        return trace_type(**kwargs)
 
 
 # Helper Functions
 
+def loading_figure():
+    fig = go.Figure()
+    fig.add_annotation(
+        text='Loading data...',
+        showarrow=False,
+        font=dict(
+            family='Arial',
+            size=13,
+            color='black'
+        )
+    )
+    fig.update_layout(
+        xaxis=dict(visible=False),
+        yaxis=dict(visible=False),
+        margin=dict(l=0, r=0, t=0, b=0),
+        plot_bgcolor='rgba(0, 0, 0, 0)',
+        paper_bgcolor='rgba(0, 0, 0, 0)'
+    )
+    return fig
+
+
+def triggered(prop_id):
+    try:
+        return any(x['prop_id'] == prop_id for x in dash.callback_context.triggered)
+    except MissingCallbackContextException:
+        # e.g. the callback tables of the static site, which call the callbacks directly
+        return False
+
+
 def indicator_graph(value, range):
     fig = go.Figure(
         go.Indicator(
@@ -59,25 +379,278 @@ def indicator_graph(value, range):
     return fig
 
 
-def bar_graph_ver(column_name):
-    fig = go.Figure()
+def histogram_bins_range(sketch):
+    # Freedman-Diaconis bin width from the quartiles of the sketch, with at most histogram_bins bins
+    if sketch.n == 0:
+        return 0.0, 1.0
+    lo, hi = sketch.min, sketch.max
+    raw_size = max(freedman_diaconis_width(sketch), (hi - lo) / histogram_bins) if hi > lo else 1.0
+    magnitude = 10 ** np.floor(np.log10(raw_size))
+    size = next(x * magnitude for x in (1, 2, 2.5, 5, 10) if x * magnitude >= raw_size)
+    return float(np.floor(lo / size) * size), float(size)
+
+
+def cached_aggregate(key, compute, dataset=None):
+    # the aggregates are cached per dataset version, they are dropped when their dataset is evicted or reloaded
+    version = (dataset or get_dataset()).version
+    with aggregate_cache_lock:
+        value = aggregate_cache.get((version, key))
+    if value is None:
+        value = compute()
+        with aggregate_cache_lock:
+            aggregate_cache[(version, key)] = value
+    return value
+
+
+def get_survival_curves(segment, dataset=None):
+    dataset = dataset or get_dataset()
+    return cached_aggregate(('survival', segment),
+                            lambda: survival_curves(dataset.source.survival_counts(segment), segment), dataset)
+
+
+def get_sketches(num_column, cat_column=None, dataset=None):
+    # the quantile sketches per churn class (and category), built chunk by chunk and merged
+    dataset = dataset or get_dataset()
+    group_columns = ['Churn'] + ([cat_column] if cat_column is not None else [])
+
+    def compute():
+        sketches = {}
+        for chunk in dataset.source.column_chunks(group_columns + [num_column], sql_chunk_size):
+            merge_sketches(sketches, sketch_groups(chunk, num_column, group_columns, sketch_k))
+        return sketches
+
+    return cached_aggregate(('sketch', num_column, cat_column), compute, dataset)
+
+
+def column_sketch(num_column, dataset=None):
+    return merged_sketch(get_sketches(num_column, dataset=dataset).values(), sketch_k)
+
+
+def get_box_stats(cat_column, num_column, dataset=None):
+    dataset = dataset or get_dataset()
+    if exact_quantiles:
+        return dataset.source.box_stats(cat_column, num_column)
+    else:
+        return box_stats_frame(get_sketches(num_column, cat_column, dataset), cat_column)
+
+
+def sample_version(version):
+    return '{}~sample'.format(version)
+
+
+def sample_size(dataset):
+    # by default a tenth of the largest churn class, at least 1,000 and at most 20,000 customers per class, so that
+    # the mode also samples the smaller files
+    if approximate_sample_size == 'auto':
+        return min(20000, max(1000, int(dataset.churn_table['Count'].max()) // 10))
+    else:
+        return int(approximate_sample_size)
+
+
+def build_sample(dataset):
+    reservoir = StratifiedReservoir('Churn', sample_size(dataset))
+    for chunk in dataset.source.column_chunks(dataset.all_var, sql_chunk_size):
+        reservoir.update(chunk)
+    source = SampleSource(reservoir)
+    return Dataset(dataset.name, dataset.path, sample_version(dataset.version), dataset.mtime, source.df, source,
+                   dataset.all_var, dataset.cat_var, dataset.num_var, source.churn_counts())
+
+
+def get_sample_dataset(dataset):
+    # the stratified sample is built once per dataset version in the background, the figures are exact until it
+    # is ready, and when every churn class fits in the sample
+    size = sample_size(dataset)
+    if (size <= 0) or (dataset.churn_table['Count'].max() <= size):
+        return None
+    with sample_lock:
+        future = sample_datasets.get(dataset.version)
+        if future is None:
+            future = sample_datasets[dataset.version] = sample_executor.submit(build_sample, dataset)
+    if (not future.done()) or (future.exception() is not None):
+        return None
+    return future.result()
+
+
+def segment_dataset(dataset, segment, shown=None):
+    # the customers of a churn segment opened from the segments view, on its values of the variables other than the
+    # shown one, so that the shown variable keeps all its values. A segment of the sample is scaled like the sample.
+    filters = [(x, 'eq', y) for x, y in segment or [] if x != shown]
+    if not filters:
+        return dataset
+    key = (dataset.version, json.dumps(filters))
+    with segment_lock:
+        subset = segment_datasets.get(key)
+        if subset is not None:
+            segment_datasets.move_to_end(key)
+            return subset
+    source = dataset.source.subset(filters)
+    churn_table = source.churn_counts().set_index('Churn').reindex(['No', 'Yes'], fill_value=0).reset_index()
+    subset = Dataset(dataset.name, dataset.path, '{}~{}'.format(*key), dataset.mtime, source.df, source,
+                     dataset.all_var, dataset.cat_var, dataset.num_var, churn_table)
+    with segment_lock:
+        segment_datasets[key] = subset
+        while len(segment_datasets) > segment_cache_size:
+            segment_datasets.popitem(last=False)
+    return subset
+
+
+def segment_conditions(segment, shown=None):
+    return ' \u00d7 '.join('{} = {}'.format(x, y) for x, y in segment or [] if x != shown)
+
+
+def count_error_bars(counts, axis):
+    # the confidence intervals of the counts estimated from the sample of the approximate mode
+    if 'Lower' not in counts:
+        return {}
+    return {'error_{}'.format(axis): dict(
+        type='data',
+        symmetric=False,
+        array=counts['Upper'] - counts['Count'],
+        arrayminus=counts['Count'] - counts['Lower'],
+        color='black',
+        thickness=1,
+        width=3
+    )}
+
+
+def approximate_badge(fig, dataset):
+    annotation = dict(
+        text='\u2248 Approximate: {:,} sampled customers, 95% intervals, refining...'.format(len(dataset.df)),
+        xref='paper',
+        yref='paper',
+        x=1,
+        y=1,
+        xanchor='right',
+        yanchor='top',
+        showarrow=False,
+        bgcolor='rgba(255, 255, 255, 0.8)',
+        font=dict(
+            family='Arial',
+            size=10,
+            color='dimgray'
+        )
+    )
+    if isinstance(fig, go.Figure):
+        fig.add_annotation(annotation)
+    else:
+        fig.update_layout(annotations=list(fig['layout'].get('annotations', [])) + [annotation])
+    return fig
+
+
+def comparable_cat_var(dataset, baseline):
+    # the categorical variables of both snapshots, the only ones which the comparison loads
+    return [x for x in dataset.cat_var if x in baseline.cat_var]
+
+
+def get_snapshot_diff(baseline_name, dataset_name=None):
+    dataset = get_dataset(dataset_name)
+    baseline = get_dataset(baseline_name)
+
+    def compute():
+        columns = [id_column, 'Churn'] + comparable_cat_var(dataset, baseline)
+        return SnapshotDiff(baseline.source.frame(columns), dataset.source.frame(columns))
+
+    return cached_aggregate(('diff', baseline.version), compute, dataset)
+
+
+def segment_support(dataset):
+    # SEGMENT_MIN_SUPPORT is a share of the customers of the dataset
+    return max(int(np.ceil(segment_min_support * dataset.total_cust)), 1)
+
+
+def get_segments(dataset=None):
+    # the high-churn segments of up to SEGMENT_MAX_ORDER categorical values, counted chunk by chunk
+    dataset = dataset or get_dataset()
+
+    def compute():
+        miner = SegmentMiner(segment_categories(dataset.source, dataset.cat_var), segment_support(dataset),
+                             segment_max_order)
+        for chunk in dataset.source.column_chunks(dataset.cat_var + ['Churn'], sql_chunk_size):
+            miner.update(chunk)
+        return miner.mine().segments()
+
+    return cached_aggregate(('segments',), compute, dataset)
+
+
+# the operators of the filter queries of the record table, the longer ones first
+filter_operators = [['ge ', '>='], ['le ', '<='], ['lt ', '<'], ['gt ', '>'], ['ne ', '!='], ['eq ', '='],
+                    ['contains '], ['datestartswith ']]
+
+
+def split_filter_part(filter_part, dataset):
+    # the column name first, it may contain the letters of an operator, e.g. {Multiple Lines} le 2
+    name = filter_part[filter_part.find('{') + 1:filter_part.find('}')]
+    condition = filter_part[filter_part.find('}') + 1:].strip()
+    operators = [x for operator_type in filter_operators for x in operator_type]
+    if (condition[:1] in ('s', 'i')) and any(condition[1:].startswith(x) for x in operators):
+        # the case sensitivity prefix of the operators of the native filter row
+        condition = condition[1:]
+    for operator_type in filter_operators:
+        for operator in operator_type:
+            if condition.startswith(operator):
+                value_part = condition[len(operator):].strip()
+                if (name not in dataset.all_var) or (not value_part):
+                    return None
+                if (len(value_part) > 1) and (value_part[0] == value_part[-1]) and (value_part[0] in ('"', "'", '`')):
+                    value = value_part[1:-1].replace('\\' + value_part[0], value_part[0])
+                else:
+                    value = value_part
+                if name in dataset.num_var:
+                    try:
+                        value = float(value)
+                    except ValueError:
+                        return None
+                return name, operator_type[0].strip(), value
+    return None
+
+
+def parse_filter_query(filter_query, dataset):
+    filters = [split_filter_part(x, dataset) for x in (filter_query or '').split(' && ')]
+    return [x for x in filters if x is not None]
+
+
+def bar_graph_ver(column_name, dataset=None):
+    dataset = dataset or get_dataset()
+    fig = new_figure()
     color_map = {'No': 'dodgerblue', 'Yes': 'darkorange'}
-    for i in df['Churn'].unique():
-        fig.add_trace(
-            go.Histogram(
-                histfunc='count',
-                x=df.loc[df['Churn'] == i][column_name],
-                marker=dict(
-                    color=color_map[i]
-                ),
-                name=i,
-                customdata=[column_name for i in df[column_name].unique()],
-                hovertemplate=
-                '<i style="color:white;"><b>%{customdata}:</b> %{x}</i><br>' +
-                '<i style="color:white;"><b>Count:</b> %{y}</i><br>' +
-                '<extra></extra>'
+    if dataset.source.aggregated:
+        counts = dataset.churn_table if column_name == 'Churn' else dataset.source.category_counts(column_name)
+        for i in dataset.source.churn_classes():
+            subset = counts.loc[counts['Churn'] == i]
+            fig.add_trace(
+                new_trace(
+                    go.Bar,
+                    x=subset[column_name],
+                    y=subset['Count'],
+                    marker=dict(
+                        color=color_map[i]
+                    ),
+                    name=i,
+                    customdata=[column_name for x in range(len(subset))],
+                    hovertemplate=
+                    '<i style="color:white;"><b>%{customdata}:</b> %{x}</i><br>' +
+                    '<i style="color:white;"><b>Count:</b> %{y}</i><br>' +
+                    '<extra></extra>'
+                )
+            )
+    else:
+        for i in dataset.df['Churn'].unique():
+            fig.add_trace(
+                new_trace(
+                    go.Histogram,
+                    histfunc='count',
+                    x=dataset.df.loc[dataset.df['Churn'] == i][column_name],
+                    marker=dict(
+                        color=color_map[i]
+                    ),
+                    name=i,
+                    customdata=[column_name for i in dataset.df[column_name].unique()],
+                    hovertemplate=
+                    '<i style="color:white;"><b>%{customdata}:</b> %{x}</i><br>' +
+                    '<i style="color:white;"><b>Count:</b> %{y}</i><br>' +
+                    '<extra></extra>'
+                )
             )
-        )
     fig.update_layout(
         xaxis=dict(
             showline=False,
@@ -120,6 +693,591 @@ app.title = 'Telco Customer Churn'
 
 app.config.suppress_callback_exceptions = True
 
+
+# Health Check Routes
+
+@app.server.route('/healthz')
+def healthz():
+    return flask.jsonify(status='ok')
+
+
+@app.server.route('/readyz')
+def readyz():
+    if data_ready.is_set():
+        return flask.jsonify(status='ready')
+    elif data_error is not None:
+        return flask.jsonify(status='error', error=data_error), 503
+    else:
+        return flask.jsonify(status='loading'), 503
+
+
+# Churn Risk Model
+
+model_training_rows = int(os.environ.get('MODEL_TRAINING_ROWS', '200000'))
+score_max_records = int(os.environ.get('SCORE_MAX_RECORDS', '100000'))
+
+churn_model = None
+# the retrains are serialized by their own lock, the scoring requests keep the current model until it is swapped
+training_lock = threading.Lock()
+scoring_lock = threading.Lock()
+scoring_stats = {'requests': 0, 'records': 0, 'seconds': 0.0, 'last_records_per_second': None}
+
+
+def train_churn_model():
+    global churn_model
+    with training_lock:
+        version = data_version
+        if (churn_model is not None) and (churn_model.version == version):
+            return
+        start = time.perf_counter()
+        frame = data_source.training_frame(model_training_rows)
+        model = ChurnModel(FeatureEncoder(cat_var, num_var)).fit(frame)
+        model.version = version
+        model.training_rows = len(frame)
+        model.training_seconds = time.perf_counter() - start
+        churn_model = model
+
+
+def schedule_model_training():
+    threading.Thread(target=train_churn_model, name='model-trainer', daemon=True).start()
+
+
+data_listeners.append(schedule_model_training)
+if data_ready.is_set():
+    schedule_model_training()
+
+
+@app.server.route('/api/score', methods=['POST'])
+def score():
+    model = churn_model
+    if model is None:
+        return flask.jsonify(error='The churn model is not trained yet'), 503
+    payload = flask.request.get_json(silent=True)
+    records = payload.get('records') if isinstance(payload, dict) else payload
+    if (not isinstance(records, list)) or (not all(isinstance(x, dict) for x in records)):
+        return flask.jsonify(error='Expected a JSON list of customer records'), 400
+    elif len(records) > score_max_records:
+        return flask.jsonify(error='At most {} records per request'.format(score_max_records)), 413
+
+    start = time.perf_counter()
+    frame = pd.DataFrame.from_records(records)
+    try:
+        scores = model.predict_proba(frame) if len(frame) else np.zeros(0)
+    except KeyError as e:
+        return flask.jsonify(error=e.args[0]), 400
+    elapsed = time.perf_counter() - start
+    records_per_second = (len(frame) / elapsed) if elapsed > 0 else None
+
+    with scoring_lock:
+        scoring_stats['requests'] += 1
+        scoring_stats['records'] += len(frame)
+        scoring_stats['seconds'] += elapsed
+        scoring_stats['last_records_per_second'] = records_per_second
+
+    result = dict(
+        model_version=model.version,
+        records=len(frame),
+        elapsed_ms=elapsed * 1000,
+        records_per_second=records_per_second,
+        scores=scores.round(6).tolist()
+    )
+    if 'Customer ID' in frame.columns:
+        result['customer_ids'] = frame['Customer ID'].tolist()
+    return flask.jsonify(result)
+
+
+@app.server.route('/api/model')
+def model_info():
+    model = churn_model
+    if model is None:
+        return flask.jsonify(error='The churn model is not trained yet'), 503
+    return flask.jsonify(
+        model_version=model.version,
+        training_rows=model.training_rows,
+        training_seconds=model.training_seconds,
+        iterations=model.iterations,
+        intercept=model.intercept,
+        top_features=model.top_features()
+    )
+
+
+# Aggregates API
+
+def aggregate_response(key, compute):
+    if not data_ready.is_set():
+        return flask.jsonify(error='The dataset is not loaded yet'), 503
+    etag = data_version
+    if flask.request.if_none_match.contains(etag):
+        response = flask.Response(status=304)
+    else:
+        response = flask.jsonify(cached_aggregate(key, compute))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+
+def frame_records(frame):
+    return frame.replace({np.nan: None}).to_dict('records')
+
+
+@app.server.route('/api/aggregates/variables')
+def aggregates_variables():
+    return aggregate_response(
+        ('api', 'variables'),
+        lambda: dict(categorical=cat_var, numerical=num_var, data_version=data_version)
+    )
+
+
+@app.server.route('/api/aggregates/churn')
+def aggregates_churn():
+    return aggregate_response(
+        ('api', 'churn'),
+        lambda: dict(churned=int(churned_cust), total=int(total_cust), churn_rate=float(churn_rate),
+                     counts=frame_records(churn_table))
+    )
+
+
+@app.server.route('/api/aggregates/counts/<variable>')
+def aggregates_counts(variable):
+    if variable not in cat_var:
+        return flask.jsonify(error='Unknown categorical variable: {}'.format(variable)), 404
+    return aggregate_response(
+        ('api', 'counts', variable),
+        lambda: dict(variable=variable, counts=frame_records(data_source.category_counts(variable)))
+    )
+
+
+@app.server.route('/api/aggregates/histogram/<variable>')
+def aggregates_histogram(variable):
+    if variable not in num_var:
+        return flask.jsonify(error='Unknown numerical variable: {}'.format(variable)), 404
+
+    def compute():
+        start, size = histogram_bins_range(column_sketch(variable))
+        return dict(variable=variable, bin_size=size, bins=frame_records(data_source.histogram(variable, start, size)))
+
+    return aggregate_response(('api', 'histogram', variable), compute)
+
+
+@app.server.route('/api/aggregates/box/<cat_variable>/<num_variable>')
+def aggregates_box(cat_variable, num_variable):
+    if (cat_variable not in cat_var) or (num_variable not in num_var):
+        return flask.jsonify(error='Unknown variables: {}, {}'.format(cat_variable, num_variable)), 404
+    return aggregate_response(
+        ('api', 'box', cat_variable, num_variable),
+        lambda: dict(categorical=cat_variable, numerical=num_variable,
+                     stats=frame_records(get_box_stats(cat_variable, num_variable)))
+    )
+
+
+@app.server.route('/api/aggregates/survival/<variable>')
+def aggregates_survival(variable):
+    if variable not in cat_var:
+        return flask.jsonify(error='Unknown categorical variable: {}'.format(variable)), 404
+    return aggregate_response(
+        ('api', 'survival', variable),
+        lambda: dict(variable=variable, curves=frame_records(get_survival_curves(variable)))
+    )
+
+
+@app.server.route('/api/aggregates/segments')
+def aggregates_segments():
+    try:
+        k = int(flask.request.args.get('k', segment_top_k))
+    except ValueError:
+        return flask.jsonify(error='k must be a positive number of segments'), 400
+    if k <= 0:
+        return flask.jsonify(error='k must be a positive number of segments'), 400
+    return aggregate_response(
+        ('api', 'segments', k),
+        lambda: dict(min_support=segment_support(get_dataset()), max_order=segment_max_order,
+                     segments=frame_records(get_segments().head(k)))
+    )
+
+
+@app.server.route('/api/diff/<baseline>/<current>')
+def snapshot_diff_route(baseline, current):
+    if not data_ready.is_set():
+        return flask.jsonify(error='The dataset is not loaded yet'), 503
+    elif (baseline not in dataset_registry.paths) or (current not in dataset_registry.paths):
+        return flask.jsonify(error='Unknown datasets: {}, {}'.format(baseline, current)), 404
+    segment = flask.request.args.get('segment')
+    limit = flask.request.args.get('limit', 1000, type=int)
+    snapshot_diff = get_snapshot_diff(baseline, current)
+    result = dict(
+        baseline=baseline,
+        current=current,
+        summary=snapshot_diff.summary,
+        newly_churned_ids=snapshot_diff.newly_churned_ids(limit)
+    )
+    if segment is not None:
+        if segment not in comparable_cat_var(get_dataset(current), get_dataset(baseline)):
+            return flask.jsonify(error='Unknown categorical variable: {}'.format(segment)), 404
+        result['segments'] = frame_records(snapshot_diff.segment_deltas(segment))
+    return flask.jsonify(result)
+
+
+@app.server.route('/api/customers')
+def customers_route():
+    if not data_ready.is_set():
+        return flask.jsonify(error='The dataset is not loaded yet'), 503
+    name = flask.request.args.get('dataset', default_dataset_name)
+    if name not in dataset_registry.paths:
+        return flask.jsonify(error='Unknown dataset: {}'.format(name)), 404
+    prefix = flask.request.args.get('prefix', '')
+    limit = flask.request.args.get('limit', customer_search_limit, type=int)
+    return flask.jsonify(dataset=name, prefix=prefix, customer_ids=get_dataset(name).source.customer_ids(prefix, limit))
+
+
+# Request Tracking
+
+active_requests = 0
+active_requests_lock = threading.Lock()
+figure_popularity = Counter()
+
+
+def is_warmup_request():
+    return flask.request.headers.get('X-Warmup') == '1'
+
+
+@app.server.before_request
+def track_request():
+    global active_requests
+    if is_warmup_request():
+        return None
+    with active_requests_lock:
+        active_requests += 1
+    flask.g.tracked_request = True
+    if flask.request.path == '/_dash-update-component':
+        payload = flask.request.get_json(silent=True)
+        if isinstance(payload, dict) and str(payload.get('output')).endswith('-server.data'):
+            request = (payload.get('inputs') or [{}])[0].get('value') or {}
+            values = json.dumps(request.get('values') or [], separators=(',', ':'))
+            with active_requests_lock:
+                figure_popularity[(payload['output'][:-len('-server.data')], values)] += 1
+
+
+@app.server.teardown_request
+def untrack_request(exception):
+    global active_requests
+    if flask.g.pop('tracked_request', False):
+        with active_requests_lock:
+            active_requests -= 1
+
+
+# Interaction Timings
+
+# the latest time-to-interactive measures of every layout mode and view, reported by the browser after each Apply
+interaction_samples = int(os.environ.get('INTERACTION_SAMPLES', '500'))
+interaction_counters = ('requests', 'hits', 'skipped', 'patches')
+
+interaction_timings = {}
+interaction_timings_lock = threading.Lock()
+
+
+@app.server.route('/api/timings', methods=['POST'])
+def record_timing():
+    # sent with navigator.sendBeacon, whose body has a text/plain content type
+    timing = flask.request.get_json(force=True, silent=True)
+    if (not isinstance(timing, dict)) or (timing.get('mode') not in ('persistent', 'replace')) or (
+            timing.get('view') not in data_type):
+        return flask.jsonify(error='expected the mode, view and tti_ms of an interaction'), 400
+    try:
+        tti = float(timing['tti_ms'])
+        counters = {x: int(timing.get(x, 0)) for x in interaction_counters}
+    except (KeyError, TypeError, ValueError):
+        return flask.jsonify(error='expected the mode, view and tti_ms of an interaction'), 400
+    if not (0 <= tti < 3600 * 1000):
+        return flask.jsonify(error='tti_ms is out of range'), 400
+    with interaction_timings_lock:
+        stats = interaction_timings.get((timing['mode'], timing['view']))
+        if stats is None:
+            stats = dict(count=0, samples=deque(maxlen=interaction_samples), **{x: 0 for x in interaction_counters})
+            interaction_timings[(timing['mode'], timing['view'])] = stats
+        stats['count'] += 1
+        stats['samples'].append(tti)
+        for name, value in counters.items():
+            stats[name] += value
+    return '', 204
+
+
+def interaction_report():
+    report = {}
+    with interaction_timings_lock:
+        items = [(x, dict(y, samples=np.array(y['samples']))) for x, y in interaction_timings.items()]
+    for (mode, view), stats in sorted(items):
+        samples = stats.pop('samples')
+        report.setdefault(mode, {})[view] = dict(
+            stats,
+            tti_ms_mean=float(samples.mean()),
+            tti_ms_p50=float(np.percentile(samples, 50)),
+            tti_ms_p95=float(np.percentile(samples, 95)),
+            tti_ms_max=float(samples.max())
+        )
+    return report
+
+
+# Response Compression
+
+gzip_level = int(os.environ.get('GZIP_LEVEL', '6'))
+brotli_quality = int(os.environ.get('BROTLI_QUALITY', '5'))
+compression_min_size = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+response_cache_size = int(os.environ.get('RESPONSE_CACHE_SIZE', '256'))
+
+compressed_paths = ('/_dash-layout', '/_dash-dependencies', '/_dash-update-component')
+cacheable_outputs = tuple('{}-server.data'.format(x) for x in figure_graphs)
+
+response_cache = OrderedDict()
+response_cache_lock = threading.Lock()
+compression_stats = {
+    'cache_hits': 0,
+    'cache_misses': 0,
+    'encodings': {x: {'responses': 0, 'raw_bytes': 0, 'sent_bytes': 0} for x in ('br', 'gzip', 'identity')}
+}
+
+
+def negotiate_encoding(accept_encoding):
+    accepted = {}
+    for item in accept_encoding.split(','):
+        parts = item.strip().split(';')
+        quality = 1.0
+        for param in parts[1:]:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if parts[0]:
+            accepted[parts[0].strip().lower()] = quality
+    if (brotli is not None) and (accepted.get('br', 0) > 0):
+        return 'br'
+    elif accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    else:
+        return 'identity'
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    elif encoding == 'gzip':
+        return gzip.compress(body, compresslevel=gzip_level)
+    else:
+        return body
+
+
+def response_cache_key():
+    payload = flask.request.get_json(silent=True)
+    if (not isinstance(payload, dict)) or (payload.get('output') not in cacheable_outputs):
+        return None
+    elif not data_ready.is_set():
+        return None
+    else:
+        # the whole figures are cached, whatever figure the browser names as the base of a patch
+        state = tuple((x['id'], x['property'], repr(without_base(x.get('value'))))
+                      for x in payload.get('inputs', []) + payload.get('state', []))
+        return data_version, payload['output'], state
+
+
+def request_dataset():
+    # the dataset of a figure request, the last of its values
+    payload = flask.request.get_json(silent=True)
+    request = (payload.get('inputs') or [{}])[0].get('value')
+    values = request.get('values') if isinstance(request, dict) else None
+    return values[-1] if values else None
+
+
+def request_encoding(size):
+    if size < compression_min_size:
+        return 'identity'
+    else:
+        return negotiate_encoding(flask.request.headers.get('Accept-Encoding', ''))
+
+
+def record_compression(encoding, raw_size, sent_size):
+    with response_cache_lock:
+        stats = compression_stats['encodings'][encoding]
+        stats['responses'] += 1
+        stats['raw_bytes'] += raw_size
+        stats['sent_bytes'] += sent_size
+
+
+def encoded_response(entry, encoding):
+    with response_cache_lock:
+        body = entry.get(encoding)
+    if body is None:
+        body = compress(entry['identity'], encoding)
+        with response_cache_lock:
+            entry[encoding] = body
+    response = flask.Response(body, mimetype='application/json')
+    if encoding != 'identity':
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    record_compression(encoding, len(entry['identity']), len(body))
+    return response
+
+
+@app.server.before_request
+def serve_cached_response():
+    if flask.request.path != '/_dash-update-component':
+        return None
+    key = response_cache_key()
+    if key is None:
+        return None
+    with response_cache_lock:
+        entry = response_cache.get(key)
+        if entry is not None:
+            response_cache.move_to_end(key)
+        if not is_warmup_request():
+            compression_stats['cache_hits' if entry is not None else 'cache_misses'] += 1
+    if entry is None:
+        flask.g.response_cache_key = key
+        return None
+    else:
+        flask.g.response_cached = True
+        patched = patched_response_body(entry['identity'])
+        if patched is not None:
+            return encoded_response({'identity': patched}, request_encoding(len(patched)))
+        return encoded_response(entry, request_encoding(len(entry['identity'])))
+
+
+@app.server.after_request
+def compress_response(response):
+    if ((flask.request.path not in compressed_paths) or flask.g.get('response_cached')
+            or (response.status_code != 200) or response.direct_passthrough
+            or ('Content-Encoding' in response.headers)):
+        return response
+    body = response.get_data()
+    entry = {'identity': body}
+    key = flask.g.get('response_cache_key')
+    if key is not None:
+        entry['dataset'] = request_dataset()
+        with response_cache_lock:
+            response_cache[key] = entry
+            response_cache.move_to_end(key)
+            while len(response_cache) > response_cache_size:
+                response_cache.popitem(last=False)
+    if flask.request.path == '/_dash-update-component':
+        patched = patched_response_body(body, flask.g.get('figure_reply'))
+        if patched is not None:
+            # the patch depends on the base figure of the browser, only the whole figure is cached
+            body = patched
+            entry = {'identity': body}
+            response.set_data(body)
+    encoding = request_encoding(len(body))
+    compressed = compress(body, encoding)
+    if encoding != 'identity':
+        entry[encoding] = compressed
+        response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    record_compression(encoding, len(body), len(compressed))
+    return response
+
+
+@app.server.route('/metrics')
+def metrics():
+    encodings = {}
+    for encoding, stats in compression_stats['encodings'].items():
+        ratio = (stats['raw_bytes'] / stats['sent_bytes']) if stats['sent_bytes'] else None
+        encodings[encoding] = dict(stats, compression_ratio=ratio)
+    return flask.jsonify(
+        response_cache=dict(
+            entries=len(response_cache),
+            max_entries=response_cache_size,
+            hits=compression_stats['cache_hits'],
+            misses=compression_stats['cache_misses']
+        ),
+        compression=dict(
+            gzip_level=gzip_level,
+            brotli_quality=brotli_quality if brotli is not None else None,
+            encodings=encodings
+        ),
+        datasets=dataset_registry.snapshot(),
+        warmup=dict(
+            warmup_stats,
+            active_requests=active_requests
+        ),
+        scoring=dict(
+            scoring_stats,
+            records_per_second=(scoring_stats['records'] / scoring_stats['seconds']) if scoring_stats['seconds'] else None
+        ),
+        interactions=dict(
+            mode='persistent' if persistent_views else 'replace',
+            views=interaction_report()
+        ),
+        figure_patches=patch_report()
+    )
+
+
+# Memory Profiling
+
+memory_profiling = os.environ.get('MEMORY_PROFILING', 'false').lower() in ('1', 'true', 'yes')
+memory_trace_frames = int(os.environ.get('MEMORY_TRACE_FRAMES', '25'))
+memory_snapshot_interval = float(os.environ.get('MEMORY_SNAPSHOT_INTERVAL', '0'))
+memory_snapshots = int(os.environ.get('MEMORY_SNAPSHOTS', '10'))
+
+memory_profiler = MemoryProfiler(memory_trace_frames, memory_snapshots)
+
+
+def memory_profiling_disabled():
+    return flask.jsonify(error='Memory profiling is disabled, it is enabled by MEMORY_PROFILING=true'), 404
+
+
+@app.server.route('/debug/memory')
+def memory_report():
+    if not memory_profiling:
+        return memory_profiling_disabled()
+    top = flask.request.args.get('top', 10, type=int)
+    since = flask.request.args.get('since', 0, type=int)
+    with aggregate_cache_lock:
+        aggregates = list(aggregate_cache.items())
+    with response_cache_lock:
+        responses = list(response_cache.values())
+    with figure_store_lock:
+        figures = list(figure_store.values())
+    aggregate_bytes = Counter()
+    for (version, key), value in aggregates:
+        aggregate_bytes[key[0] if isinstance(key, tuple) else key] += deep_size(value)
+    traced, peak = memory_profiler.traced_memory()
+    return flask.jsonify(
+        rss=read_rss(),
+        traced=traced,
+        traced_peak=peak,
+        datasets={x: dict(rows=len(y.df) if y.df is not None else None, memory_bytes=y.memory_bytes)
+                  for x, y in list(dataset_registry.datasets.items())},
+        aggregate_cache=dict(
+            entries=len(aggregates),
+            memory_bytes=sum(aggregate_bytes.values()),
+            kinds=dict(aggregate_bytes)
+        ),
+        response_cache=dict(
+            entries=len(responses),
+            memory_bytes=sum(len(y) for x in responses for y in x.values())
+        ),
+        figure_store=dict(
+            entries=len(figures),
+            memory_bytes=deep_size(figures)
+        ),
+        callbacks=memory_profiler.top_allocations(top),
+        snapshots=memory_profiler.snapshot_list(),
+        growth=memory_profiler.diff(since, -1, top)
+    )
+
+
+@app.server.route('/debug/memory/snapshot', methods=['POST'])
+def memory_snapshot():
+    if not memory_profiling:
+        return memory_profiling_disabled()
+    top = flask.request.args.get('top', 10, type=int)
+    memory_profiler.take_snapshot()
+    return flask.jsonify(
+        snapshots=memory_profiler.snapshot_list(),
+        growth=memory_profiler.diff(-2, -1, top)
+    )
+
+
 # Navbar
 
 navbar = dbc.Navbar([
@@ -184,7 +1342,8 @@ churn_dist_header = dbc.CardHeader(
 
 churn_rate_body = dbc.CardBody([
     dcc.Graph(
-        figure=indicator_graph(churn_rate, [0, 100]),
+        id='churn-rate-graph',
+        figure=loading_figure(),
         className='d-flex align-items-center justify-content-center',
         style={'height': '100%', 'width': '100%'}
     )
@@ -192,7 +1351,8 @@ churn_rate_body = dbc.CardBody([
 
 churn_dist_body = dbc.CardBody([
     dcc.Graph(
-        figure=bar_graph_ver('Churn'),
+        id='churn-dist-graph',
+        figure=loading_figure(),
         className='d-flex align-items-center justify-content-center',
         style={'height': '100%', 'width': '100%'}
     )
@@ -201,6 +1361,11 @@ churn_dist_body = dbc.CardBody([
 
 # Selector Section
 
+# the extract before the default one in name order, e.g. last month's extract
+default_baseline_name = dataset_registry.names()[max(dataset_registry.names().index(default_dataset_name) - 1, 0)]
+# a single dataset has no other snapshot to be compared with
+snapshot_comparison = len(dataset_registry.names()) > 1
+
 selector_header = dbc.CardHeader(
     'Selector',
     className='border-bottom border-secondary d-flex align-items-center justify-content-center',
@@ -208,12 +1373,41 @@ selector_header = dbc.CardHeader(
 )
 
 selector_body = dbc.CardBody([
+    dbc.Row([
+        dbc.Col([
+            html.Label('Select Dataset', style={'fontSize': '12px', 'fontWeight': 500, 'color': 'black'}),
+            dcc.Dropdown(
+                id='dataset',
+                options=[{'label': x, 'value': x} for x in dataset_registry.names()],
+                value=default_dataset_name,
+                multi=False,
+                clearable=False,
+                style={'width': '100%', 'fontSize': '11.5px', 'fontWeight': 500, 'color': 'black'}
+            )
+        ], width=12, className='vstack gap-0 d-flex align-items-start justify-content-center',
+            style={'height': '100%', 'textAlign': 'left'})
+    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '10.5%', 'width': '100%'}),
+    dbc.Row([
+        dbc.Col([
+            html.Label('Select Baseline Dataset', style={'fontSize': '12px', 'fontWeight': 500, 'color': 'black'}),
+            dcc.Dropdown(
+                id='baseline-dataset',
+                options=[{'label': x, 'value': x} for x in dataset_registry.names()],
+                value=default_baseline_name,
+                multi=False,
+                clearable=False,
+                style={'width': '100%', 'fontSize': '11.5px', 'fontWeight': 500, 'color': 'black'}
+            )
+        ], width=12, className='vstack gap-0 d-flex align-items-start justify-content-center',
+            style={'height': '100%', 'textAlign': 'left'})
+    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '10.5%', 'width': '100%'}),
     dbc.Row([
         dbc.Col([
             html.Label('Select Data Type', style={'fontSize': '12px', 'fontWeight': 500, 'color': 'black'}),
             dcc.Dropdown(
                 id='data-type',
-                options=[{'label': x, 'value': x} for x in data_type],
+                options=[{'label': x, 'value': x,
+                          'disabled': (x == 'Snapshot Comparison') and (not snapshot_comparison)} for x in data_type],
                 value=data_type[0],
                 multi=False,
                 clearable=False,
@@ -221,7 +1415,7 @@ selector_body = dbc.CardBody([
             )
         ], width=12, className='vstack gap-0 d-flex align-items-start justify-content-center',
             style={'height': '100%', 'textAlign': 'left'})
-    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '14%', 'width': '100%'}),
+    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '10.5%', 'width': '100%'}),
     dbc.Row([
         dbc.Col([
             html.Label('Select Variable', style={'fontSize': '12px', 'fontWeight': 500, 'color': 'black'}),
@@ -233,49 +1427,43 @@ selector_body = dbc.CardBody([
             )
         ], width=12, className='vstack gap-0 d-flex align-items-start justify-content-center',
             style={'height': '100%', 'textAlign': 'left'})
-    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '14%', 'width': '100%'}),
+    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '10.5%', 'width': '100%'}),
     dbc.Row([
         dbc.Col([
             html.Label('Select Categorical Variable', style={'fontSize': '12px', 'fontWeight': 500, 'color': 'black'}),
             dcc.Dropdown(
                 id='cat-var',
-                options=[{'label': x, 'value': x} for x in cat_var],
-                value=cat_var[0],
                 multi=False,
                 clearable=False,
                 style={'width': '100%', 'fontSize': '11.5px', 'fontWeight': 500, 'color': 'black'}
             )
         ], width=12, className='vstack gap-0 d-flex align-items-start justify-content-center',
             style={'height': '100%', 'textAlign': 'left'})
-    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '14%', 'width': '100%'}),
+    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '10.5%', 'width': '100%'}),
     dbc.Row([
         dbc.Col([
             html.Label('Select Numerical Variable', style={'fontSize': '12px', 'fontWeight': 500, 'color': 'black'}),
             dcc.Dropdown(
                 id='num-var',
-                options=[{'label': x, 'value': x} for x in num_var],
-                value=num_var[0],
                 multi=False,
                 clearable=False,
                 style={'width': '100%', 'fontSize': '11.5px', 'fontWeight': 500, 'color': 'black'}
             )
         ], width=12, className='vstack gap-0 d-flex align-items-start justify-content-center',
             style={'height': '100%', 'textAlign': 'left'})
-    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '14%', 'width': '100%'}),
+    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '10.5%', 'width': '100%'}),
     dbc.Row([
         dbc.Col([
             html.Label('Select X-Axis', style={'fontSize': '12px', 'fontWeight': 500, 'color': 'black'}),
             dcc.Dropdown(
                 id='x-axis',
-                options=list(all_options_num.keys()),
-                value=list(all_options_num.keys())[0],
                 multi=False,
                 clearable=False,
                 style={'width': '100%', 'fontSize': '11.5px', 'fontWeight': 500, 'color': 'black'}
             )
         ], width=12, className='vstack gap-0 d-flex align-items-start justify-content-center',
             style={'height': '100%', 'textAlign': 'left'})
-    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '14%', 'width': '100%'}),
+    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '10.5%', 'width': '100%'}),
     dbc.Row([
         dbc.Col([
             html.Label('Select Y-Axis', style={'fontSize': '12px', 'fontWeight': 500, 'color': 'black'}),
@@ -287,7 +1475,7 @@ selector_body = dbc.CardBody([
             )
         ], width=12, className='vstack gap-0 d-flex align-items-start justify-content-center',
             style={'height': '100%', 'textAlign': 'left'})
-    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '14%', 'width': '100%'}),
+    ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '10.5%', 'width': '100%'}),
     dbc.Row([
         dbc.Col([
             dbc.Button(
@@ -295,7 +1483,16 @@ selector_body = dbc.CardBody([
                 color='primary',
                 id="button"
             )
-        ], width=12, className='d-flex align-items-center justify-content-center',
+        ], width=6, className='d-flex align-items-center justify-content-center',
+            style={'height': '100%', 'textAlign': 'left'}),
+        dbc.Col([
+            dbc.Switch(
+                id='approximate',
+                label='Approximate',
+                value=False,
+                style={'fontSize': '12px', 'fontWeight': 500, 'color': 'black'}
+            )
+        ], width=6, className='d-flex align-items-center justify-content-center',
             style={'height': '100%', 'textAlign': 'left'}),
     ], className='m-0 p-0 d-flex align-items-center justify-content-end', style={'height': '16%', 'width': '100%'})
 ], className='vstack gap-0 p-0 d-flex align-items-end justify-content-center',
@@ -493,52 +1690,271 @@ num2 = dbc.Container([
     ], className='m-0 p-0')
 ], className='m-0 p-0', fluid=True)
 
-# App Layout
+# Tenure Survival Content
 
-app.layout = dbc.Container([
-    navbar,
-    dbc.Container([
-        dbc.Row([
-            dbc.Col([
-                dbc.Row([
-                    dbc.Col([
-                        dbc.Card([title_header, title_body], className='bg-secondary',
-                                 style={'height': '100%', 'width': '100%'})
-                    ], width=12, className='m-0',
-                        style={'height': '111px', 'paddingTop': '10px', 'paddingBottom': '5px', 'paddingLeft': '6px',
-                               'paddingRight': '6px'})
-                ], className='m-0 p-0'),
-                dbc.Row([
-                    dbc.Col([
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Card([churn_rate_header, churn_rate_body], className='bg-secondary',
-                                         style={'height': '100%', 'width': '100%'})
-                            ], width=12, className='m-0',
-                                style={'height': '250px', 'paddingTop': '5px', 'paddingBottom': '5px',
-                                       'paddingLeft': '5px', 'paddingRight': '6px'})
-                        ], className='m-0 p-0'),
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Card([churn_dist_header, churn_dist_body], className='bg-secondary',
-                                         style={'height': '100%', 'width': '100%'})
-                            ], width=12, className='m-0',
-                                style={'height': '250px', 'paddingTop': '5px', 'paddingBottom': '10px',
-                                       'paddingLeft': '5px', 'paddingRight': '6px'})
-                        ], className='m-0 p-0')
-                    ], width={'size': 12, 'order': 2}, sm={'size': 6, 'order': 2}, lg={'size': 3, 'order': 'first'},
-                        className='m-0 p-0'),
-                    dbc.Col(
-                        id='content',
-                        width={'size': 12, 'order': 'last'}, sm={'size': 12, 'order': 'last'},
-                        lg={'size': 6, 'order': 2},
-                        className='m-0 p-0'),
-                    dbc.Col([
-                        dbc.Row([
-                            dbc.Col([
-                                dbc.Card([selector_header, selector_body], className='bg-secondary',
-                                         style={'height': '100%', 'width': '100%'})
-                            ], width=12, className='m-0',
+survival_main_header = dbc.CardHeader(
+    id='survival-main-header',
+    className='border-bottom border-secondary d-flex align-items-center justify-content-center',
+    style={'height': '8.25%', 'textAlign': 'center', 'fontSize': '13px', 'fontWeight': 500, 'color': 'black'}
+)
+
+survival_main_body = dbc.CardBody([
+    dcc.Loading(
+        children=[
+            dcc.Graph(
+                id='survival-main-body',
+                className='d-flex align-items-center justify-content-center',
+                style={'height': '100%', 'width': '100%'}
+            )
+        ],
+        type='dot',
+        color='steelblue',
+        parent_style={'height': '100%', 'width': '100%'}
+    )
+], className='bg-opacity-10 d-flex align-items-center justify-content-center', style={'height': '91.75%'})
+
+survival = dbc.Container([
+    dbc.Row([
+        dbc.Col([
+            dbc.Card([survival_main_header, survival_main_body], className='bg-secondary',
+                     style={'height': '100%', 'width': '100%'})
+        ], width=12, className='m-0',
+            style={'height': '500px', 'paddingTop': '5px', 'paddingBottom': '10px', 'paddingLeft': '5px',
+                   'paddingRight': '5px'})
+    ], className='m-0 p-0')
+], className='m-0 p-0', fluid=True)
+
+# Snapshot Comparison Content
+
+diff_main_header = dbc.CardHeader(
+    id='diff-main-header',
+    className='border-bottom border-secondary d-flex align-items-center justify-content-center',
+    style={'height': '8.25%', 'textAlign': 'center', 'fontSize': '13px', 'fontWeight': 500, 'color': 'black'}
+)
+
+diff_main_body = dbc.CardBody([
+    dcc.Loading(
+        children=[
+            dcc.Graph(
+                id='diff-main-body',
+                className='d-flex align-items-center justify-content-center',
+                style={'height': '100%', 'width': '100%'}
+            )
+        ],
+        type='dot',
+        color='steelblue',
+        parent_style={'height': '100%', 'width': '100%'}
+    )
+], className='bg-opacity-10 d-flex align-items-center justify-content-center', style={'height': '91.75%'})
+
+diff = dbc.Container([
+    dbc.Row([
+        dbc.Col([
+            dbc.Card([diff_main_header, diff_main_body], className='bg-secondary',
+                     style={'height': '100%', 'width': '100%'})
+        ], width=12, className='m-0',
+            style={'height': '500px', 'paddingTop': '5px', 'paddingBottom': '10px', 'paddingLeft': '5px',
+                   'paddingRight': '5px'})
+    ], className='m-0 p-0')
+], className='m-0 p-0', fluid=True)
+
+# Churn Segments Content
+
+segments_main_header = dbc.CardHeader(
+    id='segments-main-header',
+    className='border-bottom border-secondary d-flex align-items-center justify-content-center',
+    style={'height': '8.25%', 'textAlign': 'center', 'fontSize': '13px', 'fontWeight': 500, 'color': 'black'}
+)
+
+segments_main_body = dbc.CardBody([
+    dcc.Loading(
+        children=[
+            dcc.Graph(
+                id='segments-main-body',
+                className='d-flex align-items-center justify-content-center',
+                style={'height': '100%', 'width': '100%'}
+            )
+        ],
+        type='dot',
+        color='steelblue',
+        parent_style={'height': '100%', 'width': '100%'}
+    )
+], className='bg-opacity-10 d-flex align-items-center justify-content-center', style={'height': '91.75%'})
+
+segments = dbc.Container([
+    dbc.Row([
+        dbc.Col([
+            dbc.Card([segments_main_header, segments_main_body], className='bg-secondary',
+                     style={'height': '100%', 'width': '100%'})
+        ], width=12, className='m-0',
+            style={'height': '500px', 'paddingTop': '5px', 'paddingBottom': '10px', 'paddingLeft': '5px',
+                   'paddingRight': '5px'})
+    ], className='m-0 p-0')
+], className='m-0 p-0', fluid=True)
+
+# Customer Records Content
+
+records_main_header = dbc.CardHeader(
+    id='records-main-header',
+    className='border-bottom border-secondary d-flex align-items-center justify-content-center',
+    style={'height': '8.25%', 'textAlign': 'center', 'fontSize': '13px', 'fontWeight': 500, 'color': 'black'}
+)
+
+records_main_body = dbc.CardBody([
+    dcc.Dropdown(
+        id='customer-search',
+        placeholder='Search Customer ID',
+        multi=False,
+        clearable=True,
+        style={'width': '100%', 'fontSize': '11.5px', 'fontWeight': 500, 'color': 'black'}
+    ),
+    dcc.Loading(
+        children=[
+            dash_table.DataTable(
+                id='customer-table',
+                page_current=0,
+                page_size=record_page_size,
+                page_action='custom',
+                sort_action='custom',
+                sort_mode='single',
+                sort_by=[],
+                filter_action='custom',
+                filter_query='',
+                style_table={'height': '100%', 'overflowX': 'auto', 'overflowY': 'auto'},
+                style_header={'fontFamily': 'Arial', 'fontSize': '11.5px', 'fontWeight': 500, 'color': 'black'},
+                style_cell={'fontFamily': 'Arial', 'fontSize': '11px', 'color': 'black', 'minWidth': '90px',
+                            'textAlign': 'left'}
+            )
+        ],
+        type='dot',
+        color='steelblue',
+        parent_style={'height': '90%', 'width': '100%'}
+    )
+], className='bg-opacity-10 vstack gap-2 d-flex align-items-start justify-content-start',
+    style={'height': '91.75%'})
+
+records = dbc.Container([
+    dbc.Row([
+        dbc.Col([
+            dbc.Card([records_main_header, records_main_body], className='bg-secondary',
+                     style={'height': '100%', 'width': '100%'})
+        ], width=12, className='m-0',
+            style={'height': '500px', 'paddingTop': '5px', 'paddingBottom': '10px', 'paddingLeft': '5px',
+                   'paddingRight': '5px'})
+    ], className='m-0 p-0')
+], className='m-0 p-0', fluid=True)
+
+# Loading Content
+
+loading_body = dbc.CardBody([
+    dcc.Graph(
+        figure=loading_figure(),
+        className='d-flex align-items-center justify-content-center',
+        style={'height': '100%', 'width': '100%'}
+    )
+], className='bg-opacity-10 d-flex align-items-center justify-content-center', style={'height': '100%'})
+
+loading_content = dbc.Container([
+    dbc.Row([
+        dbc.Col([
+            dbc.Card([loading_body], className='bg-secondary',
+                     style={'height': '100%', 'width': '100%'})
+        ], width=12, className='m-0',
+            style={'height': '500px', 'paddingTop': '5px', 'paddingBottom': '10px', 'paddingLeft': '5px',
+                   'paddingRight': '5px'})
+    ], className='m-0 p-0')
+], className='m-0 p-0', fluid=True)
+
+# Mounted Views
+
+# with PERSISTENT_VIEWS, every view is mounted once and Apply only shows the selected one in the browser, instead
+# of sending the component tree of the view again, which remounts its graphs
+persistent_views = os.environ.get('PERSISTENT_VIEWS', 'false').lower() in ('1', 'true', 'yes')
+
+# the view of every data type and its graphs
+views = {
+    'Categorical': ('cat', cat, ['cat-main-body', 'no', 'yes']),
+    'Numerical': ('num', num, ['num-main-body']),
+    'Categorical Vs Numerical': ('catnum', catnum, ['catnum-main-body']),
+    'Numerical Vs Numerical': ('num2', num2, ['num2-main-body']),
+    'Tenure Survival': ('survival', survival, ['survival-main-body']),
+    'Snapshot Comparison': ('diff', diff, ['diff-main-body']),
+    'Churn Segments': ('segments', segments, ['segments-main-body']),
+    'Customer Records': ('records', records, [])
+}
+
+graph_data_types = {y: x for x, (_, _, graphs) in views.items() for y in graphs}
+
+if persistent_views:
+    mounted_views = [html.Div(x, id='view-{}'.format(name), style={'display': 'none'})
+                     for name, x, _ in views.values()]
+    mounted_views.append(html.Div(loading_content, id='view-loading', style={'display': 'block'}))
+else:
+    mounted_views = None
+
+# App Layout
+
+app.layout = dbc.Container([
+    dcc.Store(id='data-status'),
+    dcc.Store(id='data-version'),
+    dcc.Interval(id='data-poll', interval=500),
+    dcc.Store(id='views', data={'persistent': persistent_views, 'order': list(views)}),
+    dcc.Store(id='view-state'),
+    dcc.Store(id='segment-selection'),
+    dcc.Store(id='segment-filter', data=[]),
+    html.Div([
+        html.Div([
+            dcc.Store(id='{}-request'.format(x)),
+            dcc.Store(id='{}-server'.format(x)),
+            dcc.Store(id='{}-cache'.format(x), data={'view': x, 'data_type': graph_data_types[x],
+                                                      'persistent': persistent_views, 'patches': figure_patches,
+                                                      'max_entries': client_cache_size})
+        ]) for x in figure_graphs
+    ]),
+    navbar,
+    dbc.Container([
+        dbc.Row([
+            dbc.Col([
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Card([title_header, title_body], className='bg-secondary',
+                                 style={'height': '100%', 'width': '100%'})
+                    ], width=12, className='m-0',
+                        style={'height': '111px', 'paddingTop': '10px', 'paddingBottom': '5px', 'paddingLeft': '6px',
+                               'paddingRight': '6px'})
+                ], className='m-0 p-0'),
+                dbc.Row([
+                    dbc.Col([
+                        dbc.Row([
+                            dbc.Col([
+                                dbc.Card([churn_rate_header, churn_rate_body], className='bg-secondary',
+                                         style={'height': '100%', 'width': '100%'})
+                            ], width=12, className='m-0',
+                                style={'height': '250px', 'paddingTop': '5px', 'paddingBottom': '5px',
+                                       'paddingLeft': '5px', 'paddingRight': '6px'})
+                        ], className='m-0 p-0'),
+                        dbc.Row([
+                            dbc.Col([
+                                dbc.Card([churn_dist_header, churn_dist_body], className='bg-secondary',
+                                         style={'height': '100%', 'width': '100%'})
+                            ], width=12, className='m-0',
+                                style={'height': '250px', 'paddingTop': '5px', 'paddingBottom': '10px',
+                                       'paddingLeft': '5px', 'paddingRight': '6px'})
+                        ], className='m-0 p-0')
+                    ], width={'size': 12, 'order': 2}, sm={'size': 6, 'order': 2}, lg={'size': 3, 'order': 'first'},
+                        className='m-0 p-0'),
+                    dbc.Col(
+                        mounted_views,
+                        id='content',
+                        width={'size': 12, 'order': 'last'}, sm={'size': 12, 'order': 'last'},
+                        lg={'size': 6, 'order': 2},
+                        className='m-0 p-0'),
+                    dbc.Col([
+                        dbc.Row([
+                            dbc.Col([
+                                dbc.Card([selector_header, selector_body], className='bg-secondary',
+                                         style={'height': '100%', 'width': '100%'})
+                            ], width=12, className='m-0',
                                 style={'height': '500px', 'paddingTop': '5px', 'paddingBottom': '10px',
                                        'paddingLeft': '5px', 'paddingRight': '6px'})
                         ], className='m-0 p-0')
@@ -553,12 +1969,89 @@ app.layout = dbc.Container([
 
 # App Callbacks
 
+@app.callback(
+    Output('data-status', 'data'),
+    Output('data-version', 'data'),
+    Output('data-poll', 'interval'),
+    Output('data-poll', 'disabled'),
+    Input('data-poll', 'n_intervals'),
+    State('data-status', 'data'),
+    State('data-version', 'data')
+)
+def update_data_status(n_intervals, current_status, current_version):
+    if data_ready.is_set():
+        status = 'ready'
+    elif data_error is not None:
+        status = 'error'
+    else:
+        status = 'loading'
+    if (status == current_status) and (data_version == current_version):
+        raise PreventUpdate
+    else:
+        status_update = status if status != current_status else dash.no_update
+        version_update = data_version if data_version != current_version else dash.no_update
+        if status == 'loading':
+            return status_update, version_update, 500, False
+        else:
+            return status_update, version_update, version_poll_interval * 1000, (status == 'error') or (
+                version_poll_interval <= 0)
+
+
+@app.callback(
+    Output('churn-rate-graph', 'figure'),
+    Output('churn-dist-graph', 'figure'),
+    Input('data-status', 'data'),
+    Input('dataset', 'value')
+)
+def update_kpi(status, dataset_name):
+    if status != 'ready':
+        raise PreventUpdate
+    else:
+        dataset = get_dataset(dataset_name)
+        return indicator_graph(dataset.churn_rate, [0, 100]), bar_graph_ver('Churn', dataset)
+
+
+@app.callback(
+    Output('cat-var', 'options'),
+    Output('cat-var', 'value'),
+    Output('num-var', 'options'),
+    Output('num-var', 'value'),
+    Output('x-axis', 'options'),
+    Output('x-axis', 'value'),
+    Input('data-status', 'data'),
+    Input('dataset', 'value'),
+    Input('data-type', 'value'),
+    Input('baseline-dataset', 'value'),
+    State('cat-var', 'value')
+)
+def update_options_value_selector(status, dataset_name, selected_value, baseline_name, cat_value):
+    if status != 'ready':
+        raise PreventUpdate
+    else:
+        dataset = get_dataset(dataset_name)
+        # the snapshot comparison only has the categorical variables of both datasets
+        if (selected_value == 'Snapshot Comparison') and (baseline_name is not None):
+            cat_columns = comparable_cat_var(dataset, get_dataset(baseline_name))
+        else:
+            cat_columns = dataset.cat_var
+        cat_options = [{'label': x, 'value': x} for x in cat_columns]
+        if (triggered('data-type.value') or triggered('baseline-dataset.value')) and not (
+                triggered('data-status.data') or triggered('dataset.value')):
+            value = cat_value if cat_value in cat_columns else (cat_columns[0] if cat_columns else None)
+            return cat_options, value, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+        num_options = [{'label': x, 'value': x} for x in dataset.num_var]
+        x_options = list(dataset.all_options_num.keys())
+        return cat_options, cat_columns[0] if cat_columns else None, num_options, dataset.num_var[0], x_options, \
+            x_options[0]
+
+
 @app.callback(
     Output('var', 'disabled'),
     Output('cat-var', 'disabled'),
     Output('num-var', 'disabled'),
     Output('x-axis', 'disabled'),
     Output('y-axis', 'disabled'),
+    Output('baseline-dataset', 'disabled'),
     Input('data-type', 'value')
 )
 def update_disabled_dropdown(selected_value):
@@ -568,30 +2061,49 @@ def update_disabled_dropdown(selected_value):
         disabled_true = True
         disabled_false = False
         if (selected_value == 'Categorical') or (selected_value == 'Numerical'):
-            return disabled_false, disabled_true, disabled_true, disabled_true, disabled_true
+            return disabled_false, disabled_true, disabled_true, disabled_true, disabled_true, disabled_true
         elif selected_value == 'Categorical Vs Numerical':
-            return disabled_true, disabled_false, disabled_false, disabled_true, disabled_true
+            return disabled_true, disabled_false, disabled_false, disabled_true, disabled_true, disabled_true
+        elif selected_value == 'Tenure Survival':
+            return disabled_true, disabled_false, disabled_true, disabled_true, disabled_true, disabled_true
+        elif selected_value == 'Snapshot Comparison':
+            return disabled_true, disabled_false, disabled_true, disabled_true, disabled_true, disabled_false
+        elif (selected_value == 'Churn Segments') or (selected_value == 'Customer Records'):
+            return disabled_true, disabled_true, disabled_true, disabled_true, disabled_true, disabled_true
         else:
-            return disabled_true, disabled_true, disabled_true, disabled_false, disabled_false
+            return disabled_true, disabled_true, disabled_true, disabled_false, disabled_false, disabled_true
 
 
 @app.callback(
     Output('var', 'options'),
     Output('var', 'value'),
-    Input('data-type', 'value')
+    Output('button', 'n_clicks'),
+    Output('segment-filter', 'data'),
+    Input('data-type', 'value'),
+    Input('data-status', 'data'),
+    Input('dataset', 'value'),
+    Input('segment-selection', 'data'),
+    State('button', 'n_clicks')
 )
-def update_options_value_variable(selected_value):
-    if selected_value is None:
+def update_options_value_variable(selected_value, status, dataset_name, segment, n_clicks):
+    if (selected_value is None) or (status != 'ready'):
         raise PreventUpdate
     else:
+        dataset = get_dataset(dataset_name)
         if selected_value == 'Categorical':
-            options = [{'label': x, 'value': x} for x in cat_var]
-            value = options[0]['value']
-            return options, value
+            options = [{'label': x, 'value': x} for x in dataset.cat_var]
+            # a click on a churn segment opens the categorical view of its first variable within the segment's values
+            # of the other variables, until another data type or dataset is selected. The view is applied in the same
+            # update as the variable and the segment, so that the figures read the new ones.
+            if triggered('segment-selection.data') and segment and all(x in dataset.cat_var for x, y in segment):
+                return options, segment[0][0], (n_clicks or 0) + 1, segment
+            else:
+                value = options[0]['value']
+                return options, value, dash.no_update, []
         elif selected_value == 'Numerical':
-            options = [{'label': x, 'value': x} for x in num_var]
+            options = [{'label': x, 'value': x} for x in dataset.num_var]
             value = options[0]['value']
-            return options, value
+            return options, value, dash.no_update, []
         else:
             raise PreventUpdate
 
@@ -599,13 +2111,14 @@ def update_options_value_variable(selected_value):
 @app.callback(
     Output('y-axis', 'options'),
     Output('y-axis', 'value'),
-    Input('x-axis', 'value')
+    Input('x-axis', 'value'),
+    State('dataset', 'value')
 )
-def update_options_value_yaxis(selected_value):
+def update_options_value_yaxis(selected_value, dataset_name):
     if selected_value is None:
         raise PreventUpdate
     else:
-        options = [{'label': x, 'value': x} for x in all_options_num[selected_value]]
+        options = [{'label': x, 'value': x} for x in get_dataset(dataset_name).all_options_num[selected_value]]
         value = options[0]['value']
         return options, value
 
@@ -623,76 +2136,137 @@ def update_title_header(n_clicks, selected_value):
         return title_header
 
 
-@app.callback(
-    Output('content', 'children'),
+# the applied data type, which the figure callbacks follow, and with PERSISTENT_VIEWS the display of every view
+if persistent_views:
+    view_outputs = [Output('view-{}'.format(x[0]), 'style') for x in views.values()] + [
+        Output('view-loading', 'style')]
+else:
+    view_outputs = []
+
+app.clientside_callback(
+    ClientsideFunction(namespace='views', function_name='show'),
+    Output('view-state', 'data'),
+    *view_outputs,
     Input('button', 'n_clicks'),
-    State('data-type', 'value')
+    Input('data-status', 'data'),
+    State('data-type', 'value'),
+    State('views', 'data')
 )
-def update_content(n_clicks, selected_value):
+
+
+def update_content(n_clicks, status, selected_value):
     if selected_value is None:
         raise PreventUpdate
     else:
-        if selected_value == 'Categorical':
+        if status != 'ready':
+            return loading_content
+        elif selected_value == 'Categorical':
             return cat
         elif selected_value == 'Numerical':
             return num
         elif selected_value == 'Categorical Vs Numerical':
             return catnum
+        elif selected_value == 'Tenure Survival':
+            return survival
+        elif selected_value == 'Snapshot Comparison':
+            return diff
+        elif selected_value == 'Churn Segments':
+            return segments
+        elif selected_value == 'Customer Records':
+            return records
         else:
             return num2
 
 
+# the mounted views are only shown and hidden by views.show
+if not persistent_views:
+    app.callback(
+        Output('content', 'children'),
+        Input('button', 'n_clicks'),
+        Input('data-status', 'data'),
+        State('data-type', 'value')
+    )(update_content)
+
+
 @app.callback(
     Output('cat-main-header', 'children'),
     Output('no-header', 'children'),
     Output('yes-header', 'children'),
     Input('button', 'n_clicks'),
-    State('var', 'value')
+    State('var', 'value'),
+    State('segment-filter', 'data')
 )
-def update_cat_main_header(n_clicks, selected_value):
+def update_cat_main_header(n_clicks, selected_value, segment):
     if selected_value is None:
         raise PreventUpdate
     else:
         main_header = '{} Distribution W.R.T Churn'.format(selected_value)
         no_header = '% by {} (Churn = No)'.format(selected_value)
         yes_header = '% by {} (Churn = Yes)'.format(selected_value)
+        conditions = segment_conditions(segment, selected_value)
+        if conditions:
+            main_header = '{} ({})'.format(main_header, conditions)
         return main_header, no_header, yes_header
 
 
-@app.callback(
-    Output('cat-main-body', 'figure'),
-    Input('button', 'n_clicks'),
-    State('var', 'value')
-)
-def update_cat_main_body(n_clicks, selected_value):
+def update_cat_main_body(n_clicks, selected_value, segment=None, dataset_name=None, dataset=None):
     if selected_value is None:
         raise PreventUpdate
+    elif not data_ready.is_set():
+        return loading_figure()
     else:
-        fig = go.Figure()
+        dataset = segment_dataset(dataset or get_dataset(dataset_name), segment, selected_value)
+        fig = new_figure()
         color_map = {'No': 'dodgerblue', 'Yes': 'darkorange'}
-        for i in df['Churn'].unique():
-            fig.add_trace(
-                go.Histogram(
-                    histfunc='count',
-                    y=df.loc[df['Churn'] == i][selected_value],
-                    marker=dict(
-                        color=color_map[i]
-                    ),
-                    name=i,
-                    customdata=[selected_value for i in df[selected_value].unique()],
-                    hovertemplate=
-                    '<i style="color:white;"><b>%{customdata}:</b> %{y}</i><br>' +
-                    '<i style="color:white;"><b>Count:</b> %{x}</i><br>' +
-                    '<extra></extra>'
+        if dataset.source.aggregated:
+            counts = dataset.source.category_counts(selected_value)
+            for i in dataset.source.churn_classes():
+                subset = counts.loc[counts['Churn'] == i]
+                fig.add_trace(
+                    new_trace(
+                        go.Bar,
+                        orientation='h',
+                        y=subset[selected_value],
+                        x=subset['Count'],
+                        marker=dict(
+                            color=color_map[i]
+                        ),
+                        name=i,
+                        **count_error_bars(subset, 'x'),
+                        customdata=[selected_value for x in range(len(subset))],
+                        hovertemplate=
+                        '<i style="color:white;"><b>%{customdata}:</b> %{y}</i><br>' +
+                        '<i style="color:white;"><b>Count:</b> %{x}</i><br>' +
+                        '<extra></extra>'
+                    )
+                )
+        else:
+            for i in dataset.df['Churn'].unique():
+                fig.add_trace(
+                    new_trace(
+                        go.Histogram,
+                        histfunc='count',
+                        y=dataset.df.loc[dataset.df['Churn'] == i][selected_value],
+                        marker=dict(
+                            color=color_map[i]
+                        ),
+                        name=i,
+                        customdata=[selected_value for i in dataset.df[selected_value].unique()],
+                        hovertemplate=
+                        '<i style="color:white;"><b>%{customdata}:</b> %{y}</i><br>' +
+                        '<i style="color:white;"><b>Count:</b> %{x}</i><br>' +
+                        '<extra></extra>'
+                    )
                 )
-            )
         fig.update_layout(
             font=dict(
                 family='Arial',
                 color='black'
             ),
             xaxis=dict(
-                title='Count',
+                title=dict(
+                    text='Count'
+                ),
                 showline=False,
                 showgrid=False,
                 zeroline=False,
@@ -715,7 +2289,9 @@ def update_cat_main_body(n_clicks, selected_value):
                 )
             ),
             legend=dict(
-                title='Churn',
+                title=dict(
+                    text='Churn'
+                ),
                 orientation='h',
                 yanchor='bottom',
                 y=1,
@@ -736,20 +2312,20 @@ def update_cat_main_body(n_clicks, selected_value):
         return fig
 
 
-@app.callback(
-    Output('no', 'figure'),
-    Input('button', 'n_clicks'),
-    State('var', 'value')
-)
-def update_no(n_clicks, selected_value):
+def update_no(n_clicks, selected_value, segment=None, dataset_name=None, dataset=None):
     if selected_value is None:
         raise PreventUpdate
+    elif not data_ready.is_set():
+        return loading_figure()
     else:
-        fig = go.Figure()
+        dataset = segment_dataset(dataset or get_dataset(dataset_name), segment, selected_value)
+        counts = dataset.source.category_counts(selected_value, 'No')
+        fig = new_figure()
         fig.add_trace(
-            go.Pie(
-                labels=df.loc[df['Churn'] == 'No', selected_value].value_counts().index,
-                values=df.loc[df['Churn'] == 'No', selected_value].value_counts().values
+            new_trace(
+                go.Pie,
+                labels=counts[selected_value],
+                values=counts['Count']
             )
         )
         fig.update_traces(
@@ -760,7 +2336,7 @@ def update_no(n_clicks, selected_value):
                 color='white'
             ),
             marker=dict(
-                colors=['dodgerblue' for x in df.loc[df['Churn'] == 'No', selected_value].unique()],
+                colors=['dodgerblue' for x in range(len(counts))],
                 line=dict(
                     color='white',
                     width=1
@@ -780,20 +2356,20 @@ def update_no(n_clicks, selected_value):
         return fig
 
 
-@app.callback(
-    Output('yes', 'figure'),
-    Input('button', 'n_clicks'),
-    State('var', 'value')
-)
-def update_yes(n_clicks, selected_value):
+def update_yes(n_clicks, selected_value, segment=None, dataset_name=None, dataset=None):
     if selected_value is None:
         raise PreventUpdate
+    elif not data_ready.is_set():
+        return loading_figure()
     else:
-        fig = go.Figure()
+        dataset = segment_dataset(dataset or get_dataset(dataset_name), segment, selected_value)
+        counts = dataset.source.category_counts(selected_value, 'Yes')
+        fig = new_figure()
         fig.add_trace(
-            go.Pie(
-                labels=df.loc[df['Churn'] == 'Yes', selected_value].value_counts().index,
-                values=df.loc[df['Churn'] == 'Yes', selected_value].value_counts().values
+            new_trace(
+                go.Pie,
+                labels=counts[selected_value],
+                values=counts['Count']
             )
         )
         fig.update_traces(
@@ -804,7 +2380,7 @@ def update_yes(n_clicks, selected_value):
                 color='white'
             ),
             marker=dict(
-                colors=['darkorange' for x in df.loc[df['Churn'] == 'Yes', selected_value].unique()],
+                colors=['darkorange' for x in range(len(counts))],
                 line=dict(
                     color='white',
                     width=1
@@ -837,41 +2413,75 @@ def update_num_main_header(n_clicks, selected_value):
         return main_header
 
 
-@app.callback(
-    Output('num-main-body', 'figure'),
-    Input('button', 'n_clicks'),
-    State('var', 'value')
-)
-def update_num_main_body(n_clicks, selected_value):
+def update_num_main_body(n_clicks, selected_value, dataset_name=None, dataset=None):
     if selected_value is None:
         raise PreventUpdate
+    elif not data_ready.is_set():
+        return loading_figure()
     else:
-        fig = go.Figure()
+        dataset = dataset or get_dataset(dataset_name)
+        fig = new_figure()
         color_map = {'No': 'dodgerblue', 'Yes': 'darkorange'}
-        for i in df['Churn'].unique():
-            fig.add_trace(
-                go.Histogram(
-                    histfunc='count',
-                    x=df.loc[df['Churn'] == i][selected_value],
-                    marker=dict(
-                        color=color_map[i]
-                    ),
-                    name=i,
-                    customdata=[selected_value for i in df[selected_value].unique()],
-                    hovertemplate=
-                    '<i style="color:white;"><b>%{customdata}:</b> %{x}</i><br>' +
-                    '<i style="color:white;"><b>Count:</b> %{y}</i><br>' +
-                    '<extra></extra>'
+        start, size = histogram_bins_range(column_sketch(selected_value, dataset))
+        if dataset.source.aggregated:
+            hist = dataset.source.histogram(selected_value, start, size)
+            for i in dataset.source.churn_classes():
+                subset = hist.loc[hist['Churn'] == i]
+                fig.add_trace(
+                    new_trace(
+                        go.Bar,
+                        x=subset['Start'] + size / 2,
+                        y=subset['Count'],
+                        marker=dict(
+                            color=color_map[i]
+                        ),
+                        name=i,
+                        **count_error_bars(subset, 'y'),
+                        customdata=[selected_value for x in range(len(subset))],
+                        hovertemplate=
+                        '<i style="color:white;"><b>%{customdata}:</b> %{x}</i><br>' +
+                        '<i style="color:white;"><b>Count:</b> %{y}</i><br>' +
+                        '<extra></extra>'
+                    )
+                )
+        else:
+            for i in dataset.df['Churn'].unique():
+                fig.add_trace(
+                    new_trace(
+                        go.Histogram,
+                        histfunc='count',
+                        x=dataset.df.loc[dataset.df['Churn'] == i][selected_value],
+                        xbins=dict(
+                            start=start,
+                            size=size
+                        ),
+                        marker=dict(
+                            color=color_map[i]
+                        ),
+                        name=i,
+                        customdata=[selected_value for i in dataset.df[selected_value].unique()],
+                        hovertemplate=
+                        '<i style="color:white;"><b>%{customdata}:</b> %{x}</i><br>' +
+                        '<i style="color:white;"><b>Count:</b> %{y}</i><br>' +
+                        '<extra></extra>'
+                    )
                 )
-            )
         if selected_value == 'Tenure':
             fig.update_layout(
-                xaxis_title='{} (in Month)'.format(selected_value)
+                xaxis=dict(
+                    title=dict(
+                        text='{} (in Month)'.format(selected_value)
+                    )
+                )
             )
         else:
             fig.update_layout(
-                xaxis_title='{}'.format(selected_value),
-                xaxis_tickformat='$'
+                xaxis=dict(
+                    title=dict(
+                        text='{}'.format(selected_value)
+                    ),
+                    tickformat='$'
+                )
             )
         fig.update_layout(
             font=dict(
@@ -892,7 +2502,9 @@ def update_num_main_body(n_clicks, selected_value):
                 )
             ),
             yaxis=dict(
-                title='Count',
+                title=dict(
+                    text='Count'
+                ),
                 showline=True,
                 showgrid=True,
                 zeroline=False,
@@ -906,7 +2518,9 @@ def update_num_main_body(n_clicks, selected_value):
                 )
             ),
             legend=dict(
-                title='Churn',
+                title=dict(
+                    text='Churn'
+                ),
                 orientation='h',
                 yanchor='bottom',
                 y=1,
@@ -941,43 +2555,51 @@ def update_catnum_main_header(n_clicks, selected_value1, selected_value2):
         return main_header
 
 
-@app.callback(
-    Output('catnum-main-body', 'figure'),
-    Input('button', 'n_clicks'),
-    State('cat-var', 'value'),
-    State('num-var', 'value')
-)
-def update_catnum_main_body(n_clicks, selected_value1, selected_value2):
+def update_catnum_main_body(n_clicks, selected_value1, selected_value2, dataset_name=None, dataset=None):
     if ((selected_value1 is None) or (selected_value2 is None)):
         raise PreventUpdate
+    elif not data_ready.is_set():
+        return loading_figure()
     else:
-        fig = go.Figure()
+        dataset = dataset or get_dataset(dataset_name)
+        fig = new_figure()
         color_map = {'No': 'dodgerblue', 'Yes': 'darkorange'}
-        for i in df['Churn'].unique():
+        # the boxes are drawn from the quartiles and fences of the sketches (or the exact ones with
+        # EXACT_QUANTILES), instead of sending every value to the browser
+        stats = get_box_stats(selected_value1, selected_value2, dataset)
+        for i in dataset.source.churn_classes():
+            subset = stats.loc[stats['Churn'] == i]
             fig.add_trace(
-                go.Box(
-                    x=df.loc[df['Churn'] == i][selected_value1],
-                    y=df.loc[df['Churn'] == i][selected_value2],
+                new_trace(
+                    go.Box,
+                    x=subset[selected_value1],
+                    q1=subset['Q1'],
+                    median=subset['Median'],
+                    q3=subset['Q3'],
+                    lowerfence=subset['Lower Fence'],
+                    upperfence=subset['Upper Fence'],
                     marker=dict(
                         color=color_map[i]
                     ),
-                    name=i,
-                    customdata=np.stack(([selected_value1 for z in df[selected_value1]],
-                                         [selected_value2 for z in df[selected_value2]]), axis=-1),
-                    hovertemplate=
-                    '<i style="color:white;"><b>%{customdata[0]}:</b> %{x}</i><br>' +
-                    '<i style="color:white;"><b>%{customdata[1]}:</b> %{y}</i><br>' +
-                    '<extra></extra>'
+                    name=i
                 )
             )
         if selected_value2 == 'Tenure':
             fig.update_layout(
-                yaxis_title='{} (in Month)'.format(selected_value2)
+                yaxis=dict(
+                    title=dict(
+                        text='{} (in Month)'.format(selected_value2)
+                    )
+                )
             )
         else:
             fig.update_layout(
-                yaxis_title='{}'.format(selected_value2),
-                yaxis_tickformat='$'
+                yaxis=dict(
+                    title=dict(
+                        text='{}'.format(selected_value2)
+                    ),
+                    tickformat='$'
+                )
             )
         fig.update_layout(
             font=dict(
@@ -985,7 +2607,9 @@ def update_catnum_main_body(n_clicks, selected_value1, selected_value2):
                 color='black',
             ),
             xaxis=dict(
-                title='{}'.format(selected_value1),
+                title=dict(
+                    text='{}'.format(selected_value1)
+                ),
                 showline=False,
                 showgrid=False,
                 zeroline=False,
@@ -1009,7 +2633,9 @@ def update_catnum_main_body(n_clicks, selected_value1, selected_value2):
                 )
             ),
             legend=dict(
-                title='Churn',
+                title=dict(
+                    text='Churn'
+                ),
                 orientation='h',
                 yanchor='bottom',
                 y=1,
@@ -1043,53 +2669,88 @@ def update_num2_main_header(n_clicks, selected_value1, selected_value2):
         return main_header
 
 
-@app.callback(
-    Output('num2-main-body', 'figure'),
-    Input('button', 'n_clicks'),
-    State('x-axis', 'value'),
-    State('y-axis', 'value')
-)
-def update_num2_main_body(n_clicks, selected_value1, selected_value2):
+def update_num2_main_body(n_clicks, selected_value1, selected_value2, dataset_name=None, dataset=None):
     if ((selected_value1 is None) or (selected_value2 is None)):
         raise PreventUpdate
+    elif not data_ready.is_set():
+        return loading_figure()
     else:
-        fig = go.Figure()
+        dataset = dataset or get_dataset(dataset_name)
+        fig = new_figure()
         color_map = {'No': 'dodgerblue', 'Yes': 'darkorange'}
-        for i in df['Churn'].unique():
-            fig.add_trace(
-                go.Scatter(
-                    x=df.loc[df['Churn'] == i][selected_value1],
-                    y=df.loc[df['Churn'] == i][selected_value2],
-                    mode='markers',
-                    marker=dict(
-                        color=color_map[i]
-                    ),
-                    name=i,
-                    customdata=np.stack(([selected_value1 for z in df[selected_value1]],
-                                         [selected_value2 for z in df[selected_value2]]), axis=-1),
-                    hovertemplate=
-                    '<i style="color:white;"><b>%{customdata[0]}:</b> %{x}</i><br>' +
-                    '<i style="color:white;"><b>%{customdata[1]}:</b> %{y}</i><br>' +
-                    '<extra></extra>'
+        if dataset.source.aggregated:
+            for i in dataset.source.churn_classes():
+                points = dataset.source.points(selected_value1, selected_value2, i, scatter_limit)
+                fig.add_trace(
+                    new_trace(
+                        go.Scatter,
+                        x=points[selected_value1],
+                        y=points[selected_value2],
+                        mode='markers',
+                        marker=dict(
+                            color=color_map[i]
+                        ),
+                        name=i,
+                        customdata=[[selected_value1, selected_value2] for x in range(len(points))],
+                        hovertemplate=
+                        '<i style="color:white;"><b>%{customdata[0]}:</b> %{x}</i><br>' +
+                        '<i style="color:white;"><b>%{customdata[1]}:</b> %{y}</i><br>' +
+                        '<extra></extra>'
+                    )
+                )
+        else:
+            for i in dataset.df['Churn'].unique():
+                fig.add_trace(
+                    new_trace(
+                        go.Scatter,
+                        x=dataset.df.loc[dataset.df['Churn'] == i][selected_value1],
+                        y=dataset.df.loc[dataset.df['Churn'] == i][selected_value2],
+                        mode='markers',
+                        marker=dict(
+                            color=color_map[i]
+                        ),
+                        name=i,
+                        customdata=np.stack(([selected_value1 for z in dataset.df[selected_value1]],
+                                             [selected_value2 for z in dataset.df[selected_value2]]), axis=-1),
+                        hovertemplate=
+                        '<i style="color:white;"><b>%{customdata[0]}:</b> %{x}</i><br>' +
+                        '<i style="color:white;"><b>%{customdata[1]}:</b> %{y}</i><br>' +
+                        '<extra></extra>'
+                    )
                 )
-            )
         if selected_value1 == 'Tenure':
             fig.update_layout(
-                xaxis_title='{} (in Month)'.format(selected_value1)
+                xaxis=dict(
+                    title=dict(
+                        text='{} (in Month)'.format(selected_value1)
+                    )
+                )
             )
         else:
             fig.update_layout(
-                xaxis_title='{}'.format(selected_value1),
-                xaxis_tickformat='$'
+                xaxis=dict(
+                    title=dict(
+                        text='{}'.format(selected_value1)
+                    ),
+                    tickformat='$'
+                )
             )
         if selected_value2 == 'Tenure':
             fig.update_layout(
-                yaxis_title='{} (in Month)'.format(selected_value2)
+                yaxis=dict(
+                    title=dict(
+                        text='{} (in Month)'.format(selected_value2)
+                    )
+                )
             )
         else:
             fig.update_layout(
-                yaxis_title='{}'.format(selected_value2),
-                yaxis_tickformat='$'
+                yaxis=dict(
+                    title=dict(
+                        text='{}'.format(selected_value2)
+                    ),
+                    tickformat='$'
+                )
             )
         fig.update_layout(
             font=dict(
@@ -1123,7 +2784,9 @@ def update_num2_main_body(n_clicks, selected_value1, selected_value2):
                 )
             ),
             legend=dict(
-                title='Churn',
+                title=dict(
+                    text='Churn'
+                ),
                 orientation='h',
                 yanchor='bottom',
                 y=1,
@@ -1141,5 +2804,720 @@ def update_num2_main_body(n_clicks, selected_value1, selected_value2):
         )
         return fig
 
+
+@app.callback(
+    Output('survival-main-header', 'children'),
+    Input('button', 'n_clicks'),
+    State('cat-var', 'value')
+)
+def update_survival_main_header(n_clicks, selected_value):
+    if selected_value is None:
+        raise PreventUpdate
+    else:
+        main_header = 'Tenure Survival (Kaplan-Meier) by {}'.format(selected_value)
+        return main_header
+
+
+def update_survival_main_body(n_clicks, selected_value, dataset_name=None, dataset=None):
+    if selected_value is None:
+        raise PreventUpdate
+    elif not data_ready.is_set():
+        return loading_figure()
+    else:
+        dataset = dataset or get_dataset(dataset_name)
+        curves = get_survival_curves(selected_value, dataset)
+        fig = new_figure()
+        color_list = ['dodgerblue', 'darkorange', 'seagreen', 'crimson', 'mediumpurple', 'saddlebrown']
+        for n, (i, curve) in enumerate(curves.groupby(selected_value, sort=True)):
+            color = color_list[n % len(color_list)]
+            fig.add_trace(
+                new_trace(
+                    go.Scatter,
+                    x=curve['Tenure'],
+                    y=curve['Upper'],
+                    mode='lines',
+                    line=dict(
+                        width=0,
+                        shape='hv'
+                    ),
+                    legendgroup=i,
+                    showlegend=False,
+                    hoverinfo='skip'
+                )
+            )
+            fig.add_trace(
+                new_trace(
+                    go.Scatter,
+                    x=curve['Tenure'],
+                    y=curve['Lower'],
+                    mode='lines',
+                    line=dict(
+                        width=0,
+                        shape='hv'
+                    ),
+                    fill='tonexty',
+                    fillcolor=color,
+                    opacity=0.2,
+                    legendgroup=i,
+                    showlegend=False,
+                    hoverinfo='skip'
+                )
+            )
+            fig.add_trace(
+                new_trace(
+                    go.Scatter,
+                    x=curve['Tenure'],
+                    y=curve['Survival'],
+                    mode='lines',
+                    line=dict(
+                        color=color,
+                        width=2,
+                        shape='hv'
+                    ),
+                    name=i,
+                    legendgroup=i,
+                    customdata=np.stack((curve['Lower'], curve['Upper'], curve['At Risk']), axis=-1),
+                    hovertemplate=
+                    '<i style="color:white;"><b>' + i + '</b></i><br>' +
+                    '<i style="color:white;"><b>Tenure:</b> %{x} Month</i><br>' +
+                    '<i style="color:white;"><b>Retention:</b> %{y:.1%} (%{customdata[0]:.1%} - '
+                    '%{customdata[1]:.1%})</i><br>' +
+                    '<i style="color:white;"><b>At Risk:</b> %{customdata[2]}</i><br>' +
+                    '<extra></extra>'
+                )
+            )
+        fig.update_layout(
+            font=dict(
+                family='Arial',
+                color='black'
+            ),
+            xaxis=dict(
+                title=dict(
+                    text='Tenure (in Month)'
+                ),
+                showline=True,
+                showgrid=True,
+                zeroline=False,
+                linewidth=1.5,
+                gridwidth=0.5,
+                showticklabels=True,
+                tickfont=dict(
+                    family='Arial',
+                    size=12,
+                    color='black'
+                )
+            ),
+            yaxis=dict(
+                title=dict(
+                    text='Retention'
+                ),
+                range=[0, 1.02],
+                tickformat='.0%',
+                showline=True,
+                showgrid=True,
+                zeroline=False,
+                linewidth=1.5,
+                gridwidth=0.5,
+                showticklabels=True,
+                tickfont=dict(
+                    family='Arial',
+                    size=12,
+                    color='black'
+                )
+            ),
+            legend=dict(
+                title=dict(
+                    text=selected_value
+                ),
+                orientation='h',
+                yanchor='bottom',
+                y=1,
+                xanchor='right',
+                x=1,
+                font=dict(
+                    family='Arial',
+                    size=10,
+                    color='black'
+                )
+            ),
+            margin=dict(l=0, r=0, t=0, b=0),
+            plot_bgcolor='rgba(0, 0, 0, 0)',
+            paper_bgcolor='rgba(0, 0, 0, 0)'
+        )
+        return fig
+
+
+@app.callback(
+    Output('diff-main-header', 'children'),
+    Input('button', 'n_clicks'),
+    State('cat-var', 'value'),
+    State('baseline-dataset', 'value'),
+    State('dataset', 'value')
+)
+def update_diff_main_header(n_clicks, selected_value, baseline_name, dataset_name):
+    if (selected_value is None) or (baseline_name is None) or (dataset_name is None):
+        raise PreventUpdate
+    else:
+        main_header = 'Churn Rate Change by {} ({} \u2192 {})'.format(selected_value, baseline_name, dataset_name)
+        return main_header
+
+
+def update_diff_main_body(n_clicks, selected_value, baseline_name, dataset_name=None):
+    if (selected_value is None) or (baseline_name is None):
+        raise PreventUpdate
+    elif not data_ready.is_set():
+        return loading_figure()
+    elif selected_value not in comparable_cat_var(get_dataset(dataset_name), get_dataset(baseline_name)):
+        # the options of the variable follow the baseline right after this callback
+        raise PreventUpdate
+    else:
+        snapshot_diff = get_snapshot_diff(baseline_name, dataset_name)
+        deltas = snapshot_diff.segment_deltas(selected_value).iloc[::-1]
+        fig = new_figure()
+        fig.add_trace(
+            new_trace(
+                go.Bar,
+                orientation='h',
+                y=deltas[selected_value],
+                x=deltas['Delta'],
+                marker=dict(
+                    color=['darkorange' if x > 0 else 'dodgerblue' for x in deltas['Delta']]
+                ),
+                text=['{:+.1f} pp'.format(x) for x in deltas['Delta']],
+                textposition='auto',
+                customdata=np.stack((deltas['Base Rate'], deltas['Current Rate'], deltas['Base Customers'],
+                                     deltas['Current Customers'], deltas['Newly Churned']), axis=-1),
+                hovertemplate=
+                '<i style="color:white;"><b>' + selected_value + ':</b> %{y}</i><br>' +
+                '<i style="color:white;"><b>Churn Rate:</b> %{customdata[0]:.1f}% \u2192 %{customdata[1]:.1f}%</i><br>' +
+                '<i style="color:white;"><b>Customers:</b> %{customdata[2]} \u2192 %{customdata[3]}</i><br>' +
+                '<i style="color:white;"><b>Newly Churned:</b> %{customdata[4]}</i><br>' +
+                '<extra></extra>'
+            )
+        )
+        summary = snapshot_diff.summary
+        annotation = dict(
+            text='Newly churned: {} of {} matched customers<br>New customers: {}, lost customers: {}'.format(
+                summary['newly_churned'], summary['matched_customers'], summary['new_customers'],
+                summary['lost_customers']),
+            xref='paper',
+            yref='paper',
+            x=1,
+            y=0,
+            xanchor='right',
+            yanchor='bottom',
+            align='right',
+            showarrow=False,
+            font=dict(
+                family='Arial',
+                size=11,
+                color='black'
+            )
+        )
+        fig.update_layout(
+            font=dict(
+                family='Arial',
+                color='black'
+            ),
+            xaxis=dict(
+                title=dict(
+                    text='Churn Rate Change (Percentage Points)'
+                ),
+                showline=False,
+                showgrid=True,
+                zeroline=True,
+                zerolinewidth=1.5,
+                gridwidth=0.5,
+                showticklabels=True,
+                tickfont=dict(
+                    family='Arial',
+                    size=11,
+                    color='black'
+                )
+            ),
+            yaxis=dict(
+                showline=False,
+                showgrid=False,
+                zeroline=False,
+                showticklabels=True,
+                tickfont=dict(
+                    family='Arial',
+                    size=11,
+                    color='black'
+                )
+            ),
+            annotations=[annotation],
+            showlegend=False,
+            bargap=0.2,
+            margin=dict(l=0, r=0, t=0, b=0),
+            plot_bgcolor='rgba(0, 0, 0, 0)',
+            paper_bgcolor='rgba(0, 0, 0, 0)'
+        )
+        return fig
+
+
+@app.callback(
+    Output('segments-main-header', 'children'),
+    Input('button', 'n_clicks'),
+    State('dataset', 'value')
+)
+def update_segments_main_header(n_clicks, dataset_name):
+    if not data_ready.is_set():
+        raise PreventUpdate
+    else:
+        main_header = 'Top {} Churn Segments of up to {} Variables (Support \u2265 {:,} Customers)'.format(
+            segment_top_k, segment_max_order, segment_support(get_dataset(dataset_name)))
+        return main_header
+
+
+def update_segments_main_body(n_clicks, dataset_name=None):
+    if not data_ready.is_set():
+        return loading_figure()
+    else:
+        dataset = get_dataset(dataset_name)
+        top = get_segments(dataset).head(segment_top_k).iloc[::-1]
+        fig = new_figure()
+        fig.add_trace(
+            new_trace(
+                go.Bar,
+                orientation='h',
+                y=['<br>'.join('{}: {}'.format(x, y) for x, y in zip(a, b))
+                   for a, b in zip(top['Variables'], top['Values'])],
+                x=top['Churn Rate'],
+                marker=dict(
+                    color='darkorange'
+                ),
+                text=['{:.1f}%'.format(x) for x in top['Churn Rate']],
+                textposition='auto',
+                # a segment is opened in the categorical view on click, as its pairs of variables and values
+                customdata=[list(x) for x in zip(top['Customers'].tolist(), top['Churned'].tolist(),
+                                                 top['Support'].tolist(), top['Lift'].tolist(),
+                                                 [[list(y) for y in zip(a, b)]
+                                                  for a, b in zip(top['Variables'], top['Values'])])],
+                hovertemplate=
+                '<i style="color:white;"><b>Churn Rate:</b> %{x:.1f}%</i><br>' +
+                '<i style="color:white;"><b>Customers:</b> %{customdata[0]} (%{customdata[2]:.1f}%)</i><br>' +
+                '<i style="color:white;"><b>Churned:</b> %{customdata[1]}</i><br>' +
+                '<i style="color:white;"><b>Lift:</b> %{customdata[3]:.2f}x</i><br>' +
+                '<extra></extra>'
+            )
+        )
+        fig.update_layout(
+            font=dict(
+                family='Arial',
+                color='black'
+            ),
+            xaxis=dict(
+                title=dict(
+                    text='Churn Rate (%)'
+                ),
+                range=[0, 100],
+                showline=False,
+                showgrid=True,
+                zeroline=False,
+                gridwidth=0.5,
+                showticklabels=True,
+                tickfont=dict(
+                    family='Arial',
+                    size=11,
+                    color='black'
+                )
+            ),
+            yaxis=dict(
+                showline=False,
+                showgrid=False,
+                zeroline=False,
+                showticklabels=True,
+                tickfont=dict(
+                    family='Arial',
+                    size=9,
+                    color='black'
+                )
+            ),
+            shapes=[dict(
+                type='line',
+                xref='x',
+                yref='paper',
+                x0=dataset.churn_rate,
+                x1=dataset.churn_rate,
+                y0=0,
+                y1=1,
+                line=dict(
+                    color='dodgerblue',
+                    width=1.5,
+                    dash='dash'
+                )
+            )],
+            annotations=[dict(
+                text='Overall: {:.1f}%'.format(dataset.churn_rate),
+                xref='x',
+                yref='paper',
+                x=dataset.churn_rate,
+                y=1,
+                xanchor='left',
+                yanchor='bottom',
+                showarrow=False,
+                font=dict(
+                    family='Arial',
+                    size=10,
+                    color='dodgerblue'
+                )
+            )],
+            showlegend=False,
+            bargap=0.2,
+            margin=dict(l=0, r=0, t=15, b=0),
+            plot_bgcolor='rgba(0, 0, 0, 0)',
+            paper_bgcolor='rgba(0, 0, 0, 0)'
+        )
+        return fig
+
+
+# a click on a segment selects the categorical view, update_options_value_variable opens its first variable within
+# the segment
+app.clientside_callback(
+    ClientsideFunction(namespace='views', function_name='drill'),
+    Output('data-type', 'value'),
+    Output('segment-selection', 'data'),
+    Input('segments-main-body', 'clickData')
+)
+
+
+@app.callback(
+    Output('customer-table', 'data'),
+    Output('customer-table', 'columns'),
+    Output('customer-table', 'page_count'),
+    Output('records-main-header', 'children'),
+    Input('button', 'n_clicks'),
+    Input('customer-table', 'page_current'),
+    Input('customer-table', 'page_size'),
+    Input('customer-table', 'sort_by'),
+    Input('customer-table', 'filter_query'),
+    State('dataset', 'value'),
+    State('view-state', 'data')
+)
+def update_records(n_clicks, page_current, page_size, sort_by, filter_query, dataset_name, view_state):
+    # the mounted table of PERSISTENT_VIEWS is only read while it is shown
+    if (page_current is None) or (page_size is None) or (not data_ready.is_set()) or (
+            (view_state or {}).get('data_type') != 'Customer Records'):
+        raise PreventUpdate
+    else:
+        # only the visible page is read from the dataset and sent to the browser
+        dataset = get_dataset(dataset_name)
+        filters = parse_filter_query(filter_query, dataset)
+        sort_by = [(x['column_id'], x['direction'] == 'asc') for x in (sort_by or [])
+                   if x['column_id'] in dataset.all_var]
+        page, total = dataset.source.records(filters, sort_by, page_current * page_size, page_size)
+        columns = [{'name': x, 'id': x, 'type': 'numeric' if x in dataset.num_var else 'text'}
+                   for x in dataset.all_var]
+        page_count = max(int(np.ceil(total / page_size)), 1)
+        main_header = 'Customer Records ({:,} of {:,} Customers)'.format(total, int(dataset.total_cust))
+        return frame_records(page), columns, page_count, main_header
+
+
+@app.callback(
+    Output('customer-search', 'options'),
+    Input('customer-search', 'search_value'),
+    State('customer-search', 'value'),
+    State('dataset', 'value')
+)
+def update_customer_search(search_value, selected_value, dataset_name):
+    if (not search_value) or (not data_ready.is_set()):
+        raise PreventUpdate
+    else:
+        customer_ids = get_dataset(dataset_name).source.customer_ids(search_value, customer_search_limit)
+        # the selected customer stays an option, otherwise the dropdown clears it
+        if (selected_value is not None) and (selected_value not in customer_ids):
+            customer_ids = [selected_value] + customer_ids
+        return [{'label': x, 'value': x} for x in customer_ids]
+
+
+@app.callback(
+    Output('customer-table', 'filter_query'),
+    Output('customer-table', 'page_current'),
+    Input('customer-search', 'value')
+)
+def update_customer_filter(selected_value):
+    if selected_value is None:
+        return '', 0
+    else:
+        return '{{{}}} = "{}"'.format(id_column, selected_value.replace('"', '\\"')), 0
+
+
+# Figure Patches
+
+figure_store = OrderedDict()
+figure_store_lock = threading.Lock()
+patch_stats = {}
+
+
+def without_base(value):
+    if isinstance(value, dict) and ('base' in value):
+        return {x: y for x, y in value.items() if x != 'base'}
+    return value
+
+
+def store_figure(key, fig):
+    # the figures of the warm-up would evict the ones which the browsers have
+    if (not figure_patches) or is_warmup_request():
+        return
+    with figure_store_lock:
+        figure_store[key] = fig.to_plotly_json() if isinstance(fig, go.Figure) else fig
+        figure_store.move_to_end(key)
+        while len(figure_store) > figure_store_size:
+            figure_store.popitem(last=False)
+
+
+def response_reply(body, graph_id):
+    data = orjson.loads(body) if orjson is not None else json.loads(body)
+    return data['response']['{}-server'.format(graph_id)]['data']
+
+
+def patched_response_body(body, reply=None):
+    # the response of a figure callback as the changes from the figure which the browser names as base, when they
+    # are smaller than FIGURE_PATCH_RATIO of the serialized response. The reply is the one of the callback, without
+    # it the response comes from the response cache.
+    payload = flask.request.get_json(silent=True)
+    if (not figure_patches) or (not isinstance(payload, dict)) or (payload.get('output') not in cacheable_outputs):
+        return None
+    graph_id = payload['output'][:-len('-server.data')]
+    request = (payload.get('inputs') or [{}])[0].get('value') or {}
+    if reply is None:
+        # a cached figure is kept as the base of the next patches, as the browser will have it
+        with figure_store_lock:
+            figure = None if request.get('approximate') else figure_store.get(request.get('key'))
+        if figure is not None:
+            reply = {'key': request['key'], 'figure': figure}
+        else:
+            reply = response_reply(body, graph_id)
+            if (not reply.get('approximate')) and (reply.get('key') is not None):
+                store_figure(reply['key'], reply['figure'])
+    base_key = request.get('base')
+    if (not base_key) or (reply.get('key') is None) or (base_key == reply['key']):
+        return None
+    with figure_store_lock:
+        base = figure_store.get(base_key)
+    patched = None
+    if base is not None:
+        fig = reply['figure']
+        # the values let the browser request the whole figure if it no longer has the base one
+        patched_reply = dict({x: y for x, y in reply.items() if x != 'figure'}, base=base_key,
+                             patch=figure_patch(base, fig.to_plotly_json() if isinstance(fig, go.Figure) else fig),
+                             values=request['values'])
+        patched = pio.json.to_json_plotly(
+            {'multi': True, 'response': {'{}-server'.format(graph_id): {'data': patched_reply}}}).encode('utf-8')
+        if len(patched) >= len(body) * figure_patch_ratio:
+            patched = None
+    with figure_store_lock:
+        stats = patch_stats.setdefault(graph_id, dict(responses=0, patches=0, missing_bases=0, full_bytes=0,
+                                                      sent_bytes=0))
+        stats['responses'] += 1
+        stats['patches'] += patched is not None
+        stats['missing_bases'] += base is None
+        stats['full_bytes'] += len(body)
+        stats['sent_bytes'] += len(patched) if patched is not None else len(body)
+    return patched
+
+
+def patch_report():
+    with figure_store_lock:
+        graphs = {x: dict(y, saved_bytes=y['full_bytes'] - y['sent_bytes'],
+                          saved_bytes_per_response=(y['full_bytes'] - y['sent_bytes']) / y['responses'])
+                  for x, y in patch_stats.items()}
+        entries = len(figure_store)
+    return dict(
+        enabled=figure_patches,
+        stored_figures=entries,
+        saved_bytes=sum(x['saved_bytes'] for x in graphs.values()),
+        graphs=graphs
+    )
+
+
+# Figure Callbacks
+
+# the selected dataset is the last value of every figure function, which uses the default dataset without it. The
+# figures of the approximate mode also accept the sample of the dataset, as the dataset parameter. A selector is the
+# value of a dropdown, or another property named as 'id.property', e.g. the segment opened in the categorical view.
+figure_callbacks = {
+    'cat-main-body': (update_cat_main_body, ['var', 'segment-filter.data', 'dataset']),
+    'no': (update_no, ['var', 'segment-filter.data', 'dataset']),
+    'yes': (update_yes, ['var', 'segment-filter.data', 'dataset']),
+    'num-main-body': (update_num_main_body, ['var', 'dataset']),
+    'catnum-main-body': (update_catnum_main_body, ['cat-var', 'num-var', 'dataset']),
+    'num2-main-body': (update_num2_main_body, ['x-axis', 'y-axis', 'dataset']),
+    'survival-main-body': (update_survival_main_body, ['cat-var', 'dataset']),
+    'diff-main-body': (update_diff_main_body, ['cat-var', 'baseline-dataset', 'dataset']),
+    'segments-main-body': (update_segments_main_body, ['dataset'])
+}
+
+
+def register_figure_callback(graph_id, figure_function, selector_ids):
+    app.clientside_callback(
+        ClientsideFunction(namespace='figure_cache', function_name='dispatch'),
+        Output(graph_id, 'figure'),
+        Output('{}-request'.format(graph_id), 'data'),
+        Output('{}-cache'.format(graph_id), 'data'),
+        Input('view-state', 'data'),
+        Input('{}-server'.format(graph_id), 'data'),
+        State('{}-cache'.format(graph_id), 'data'),
+        State('data-version', 'data'),
+        State('approximate', 'value'),
+        *[State(*x.split('.')) if '.' in x else State(x, 'value') for x in selector_ids]
+    )
+
+    @app.callback(
+        Output('{}-server'.format(graph_id), 'data'),
+        Input('{}-request'.format(graph_id), 'data')
+    )
+    def update_figure(request):
+        if request is None:
+            raise PreventUpdate
+        elif request.get('approximate') and data_ready.is_set() and (graph_id in approximate_graphs):
+            sample = get_sample_dataset(get_dataset(request['values'][-1]))
+            if sample is not None:
+                # the browser shows this figure and requests the exact one right away
+                fig = approximate_badge(figure_function(None, *request['values'], dataset=sample), sample)
+                reply = flask.g.figure_reply = {'key': request['key'], 'figure': fig, 'approximate': True,
+                                                'values': request['values']}
+                return reply
+        fig = figure_function(None, *request['values'])
+        key = request['key'] if data_ready.is_set() else None
+        if key is not None:
+            store_figure(key, fig)
+        # the response is patched against the base figure of the browser after it is cached whole
+        reply = flask.g.figure_reply = {'key': key, 'figure': fig}
+        return reply
+
+
+# the snapshot comparison matches the customer ids of two datasets, which a sample cannot do, and the segments
+# are mined from all the rows at once
+approximate_graphs = [x for x in figure_graphs if x not in ('diff-main-body', 'segments-main-body')]
+
+for graph_id, (figure_function, selector_ids) in figure_callbacks.items():
+    register_figure_callback(graph_id, figure_function, selector_ids)
+
+
+def schedule_sample():
+    if data_ready.is_set():
+        get_sample_dataset(default_dataset)
+
+
+# the sample of the default dataset is built after each load, before the first approximate request
+data_listeners.append(schedule_sample)
+schedule_sample()
+
+
+def figure_selections():
+    selections = []
+    for x in cat_var:
+        # the categorical figures of the whole dataset, without a segment
+        selections += [('cat-main-body', [x, []]), ('no', [x, []]), ('yes', [x, []]), ('survival-main-body', [x])]
+    for x in num_var:
+        selections.append(('num-main-body', [x]))
+    for x in cat_var:
+        for y in num_var:
+            selections.append(('catnum-main-body', [x, y]))
+    for x, ys in all_options_num.items():
+        for y in ys:
+            selections.append(('num2-main-body', [x, y]))
+    selections.append(('segments-main-body', []))
+    return selections
+
+
+# Cache Warm-Up
+
+warmup_enabled = os.environ.get('WARMUP', 'true').lower() in ('1', 'true', 'yes')
+warmup_workers = int(os.environ.get('WARMUP_WORKERS', str(max(1, min(4, (os.cpu_count() or 2) // 2)))))
+warmup_delay = float(os.environ.get('WARMUP_DELAY', '0.01'))
+
+warmup_generation = 0
+warmup_lock = threading.Lock()
+warmup_stats = {'generation': 0, 'data_version': None, 'total': 0, 'completed': 0, 'failed': 0, 'running': False,
+                'seconds': None}
+
+
+def warmup_tasks():
+    # the browser sends the selected dataset as the last value
+    tasks = [(x, y + [default_dataset_name]) for x, y in figure_selections()]
+    # most requested combinations first, the order above breaks ties
+    with active_requests_lock:
+        popularity = dict(figure_popularity)
+    tasks.sort(key=lambda x: -popularity.get((x[0], json.dumps(x[1], separators=(',', ':'))), 0))
+
+    urls = ['/api/aggregates/variables', '/api/aggregates/churn']
+    urls += ['/api/aggregates/counts/{}'.format(x) for x in cat_var]
+    urls += ['/api/aggregates/histogram/{}'.format(x) for x in num_var]
+    urls += ['/api/aggregates/box/{}/{}'.format(x, y) for x in cat_var for y in num_var]
+    urls += ['/api/aggregates/segments']
+    # builds the customer id index of the type-ahead search
+    urls += ['/api/customers?limit=1']
+    return tasks + [('url', x) for x in urls]
+
+
+def warm(task, generation, version):
+    if generation != warmup_generation:
+        return
+    while active_requests > 0:
+        time.sleep(0.05)
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+    except (AttributeError, OSError):
+        pass
+    client = app.server.test_client()
+    headers = {'Accept-Encoding': 'br, gzip', 'X-Warmup': '1'}
+    if task[0] == 'url':
+        response = client.get(task[1], headers=headers)
+    else:
+        graph_id, values = task
+        # the same key as the one built by assets/figure_cache.js, so that the browser hits the response cache
+        key = json.dumps([graph_id, values, version], separators=(',', ':'), ensure_ascii=False)
+        payload = {
+            'output': '{}-server.data'.format(graph_id),
+            'outputs': {'id': '{}-server'.format(graph_id), 'property': 'data'},
+            'inputs': [{'id': '{}-request'.format(graph_id), 'property': 'data',
+                        'value': {'key': key, 'values': values}}],
+            'changedPropIds': ['{}-request.data'.format(graph_id)]
+        }
+        response = client.post('/_dash-update-component', json=payload, headers=headers)
+    with warmup_lock:
+        warmup_stats['completed' if response.status_code in (200, 204) else 'failed'] += 1
+    time.sleep(warmup_delay)
+
+
+def run_warmup(generation):
+    version = data_version
+    tasks = warmup_tasks()
+    with warmup_lock:
+        warmup_stats.update(generation=generation, data_version=version, total=len(tasks), completed=0, failed=0,
+                            running=True, seconds=None)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=warmup_workers, thread_name_prefix='warmup') as executor:
+        list(executor.map(lambda x: warm(x, generation, version), tasks))
+    with warmup_lock:
+        if warmup_stats['generation'] == generation:
+            warmup_stats.update(running=False, seconds=time.perf_counter() - start)
+
+
+def schedule_warmup():
+    global warmup_generation
+    with warmup_lock:
+        warmup_generation += 1
+        generation = warmup_generation
+    threading.Thread(target=run_warmup, args=(generation,), name='warmup', daemon=True).start()
+
+
+if warmup_enabled:
+    data_listeners.append(schedule_warmup)
+    if data_ready.is_set():
+        schedule_warmup()
+
+if memory_profiling:
+    for callback in app.callback_map.values():
+        if callback.get('callback') is not None:
+            memory_profiler.register(callback['callback'])
+    # the figure functions are called by the figure callbacks, their allocations are reported per figure
+    for figure_function, selector_ids in figure_callbacks.values():
+        memory_profiler.register(figure_function)
+    memory_profiler.start(memory_snapshot_interval)
+
 if __name__ == '__main__':
     app.run_server(debug=True)
\ No newline at end of file
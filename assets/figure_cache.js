@@ -0,0 +1,154 @@
+// Client-side figure memoization: every graph keeps the figures it has already received in a
+// bounded dcc.Store, keyed by (view, selected variables, dataset version). Revisiting a selection
+// renders the cached figure without a server round trip; a miss is forwarded to the server
+// through the "<graph>-request" store and the reply comes back through "<graph>-server".
+// In the approximate mode, the server first replies with a figure estimated from a sample, which
+// is shown but not cached, and the exact figure is requested right after it.
+// The callbacks are triggered by the "view-state" store of views.show: a graph whose view is not
+// the applied one is left as it is, and a mounted graph (PERSISTENT_VIEWS) which already shows
+// the figure of the selection is not updated again.
+// Every request names a cached figure as its base, and the server may reply with the changes from
+// that figure instead of the whole figure, which are applied to a copy of it. When the base figure
+// is no longer cached, the whole figure is requested again. The figure shown before a new dataset
+// version is kept as a base.
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    figure_cache: {
+        applyPatch: function (figure, operations) {
+            // copies only the objects and arrays on the paths of the operations, the cached base is not changed
+            var result = Object.assign({}, figure);
+            var copies = [result];
+            operations.forEach(function (operation) {
+                var path = operation[0];
+                if (!path.length) {
+                    result = operation[1];
+                    return;
+                }
+                var parent = result;
+                for (var i = 0; i < path.length - 1; i++) {
+                    var child = parent[path[i]];
+                    if (copies.indexOf(child) === -1) {
+                        child = Array.isArray(child) ? child.slice() : Object.assign({}, child);
+                        parent[path[i]] = child;
+                        copies.push(child);
+                    }
+                    parent = child;
+                }
+                var last = path[path.length - 1];
+                if (operation.length > 1) {
+                    parent[last] = operation[1];
+                } else if (Array.isArray(parent)) {
+                    parent.length = last;
+                } else {
+                    delete parent[last];
+                }
+            });
+            return result;
+        },
+
+        // the figure which the server may send the changes from
+        patchBase: function (cache) {
+            if (!cache.patches || !cache.keys.length) {
+                return undefined;
+            }
+            return cache.keys.indexOf(cache.shown) !== -1 ? cache.shown : cache.keys[cache.keys.length - 1];
+        },
+
+        dispatch: function (view, server, cache, version, approximate) {
+            var clientside = window.dash_clientside;
+            var self = clientside.figure_cache;
+            var record = clientside.views ? clientside.views.record : function () {};
+            var values = Array.prototype.slice.call(arguments, 5);
+            var triggered = (clientside.callback_context.triggered || []).map(function (x) {
+                return x.prop_id;
+            });
+
+            if (!cache || cache.version !== version) {
+                var kept = cache && cache.shown && cache.figures && cache.figures[cache.shown];
+                var figures = {};
+                if (kept) {
+                    figures[cache.shown] = kept;
+                }
+                cache = Object.assign({view: null, max_entries: 16}, cache, {
+                    version: version,
+                    keys: kept ? [cache.shown] : [],
+                    figures: figures,
+                    pending: null,
+                    shown: null
+                });
+            } else {
+                cache = Object.assign({}, cache, {keys: cache.keys.slice(), figures: Object.assign({}, cache.figures)});
+            }
+
+            var fromServer = triggered.some(function (x) {
+                return x.slice(-'-server.data'.length) === '-server.data';
+            });
+            if (fromServer) {
+                if (!server) {
+                    throw clientside.PreventUpdate;
+                }
+                // a reply to an earlier selection is cached but not shown
+                var current = !server.key || !cache.pending || server.key === cache.pending;
+                if (server.patch) {
+                    var base = cache.figures[server.base];
+                    if (!base) {
+                        if (!current) {
+                            throw clientside.PreventUpdate;
+                        }
+                        return [clientside.no_update, {key: server.key, values: server.values}, cache];
+                    }
+                    server = Object.assign({}, server, {figure: self.applyPatch(base, server.patch)});
+                    record('patches');
+                }
+                if (server.approximate) {
+                    if (!current) {
+                        throw clientside.PreventUpdate;
+                    }
+                    cache.shown = null;
+                    return [server.figure, {key: server.key, values: server.values, base: self.patchBase(cache)}, cache];
+                }
+                if (server.key && server.key.indexOf(JSON.stringify(version)) !== -1) {
+                    cache.keys = cache.keys.filter(function (x) {
+                        return x !== server.key;
+                    });
+                    cache.keys.push(server.key);
+                    cache.figures[server.key] = server.figure;
+                    while (cache.keys.length > cache.max_entries) {
+                        delete cache.figures[cache.keys.shift()];
+                    }
+                }
+                if (current) {
+                    cache.shown = server.key;
+                }
+                return [current ? server.figure : clientside.no_update, clientside.no_update, cache];
+            }
+
+            if (!view || view.data_type !== cache.data_type || values.some(function (x) {
+                return x === null || x === undefined;
+            })) {
+                throw clientside.PreventUpdate;
+            }
+            var key = JSON.stringify([cache.view, values, version]);
+            if (cache.persistent && key === cache.shown) {
+                record('skipped');
+                throw clientside.PreventUpdate;
+            }
+            cache.pending = key;
+            if (Object.prototype.hasOwnProperty.call(cache.figures, key)) {
+                cache.keys = cache.keys.filter(function (x) {
+                    return x !== key;
+                });
+                cache.keys.push(key);
+                cache.shown = key;
+                record('hits');
+                return [cache.figures[key], clientside.no_update, cache];
+            }
+            record('requests');
+            var request = {key: key, values: values, base: self.patchBase(cache)};
+            if (approximate) {
+                request.approximate = true;
+            }
+            return [clientside.no_update, request, cache];
+        }
+    }
+});
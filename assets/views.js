@@ -0,0 +1,116 @@
+// Mounted views: with PERSISTENT_VIEWS, every view is part of the layout and Apply only changes
+// which one is displayed, so that the graphs of the other views keep their figures. The applied
+// data type is written to the "view-state" store, which triggers the figure callbacks; a graph is
+// only updated while its view is shown, and only when its selection changed.
+// The time-to-interactive of every Apply, from the click to the first frame without a pending
+// callback, is sent to /api/timings together with the numbers of server requests, client cache
+// hits, skipped graphs and patched figures.
+
+(function () {
+    var timing = null;
+    var config = null;
+
+    function dashConfig() {
+        if (config === null) {
+            var element = document.getElementById('_dash-config');
+            config = element ? JSON.parse(element.textContent) : {};
+        }
+        return config;
+    }
+
+    function report(current, end) {
+        var clientside = window.dash_clientside;
+        // a static site has no server to report to
+        if (clientside.static_site || !navigator.sendBeacon) {
+            return;
+        }
+        navigator.sendBeacon((dashConfig().requests_pathname_prefix || '/') + 'api/timings', JSON.stringify({
+            mode: current.mode,
+            view: current.view,
+            tti_ms: end - current.start,
+            requests: current.requests,
+            hits: current.hits,
+            skipped: current.skipped,
+            patches: current.patches
+        }));
+    }
+
+    function measure(view, mode) {
+        var current = timing = {
+            view: view, mode: mode, start: performance.now(), requests: 0, hits: 0, skipped: 0, patches: 0
+        };
+        // the renderer sets the document title to update_title while callbacks are pending, the
+        // interaction is complete at the first of a few consecutive frames without one
+        var updating = dashConfig().update_title;
+        var idleSince = null;
+        var idleFrames = 0;
+        var frame = function (now) {
+            if (timing !== current) {
+                return;
+            }
+            if (updating && document.title === updating) {
+                idleSince = null;
+                idleFrames = 0;
+            } else if (idleSince === null) {
+                idleSince = now;
+                idleFrames = 1;
+            } else {
+                idleFrames += 1;
+            }
+            if (idleFrames >= 3) {
+                timing = null;
+                report(current, idleSince);
+            } else if (now - current.start < 60000) {
+                window.requestAnimationFrame(frame);
+            } else {
+                timing = null;
+            }
+        };
+        window.requestAnimationFrame(frame);
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        views: {
+            // counts a figure request, cache hit, skipped graph or patched figure of the current interaction
+            record: function (name) {
+                if (timing) {
+                    timing[name] += 1;
+                }
+            },
+
+            show: function (nClicks, status, dataType, views) {
+                var clientside = window.dash_clientside;
+                if (dataType === null || dataType === undefined) {
+                    throw clientside.PreventUpdate;
+                }
+                var ready = status === 'ready';
+                var clicked = (clientside.callback_context.triggered || []).some(function (x) {
+                    return x.prop_id === 'button.n_clicks';
+                });
+                if (ready && clicked) {
+                    measure(dataType, views.persistent ? 'persistent' : 'replace');
+                }
+                // the clicks make every Apply a new state, which the figure callbacks follow
+                var state = {data_type: ready ? dataType : null, clicks: nClicks || 0};
+                if (!views.persistent) {
+                    return state;
+                }
+                var styles = views.order.map(function (x) {
+                    return {display: ready && x === dataType ? 'block' : 'none'};
+                });
+                styles.push({display: ready ? 'none' : 'block'});
+                return [state].concat(styles);
+            },
+
+            // a click on a churn segment selects the categorical view and passes the [variable, value]
+            // pairs of the segment, the server opens its first variable within the segment
+            drill: function (clickData) {
+                var point = clickData && clickData.points && clickData.points[0];
+                if (!point || !point.customdata) {
+                    throw window.dash_clientside.PreventUpdate;
+                }
+                return ['Categorical', point.customdata[4]];
+            }
+        }
+    });
+})();
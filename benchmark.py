@@ -0,0 +1,75 @@
+import argparse
+import os
+import time
+
+import plotly.io as pio
+
+os.environ.setdefault('WARMUP', 'false')
+
+import app
+
+# Benchmark Cases
+
+cases = {
+    'update_cat_main_body': ('cat-main-body', ['Payment Method', []]),
+    'update_no': ('no', ['Payment Method', []]),
+    'update_yes': ('yes', ['Payment Method', []]),
+    'update_num_main_body': ('num-main-body', ['Total Charges']),
+    'update_catnum_main_body': ('catnum-main-body', ['Contract', 'Tenure']),
+    'update_num2_main_body': ('num2-main-body', ['Tenure', 'Total Charges']),
+    'update_survival_main_body': ('survival-main-body', ['Contract']),
+}
+
+
+# Helper Functions
+
+def request_figure(client, output_id, values, key=None):
+    payload = {
+        'output': '{}-server.data'.format(output_id),
+        'outputs': {'id': '{}-server'.format(output_id), 'property': 'data'},
+        'inputs': [{'id': '{}-request'.format(output_id), 'property': 'data',
+                    'value': {'key': key, 'values': values}}],
+        'changedPropIds': ['{}-request.data'.format(output_id)]
+    }
+    response = client.post('/_dash-update-component', json=payload)
+    if response.status_code != 200:
+        raise RuntimeError('{} returned {}'.format(output_id, response.status_code))
+    return response
+
+
+def time_figure(client, output_id, values, repeat):
+    request_figure(client, output_id, values)
+    start = time.perf_counter()
+    for i in range(repeat):
+        # a distinct key per request bypasses the response cache
+        response = request_figure(client, output_id, values, key='{}-{}'.format(time.time(), i))
+    return (time.perf_counter() - start) / repeat * 1000, len(response.data)
+
+
+def set_fast_serialization(enabled):
+    app.fast_serialization = enabled
+    if enabled and app.orjson is not None:
+        pio.json.config.default_engine = 'orjson'
+    else:
+        pio.json.config.default_engine = 'json'
+
+
+def run_serialization(client, repeat):
+    print('{:<26}{:>12}{:>12}{:>10}{:>12}'.format('Callback', 'Standard', 'Fast', 'Speedup', 'Bytes'))
+    for name, (output_id, values) in cases.items():
+        set_fast_serialization(False)
+        standard_ms, size = time_figure(client, output_id, values, repeat)
+        set_fast_serialization(True)
+        fast_ms, size = time_figure(client, output_id, values, repeat)
+        print('{:<26}{:>9.1f} ms{:>9.1f} ms{:>9.2f}x{:>12}'.format(name, standard_ms, fast_ms,
+                                                                   standard_ms / fast_ms, size))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the figure callbacks of the dashboard.')
+    parser.add_argument('--repeat', type=int, default=20, help='number of requests per callback')
+    args = parser.parse_args()
+
+    app.data_ready.wait()
+    client = app.app.server.test_client()
+    run_serialization(client, args.repeat)
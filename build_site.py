@@ -0,0 +1,237 @@
+import argparse
+import itertools
+import json
+import os
+import re
+import shutil
+
+import dash
+import plotly
+import plotly.io as pio
+from dash.exceptions import PreventUpdate
+from dash.fingerprint import check_fingerprint
+
+os.environ.setdefault('WARMUP', 'false')
+os.environ['BACKGROUND_LOADING'] = 'false'
+os.environ['DATA_RELOAD_INTERVAL'] = '0'
+# the figures are built from the aggregated statistics (histogram bins, box plot quartiles, sampled points) instead
+# of the raw rows, which keeps their JSON compact
+os.environ['AGGREGATED_FIGURES'] = 'true'
+
+import app
+
+# inputs which only trigger a callback, their values are not part of the lookup keys
+trigger_props = {('button', 'n_clicks'), ('data-poll', 'n_intervals'), ('segment-selection', 'data')}
+
+# the chunks which dcc.Graph and dcc.Dropdown load on demand
+component_chunks = ['dash/dcc/async-graph.js', 'dash/dcc/async-dropdown.js', 'dash/dcc/async-plotlyjs.js']
+
+static_script = '''window.dash_clientside = window.dash_clientside || {};
+
+(function () {
+    var names = %s;
+    var callbacks = null;
+
+    // the renderer only accepts the layout and the dependencies with a JSON content type
+    var fetch = window.fetch;
+    window.fetch = function (url, options) {
+        if (typeof url === 'string' && /_dash-(layout|dependencies)$/.test(url)) {
+            url = url + '.json';
+        }
+        return fetch.call(this, url, options);
+    };
+
+    function load() {
+        if (callbacks === null) {
+            callbacks = fetch.call(window, './callbacks.json').then(function (res) { return res.json(); });
+        }
+        return callbacks;
+    }
+
+    function resolve(name, args) {
+        var dc = window.dash_clientside;
+        return load().then(function (all) {
+            var callback = all[name];
+            if (callback.files) {
+                var request = args[0];
+                var file = request && callback.files[JSON.stringify(request.values)];
+                if (!file) {
+                    throw dc.PreventUpdate;
+                }
+                return fetch.call(window, file).then(function (res) { return res.json(); }).then(function (figure) {
+                    return {key: request.key, figure: figure};
+                });
+            }
+            var key = JSON.stringify(callback.args.map(function (i) { return args[i]; }));
+            var value = callback.values[key];
+            if (value === undefined || value === null) {
+                throw dc.PreventUpdate;
+            }
+            var replace = function (x) { return (x && x.__no_update__) ? dc.no_update : x; };
+            return callback.multi ? value.map(replace) : replace(value);
+        });
+    }
+
+    var site = window.dash_clientside.static_site = {};
+    names.forEach(function (name) {
+        site[name] = function () { return resolve(name, Array.prototype.slice.call(arguments)); };
+    });
+})();
+'''
+
+
+# Helper Functions
+
+def to_json(value):
+    return json.dumps(value, cls=plotly.utils.PlotlyJSONEncoder, separators=(',', ':'), ensure_ascii=False)
+
+
+def lookup_key(values):
+    # the same string as JSON.stringify in the browser
+    return json.dumps(values, separators=(',', ':'), ensure_ascii=False)
+
+
+def value_domains():
+    y_values = sorted(set(itertools.chain(*app.all_options_num.values())), key=app.num_var.index)
+    return {
+        ('data-status', 'data'): [None, 'ready'],
+        ('data-version', 'data'): [None, app.data_version],
+        ('data-type', 'value'): app.data_type,
+        ('var', 'value'): app.cat_var + app.num_var,
+        ('cat-var', 'value'): app.cat_var,
+        ('num-var', 'value'): app.num_var,
+        ('x-axis', 'value'): list(app.all_options_num),
+        ('y-axis', 'value'): y_values,
+        ('dataset', 'value'): [app.default_dataset_name],
+        # the site only has the figures of the whole dataset, a click on a churn segment opens its first variable
+        ('segment-filter', 'data'): [[]],
+        ('baseline-dataset', 'value'): [app.default_baseline_name]
+    }
+
+
+def write_file(output, name, content):
+    path = os.path.join(output, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(content.encode('utf-8') if isinstance(content, str) else content)
+
+
+def file_name(graph_id, values):
+    # e.g. the churn segments, which have no selected variables, the empty segment of the categorical figures is left
+    # out
+    name = '_'.join(re.sub(r'[^A-Za-z0-9]+', '-', str(x)).strip('-') for x in values if x != []) or 'all'
+    return 'figures/{}/{}.json'.format(graph_id, name)
+
+
+# Callback Tables
+
+def callback_table(callback, domains):
+    props = [(x['id'], x['property']) for x in callback['inputs'] + callback['state']]
+    keys = [i for i, x in enumerate(props) if x not in trigger_props]
+    if any(props[i] not in domains for i in keys):
+        # e.g. the pages of the customer table, which only a server can answer
+        return {'args': keys, 'multi': isinstance(callback['output'], list), 'values': {}}
+    function = callback['callback'].__wrapped__
+    values = {}
+    for combination in itertools.product(*[domains[props[i]] for i in keys]):
+        args = [1] * len(props)
+        for i, value in zip(keys, combination):
+            args[i] = value
+        try:
+            result = function(*args)
+        except PreventUpdate:
+            continue
+        if isinstance(result, tuple):
+            result = list(result)
+        no_update = {'__no_update__': True}
+        if isinstance(result, list):
+            result = [no_update if x is dash.no_update else x for x in result]
+        elif result is dash.no_update:
+            result = no_update
+        values[lookup_key(list(combination))] = result
+    return {'args': keys, 'multi': isinstance(callback['output'], list), 'values': values}
+
+
+def figure_files(output, graph_id):
+    figure_function = app.figure_callbacks[graph_id][0]
+    files = {}
+    for selection_graph, values in app.figure_selections():
+        if selection_graph == graph_id:
+            name = file_name(graph_id, values)
+            write_file(output, name, pio.to_json(figure_function(None, *values), validate=False))
+            files[lookup_key(values + [app.default_dataset_name])] = './' + name
+    return {'files': files}
+
+
+# Site Build
+
+def build(output, source_maps=False):
+    client = app.app.server.test_client()
+    server_outputs = {'{}-server.data'.format(x): x for x in app.figure_callbacks}
+    domains = value_domains()
+
+    dependencies = client.get('/_dash-dependencies').get_json()
+    callbacks = {}
+    for i, dependency in enumerate(dependencies):
+        if dependency['clientside_function'] is None:
+            name = 'callback_{}'.format(i)
+            dependency['clientside_function'] = {'namespace': 'static_site', 'function_name': name}
+            if dependency['output'] in server_outputs:
+                callbacks[name] = figure_files(output, server_outputs[dependency['output']])
+            else:
+                callbacks[name] = callback_table(app.app.callback_map[dependency['output']], domains)
+    write_file(output, '_dash-dependencies.json', to_json(dependencies))
+    write_file(output, '_dash-layout.json', client.get('/_dash-layout').get_data())
+    write_file(output, 'callbacks.json', to_json(callbacks))
+    write_file(output, 'static_site.js', static_script % json.dumps(sorted(callbacks)))
+
+    # the scripts of the index page, without their cache-busting fingerprints, and the chunks which the
+    # components load on demand
+    index = client.get('/').get_data(as_text=True)
+    paths = {}
+    for path in re.findall(r'(?:src|href)="/([^/"?][^"?]*)', index):
+        paths[path] = check_fingerprint(path)[0]
+    for path in component_chunks:
+        paths['_dash-component-suites/' + path] = '_dash-component-suites/' + path
+    if source_maps:
+        for path in list(paths.values()):
+            paths[path + '.map'] = path + '.map'
+    for path, name in paths.items():
+        response = client.get('/' + path)
+        if response.status_code == 200:
+            write_file(output, name, response.get_data())
+            index = re.sub(r'((?:src|href)=")/{}(\?[^"]*)?"'.format(re.escape(path)), r'\1./{}"'.format(name), index)
+
+    index = index.replace('"requests_pathname_prefix":"/"', '"requests_pathname_prefix":"./"')
+    index = index.replace('<script src="./', '<script src="./static_site.js"></script>\n<script src="./', 1)
+    write_file(output, 'index.html', index)
+
+
+def bundle_size(output):
+    sizes = {}
+    for root, dirs, files in os.walk(output):
+        for name in files:
+            path = os.path.join(root, name)
+            part = os.path.relpath(path, output).split(os.sep)[0]
+            sizes[part] = sizes.get(part, 0) + os.path.getsize(path)
+    return sizes
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the dashboard as a static site with precomputed figures.')
+    parser.add_argument('--output', default='site', help='output directory (default: site)')
+    parser.add_argument('--source-maps', action='store_true', help='include the source maps of the scripts')
+    args = parser.parse_args()
+
+    if app.data_error is not None:
+        parser.error('the dataset could not be loaded: {}'.format(app.data_error))
+
+    # the files of a previous build, e.g. the figures of selections which no longer exist, are not kept
+    for name in ('figures', '_dash-component-suites', 'assets'):
+        shutil.rmtree(os.path.join(args.output, name), ignore_errors=True)
+    build(args.output, source_maps=args.source_maps)
+
+    sizes = bundle_size(args.output)
+    for part, size in sorted(sizes.items(), key=lambda x: -x[1]):
+        print('{:<32}{:>12,} bytes'.format(part, size))
+    print('{:<32}{:>12,} bytes'.format('Total', sum(sizes.values())))
@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+
+
+# Feature Encoding
+
+class FeatureEncoder:
+
+    def __init__(self, cat_var, num_var):
+        self.cat_var = list(cat_var)
+        self.num_var = list(num_var)
+        self.categories = {}
+        self.means = {}
+        self.stds = {}
+        self.feature_names = []
+
+    def fit(self, frame):
+        self.feature_names = []
+        for i in self.cat_var:
+            self.categories[i] = sorted(frame[i].dropna().astype(str).unique())
+            self.feature_names += ['{} = {}'.format(i, x) for x in self.categories[i]]
+        for i in self.num_var:
+            values = frame[i].astype('float64')
+            self.means[i] = values.mean()
+            self.stds[i] = values.std() or 1.0
+            self.feature_names.append(i)
+        return self
+
+    def transform(self, frame):
+        missing = [x for x in self.cat_var + self.num_var if x not in frame.columns]
+        if missing:
+            raise KeyError('Missing fields: {}'.format(', '.join(missing)))
+        matrix = np.zeros((len(frame), len(self.feature_names)))
+        offset = 0
+        for i in self.cat_var:
+            codes = pd.Categorical(frame[i].astype(str), categories=self.categories[i]).codes
+            rows = np.flatnonzero(codes >= 0)
+            matrix[rows, offset + codes[rows]] = 1.0
+            offset += len(self.categories[i])
+        for i in self.num_var:
+            values = pd.to_numeric(frame[i], errors='coerce').astype('float64').values
+            matrix[:, offset] = np.nan_to_num((values - self.means[i]) / self.stds[i])
+            offset += 1
+        return matrix
+
+
+# Logistic Regression
+
+def sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-np.clip(x, -500, 500)))
+
+
+class ChurnModel:
+
+    def __init__(self, encoder, l2=1.0):
+        self.encoder = encoder
+        self.l2 = l2
+        self.coef = None
+        self.intercept = 0.0
+        self.iterations = 0
+
+    def fit(self, frame, max_iter=50, tol=1e-8):
+        self.encoder.fit(frame)
+        matrix = self.encoder.transform(frame)
+        target = (frame['Churn'].values == 'Yes').astype('float64')
+
+        # Newton-Raphson (IRLS) on the L2-penalised log-likelihood, the intercept is not penalised
+        design = np.hstack([np.ones((len(matrix), 1)), matrix])
+        penalty = np.full(design.shape[1], self.l2)
+        penalty[0] = 0.0
+        weights = np.zeros(design.shape[1])
+        for self.iterations in range(1, max_iter + 1):
+            prob = sigmoid(design @ weights)
+            gradient = design.T @ (prob - target) + penalty * weights
+            hessian = (design * (prob * (1 - prob))[:, None]).T @ design + np.diag(penalty + 1e-9)
+            step = np.linalg.solve(hessian, gradient)
+            weights -= step
+            if np.abs(step).max() < tol:
+                break
+        self.intercept = weights[0]
+        self.coef = weights[1:]
+        return self
+
+    def predict_proba(self, frame):
+        return sigmoid(self.encoder.transform(frame) @ self.coef + self.intercept)
+
+    def top_features(self, n=10):
+        order = np.argsort(-np.abs(self.coef))[:n]
+        return [{'feature': self.encoder.feature_names[x], 'weight': float(self.coef[x])} for x in order]
@@ -0,0 +1,479 @@
+import queue
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+table_name = 'customers'
+id_column = 'Customer ID'
+box_quartiles = (1, 2, 3)
+sort_cache_size = 8
+count_cache_size = 256
+comparison_operators = {'eq': '=', 'ne': '!=', 'lt': '<', 'le': '<=', 'gt': '>', 'ge': '>='}
+
+
+# Helper Functions
+
+def box_fences(values, q1, q3):
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return inside.min(), inside.max()
+
+
+def prefix_upper_bound(prefix):
+    # every string starting with the prefix sorts below this bound
+    return prefix + '\U0010ffff'
+
+
+def column_dtype(declared):
+    # the dtype of a column declared by to_sql (sqlite) or inferred by duckdb, so that the variables are split by the
+    # schema of the whole table instead of the values of a few rows
+    declared = (declared or '').upper()
+    if 'INT' in declared:
+        return 'int64'
+    elif any(x in declared for x in ('REAL', 'FLOA', 'DOUB', 'DEC', 'NUMERIC')):
+        return 'float64'
+    elif declared.startswith('BOOL'):
+        return 'bool'
+    else:
+        return 'object'
+
+
+def interpolate_quartile(low, high, n, k):
+    frac = (k * (n - 1) % 4) / 4
+    if (high is None) or (frac == 0):
+        return low
+    else:
+        return low + frac * (high - low)
+
+
+# Pandas Data Source
+
+class PandasSource:
+    name = 'pandas'
+    aggregated = False
+
+    def __init__(self, df, aggregated=None):
+        self.df = df
+        # the figures are drawn from the aggregated statistics instead of the rows when set
+        if aggregated is not None:
+            self.aggregated = aggregated
+        self.id_index = None
+        self.id_order = None
+        self.sort_orders = {}
+        self.column_codes = {}
+        self.lock = threading.Lock()
+
+    def churn_classes(self):
+        return list(self.df['Churn'].unique())
+
+    def churn_counts(self):
+        table = pd.DataFrame(self.df.groupby('Churn')['Churn'].count())
+        return table.rename(columns={'Churn': 'Count'}).reset_index()
+
+    def category_counts(self, column, churn=None):
+        data = self.df if churn is None else self.df.loc[self.df['Churn'] == churn]
+        counts = data.groupby(['Churn', column], sort=False).size().rename('Count').reset_index()
+        return counts.sort_values('Count', ascending=False, kind='stable').reset_index(drop=True)
+
+    def histogram(self, column, start, size):
+        data = self.df[['Churn', column]].dropna()
+        counts = (np.floor((data[column] - start) / size)).astype('int64').rename('Bin')
+        hist = data[['Churn']].join(counts).groupby(['Churn', 'Bin']).size().rename('Count').reset_index()
+        hist['Start'] = start + hist['Bin'] * size
+        return hist[['Churn', 'Start', 'Count']]
+
+    def box_stats(self, cat_column, num_column):
+        rows = []
+        for (churn, category), values in self.df.groupby(['Churn', cat_column], sort=False)[num_column]:
+            values = values.dropna()
+            q1, median, q3 = values.quantile([0.25, 0.5, 0.75]).values
+            lowerfence, upperfence = box_fences(values, q1, q3)
+            rows.append({'Churn': churn, cat_column: category, 'Count': len(values), 'Q1': q1, 'Median': median,
+                         'Q3': q3, 'Lower Fence': lowerfence, 'Upper Fence': upperfence})
+        return pd.DataFrame(rows)
+
+    def survival_counts(self, column, time_column='Tenure'):
+        data = self.df[[column, time_column]].assign(Events=(self.df['Churn'] == 'Yes'))
+        counts = data.groupby([column, time_column]).agg(Events=('Events', 'sum'), Count=('Events', 'size'))
+        return counts.reset_index().rename(columns={time_column: 'Tenure'})
+
+    def frame(self, columns):
+        return self.df[columns]
+
+    def column_chunks(self, columns, chunk_size):
+        data = self.df[columns]
+        for start in range(0, len(data), chunk_size):
+            yield data.iloc[start:start + chunk_size]
+
+    # Customer Records
+
+    def sorted_ids(self):
+        # built once per dataset, a lookup is then two binary searches
+        if self.id_index is None:
+            with self.lock:
+                if self.id_index is None:
+                    ids = self.df[id_column].values.astype(str)
+                    self.id_order = np.argsort(ids, kind='stable')
+                    self.id_index = ids[self.id_order]
+        return self.id_index
+
+    def customer_rows(self, customer_id):
+        index = self.sorted_ids()
+        return self.id_order[np.searchsorted(index, customer_id, 'left'):np.searchsorted(index, customer_id, 'right')]
+
+    def customer_ids(self, prefix, limit):
+        index = self.sorted_ids()
+        start = np.searchsorted(index, prefix, 'left')
+        end = min(np.searchsorted(index, prefix_upper_bound(prefix), 'left'), start + limit)
+        return index[start:end].tolist()
+
+    def sort_order(self, sort_by):
+        key = tuple(sort_by)
+        with self.lock:
+            order = self.sort_orders.get(key)
+        if order is None:
+            columns = [x for x, y in sort_by]
+            order = self.df[columns].reset_index(drop=True).sort_values(
+                columns, ascending=[y for x, y in sort_by], kind='stable').index.values
+            with self.lock:
+                if len(self.sort_orders) >= sort_cache_size:
+                    del self.sort_orders[next(iter(self.sort_orders))]
+                self.sort_orders[key] = order
+        return order
+
+    def factorized(self, column):
+        # the conditions on a text column are evaluated once per distinct value instead of once per row
+        if column not in self.column_codes:
+            codes, uniques = pd.factorize(self.df[column])
+            with self.lock:
+                self.column_codes[column] = codes, pd.Series(uniques)
+        return self.column_codes[column]
+
+    def filter_mask(self, filters):
+        mask = np.ones(len(self.df), dtype=bool)
+        for column, operator, value in filters:
+            if (column == id_column) and (operator == 'eq'):
+                matched = np.zeros(len(self.df), dtype=bool)
+                matched[self.customer_rows(str(value))] = True
+                mask &= matched
+                continue
+            if self.df[column].dtype == 'object':
+                codes, values = self.factorized(column)
+            else:
+                codes, values = None, self.df[column]
+            if operator in comparison_operators:
+                matched = {'eq': values == value, 'ne': values != value, 'lt': values < value, 'le': values <= value,
+                           'gt': values > value, 'ge': values >= value}[operator].values
+            elif operator == 'contains':
+                matched = values.astype(str).str.contains(str(value), case=False, regex=False).values
+            elif operator == 'datestartswith':
+                matched = values.astype(str).str.startswith(str(value)).values
+            else:
+                continue
+            # the code of missing values is -1, which never matches
+            mask &= matched[codes] & (codes >= 0) if codes is not None else matched
+        return mask
+
+    def records(self, filters, sort_by, offset, limit):
+        mask = self.filter_mask(filters) if filters else None
+        if sort_by:
+            rows = self.sort_order(sort_by)
+            if mask is not None:
+                rows = rows[mask[rows]]
+        else:
+            rows = np.flatnonzero(mask) if mask is not None else np.arange(len(self.df))
+        return self.df.iloc[rows[offset:offset + limit]], len(rows)
+
+    def subset(self, filters):
+        return PandasSource(self.df.loc[self.filter_mask(filters)].reset_index(drop=True), self.aggregated)
+
+    def training_frame(self, limit=None):
+        if (limit is None) or (len(self.df) <= limit):
+            return self.df
+        else:
+            return self.df.sample(n=limit, random_state=0)
+
+    def points(self, x_column, y_column, churn, limit=None):
+        data = self.df.loc[self.df['Churn'] == churn, [x_column, y_column]]
+        return data if limit is None else data.head(limit)
+
+
+# SQL Data Source
+
+class ConnectionPool:
+
+    def __init__(self, connect, size):
+        self.connect = connect
+        self.connections = queue.LifoQueue(maxsize=size)
+        self.semaphore = threading.BoundedSemaphore(size)
+
+    @contextmanager
+    def connection(self):
+        with self.semaphore:
+            try:
+                con = self.connections.get_nowait()
+            except queue.Empty:
+                con = self.connect()
+            try:
+                yield con
+            finally:
+                self.connections.put_nowait(con)
+
+
+class SQLSource:
+    aggregated = True
+
+    def __init__(self, path, engine='sqlite', pool_size=4):
+        if (engine == 'duckdb') and (duckdb is None):
+            raise ValueError('The duckdb engine requires the duckdb package')
+        elif engine not in ('sqlite', 'duckdb'):
+            raise ValueError('Unsupported SQL engine: {}'.format(engine))
+        self.name = engine
+        self.path = path
+        self.columns = []
+        # the number of rows of every filter of the record table, which every page of the filter needs
+        self.counts = OrderedDict()
+        self.counts_lock = threading.Lock()
+        if engine == 'duckdb':
+            self.database = None
+            self.database_lock = threading.Lock()
+            self.pool = ConnectionPool(lambda: self.duckdb_database().cursor(), pool_size)
+        else:
+            self.pool = ConnectionPool(
+                lambda: sqlite3.connect(self.path, check_same_thread=False, cached_statements=256), pool_size)
+
+    def duckdb_database(self):
+        # the cursors of the pool share one database connection, opened by the first of them
+        with self.database_lock:
+            if self.database is None:
+                self.database = duckdb.connect(self.path)
+            return self.database
+
+    def floor(self, expression):
+        if self.name == 'duckdb':
+            return 'CAST(FLOOR({}) AS BIGINT)'.format(expression)
+        else:
+            return 'CAST({} AS INTEGER)'.format(expression)
+
+    def like(self):
+        return 'ILIKE' if self.name == 'duckdb' else 'LIKE'
+
+    def quote(self, column):
+        if column not in self.columns:
+            raise KeyError(column)
+        return '"{}"'.format(column.replace('"', '""'))
+
+    def query(self, sql, params=()):
+        with self.pool.connection() as con:
+            return con.execute(sql, params).fetchall()
+
+    # Ingestion
+
+    def stored_version(self):
+        try:
+            rows = self.query('SELECT value FROM dataset_meta WHERE key = ?', ('version',))
+        except Exception:
+            return None
+        return rows[0][0] if rows else None
+
+    def ingest(self, chunks, version):
+        with self.pool.connection() as con:
+            con.execute('DROP TABLE IF EXISTS {}'.format(table_name))
+            con.execute('DROP TABLE IF EXISTS dataset_meta')
+            for i, chunk in enumerate(chunks):
+                if self.name == 'duckdb':
+                    con.register('chunk', chunk)
+                    if i == 0:
+                        con.execute('CREATE TABLE {} AS SELECT * FROM chunk'.format(table_name))
+                    else:
+                        con.execute('INSERT INTO {} SELECT * FROM chunk'.format(table_name))
+                    con.unregister('chunk')
+                else:
+                    chunk.to_sql(table_name, con, if_exists='append', index=False)
+            con.execute('CREATE TABLE dataset_meta (key TEXT, value TEXT)')
+            con.execute('INSERT INTO dataset_meta VALUES (?, ?)', ('version', version))
+            con.commit()
+        with self.counts_lock:
+            self.counts.clear()
+
+    def create_index(self):
+        # the customer id lookups of the record table, also for databases ingested before the index existed
+        with self.pool.connection() as con:
+            con.execute('CREATE INDEX IF NOT EXISTS {0}_id ON {0} ("{1}")'.format(table_name, id_column))
+            con.commit()
+
+    def schema(self):
+        # an empty frame with the columns and dtypes of the table
+        rows = self.query('PRAGMA table_info({})'.format(table_name))
+        self.columns = [x[1] for x in rows]
+        return pd.DataFrame({x[1]: pd.Series(dtype=column_dtype(x[2])) for x in rows})
+
+    # Aggregations
+
+    def churn_classes(self):
+        rows = self.query('SELECT DISTINCT "Churn" FROM {} ORDER BY "Churn"'.format(table_name))
+        return [x[0] for x in rows]
+
+    def churn_counts(self):
+        rows = self.query('SELECT "Churn", COUNT(*) FROM {} GROUP BY "Churn" ORDER BY "Churn"'.format(table_name))
+        return pd.DataFrame(rows, columns=['Churn', 'Count'])
+
+    def category_counts(self, column, churn=None):
+        column_sql = self.quote(column)
+        if churn is None:
+            rows = self.query(
+                'SELECT "Churn", {0}, COUNT(*) AS n FROM {1} GROUP BY "Churn", {0} ORDER BY n DESC, {0}'.format(
+                    column_sql, table_name))
+        else:
+            rows = self.query(
+                'SELECT "Churn", {0}, COUNT(*) AS n FROM {1} WHERE "Churn" = ? GROUP BY "Churn", {0} '
+                'ORDER BY n DESC, {0}'.format(column_sql, table_name), (churn,))
+        return pd.DataFrame(rows, columns=['Churn', column, 'Count'])
+
+    def histogram(self, column, start, size):
+        bin_sql = self.floor('({} - ?) / ?'.format(self.quote(column)))
+        rows = self.query(
+            'SELECT "Churn", {0} AS bin, COUNT(*) FROM {1} WHERE {2} IS NOT NULL GROUP BY "Churn", bin '
+            'ORDER BY "Churn", bin'.format(bin_sql, table_name, self.quote(column)), (start, size))
+        hist = pd.DataFrame(rows, columns=['Churn', 'Bin', 'Count'])
+        hist['Start'] = start + hist['Bin'] * size
+        return hist[['Churn', 'Start', 'Count']]
+
+    def box_stats(self, cat_column, num_column):
+        cat_sql = self.quote(cat_column)
+        num_sql = self.quote(num_column)
+        quartile_sql = ', '.join(
+            'MAX(CASE WHEN rn = {0} THEN value END), MAX(CASE WHEN rn = {0} + 1 THEN value END)'.format(
+                self.floor('{} * (n - 1) / 4.0'.format(k))) for k in box_quartiles)
+        rows = self.query(
+            'WITH ranked AS ('
+            'SELECT "Churn" AS churn, {0} AS category, {1} AS value, '
+            'ROW_NUMBER() OVER (PARTITION BY "Churn", {0} ORDER BY {1}) - 1 AS rn, '
+            'COUNT(*) OVER (PARTITION BY "Churn", {0}) AS n '
+            'FROM {2} WHERE {1} IS NOT NULL) '
+            'SELECT churn, category, MIN(n), {3} FROM ranked GROUP BY churn, category '
+            'ORDER BY churn, category'.format(cat_sql, num_sql, table_name, quartile_sql))
+        fence_sql = ('SELECT MIN({1}), MAX({1}) FROM {2} WHERE "Churn" = ? AND {0} = ? AND {1} BETWEEN ? AND ?'.format(
+            cat_sql, num_sql, table_name))
+        stats = []
+        with self.pool.connection() as con:
+            for row in rows:
+                churn, category, n = row[:3]
+                q1, median, q3 = [interpolate_quartile(row[1 + 2 * k], row[2 + 2 * k], n, k) for k in box_quartiles]
+                iqr = q3 - q1
+                lowerfence, upperfence = con.execute(fence_sql,
+                                                     (churn, category, q1 - 1.5 * iqr, q3 + 1.5 * iqr)).fetchone()
+                stats.append({'Churn': churn, cat_column: category, 'Count': n, 'Q1': q1, 'Median': median,
+                              'Q3': q3, 'Lower Fence': lowerfence, 'Upper Fence': upperfence})
+        return pd.DataFrame(stats)
+
+    def survival_counts(self, column, time_column='Tenure'):
+        rows = self.query(
+            'SELECT {0}, {1}, SUM(CASE WHEN "Churn" = ? THEN 1 ELSE 0 END), COUNT(*) FROM {2} '
+            'GROUP BY {0}, {1}'.format(self.quote(column), self.quote(time_column), table_name), ('Yes',))
+        return pd.DataFrame(rows, columns=[column, 'Tenure', 'Events', 'Count'])
+
+    def frame(self, columns):
+        sql = 'SELECT {} FROM {}'.format(', '.join(self.quote(x) for x in columns), table_name)
+        with self.pool.connection() as con:
+            cursor = con.execute(sql)
+            if self.name == 'duckdb':
+                return cursor.df()
+            else:
+                return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def column_chunks(self, columns, chunk_size):
+        sql = 'SELECT {} FROM {}'.format(', '.join(self.quote(x) for x in columns), table_name)
+        with self.pool.connection() as con:
+            cursor = con.execute(sql)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    return
+                yield pd.DataFrame(rows, columns=columns)
+
+    # Customer Records
+
+    def customer_ids(self, prefix, limit):
+        # a range scan of the index created by ingest()
+        id_sql = self.quote(id_column)
+        rows = self.query('SELECT {0} FROM {1} WHERE {0} >= ? AND {0} < ? ORDER BY {0} LIMIT ?'.format(
+            id_sql, table_name), (prefix, prefix_upper_bound(prefix), limit))
+        return [x[0] for x in rows]
+
+    def where_clause(self, filters):
+        where = []
+        params = []
+        for column, operator, value in filters:
+            column_sql = self.quote(column)
+            if operator in comparison_operators:
+                where.append('{} {} ?'.format(column_sql, comparison_operators[operator]))
+                params.append(value)
+            elif operator in ('contains', 'datestartswith'):
+                pattern = str(value).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+                pattern = ('%' + pattern + '%') if operator == 'contains' else (pattern + '%')
+                where.append("CAST({} AS VARCHAR) {} ? ESCAPE '\\'".format(column_sql, self.like()))
+                params.append(pattern)
+        return (' WHERE ' + ' AND '.join(where)) if where else '', params
+
+    def records(self, filters, sort_by, offset, limit):
+        where_sql, params = self.where_clause(filters)
+        # the customer id breaks ties, and orders the unsorted table, so that every row keeps its page
+        order = ['{} {}'.format(self.quote(x), 'ASC' if y else 'DESC') for x, y in sort_by] + [self.quote(id_column)]
+        order_sql = ' ORDER BY ' + ', '.join(order)
+        total = self.count(where_sql, params)
+        with self.pool.connection() as con:
+            cursor = con.execute('SELECT * FROM {}{}{} LIMIT ? OFFSET ?'.format(table_name, where_sql, order_sql),
+                                 params + [limit, offset])
+            columns = [x[0] for x in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns), total
+
+    def count(self, where_sql, params):
+        key = (where_sql, tuple(params))
+        with self.counts_lock:
+            total = self.counts.get(key)
+            if total is not None:
+                self.counts.move_to_end(key)
+                return total
+        total = self.query('SELECT COUNT(*) FROM {}{}'.format(table_name, where_sql), params)[0][0]
+        with self.counts_lock:
+            self.counts[key] = total
+            while len(self.counts) > count_cache_size:
+                self.counts.popitem(last=False)
+        return total
+
+    def subset(self, filters):
+        # the rows of a segment, as an in-memory source
+        where_sql, params = self.where_clause(filters)
+        with self.pool.connection() as con:
+            cursor = con.execute('SELECT * FROM {}{}'.format(table_name, where_sql), params)
+            columns = [x[0] for x in cursor.description]
+            return PandasSource(pd.DataFrame(cursor.fetchall(), columns=columns), aggregated=True)
+
+    def training_frame(self, limit=None):
+        sql = 'SELECT * FROM {}'.format(table_name)
+        with self.pool.connection() as con:
+            if limit is None:
+                cursor = con.execute(sql)
+            else:
+                cursor = con.execute(sql + ' ORDER BY RANDOM() LIMIT ?', (limit,))
+            columns = [x[0] for x in cursor.description]
+            return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def points(self, x_column, y_column, churn, limit=None):
+        sql = 'SELECT {0}, {1} FROM {2} WHERE "Churn" = ?'.format(self.quote(x_column), self.quote(y_column),
+                                                                   table_name)
+        if limit is None:
+            rows = self.query(sql, (churn,))
+        else:
+            rows = self.query(sql + ' LIMIT ?', (churn, limit))
+        return pd.DataFrame(rows, columns=[x_column, y_column])
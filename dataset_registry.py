@@ -0,0 +1,139 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# Dataset
+
+class Dataset:
+
+    def __init__(self, name, path, version, mtime, df, source, columns, cat_var, num_var, churn_table):
+        self.name = name
+        self.path = path
+        self.version = version
+        self.mtime = mtime
+        self.df = df
+        self.source = source
+        self.all_var = columns
+        self.cat_var = cat_var
+        self.num_var = num_var
+        self.all_options_num = {x: [y for y in num_var if y != x] for x in num_var}
+        self.churn_table = churn_table
+        self.churned_cust = churn_table.loc[churn_table['Churn'] == 'Yes', 'Count'].values[0]
+        self.total_cust = self.churned_cust + churn_table.loc[churn_table['Churn'] == 'No', 'Count'].values[0]
+        self.churn_rate = (self.churned_cust / self.total_cust) * 100
+        # the rows of the SQL backends stay in the database file, only the in-memory frames count
+        self.memory_bytes = int(df.memory_usage(deep=True).sum()) if df is not None else 0
+
+
+# Dataset Registry
+
+class DatasetRegistry:
+
+    def __init__(self, paths, loader, memory_budget, on_evict=None):
+        self.paths = dict(paths)
+        self.loader = loader
+        self.memory_budget = memory_budget
+        self.on_evict = on_evict
+        self.datasets = OrderedDict()
+        self.pinned = set()
+        self.lock = threading.Lock()
+        self.load_locks = {x: threading.Lock() for x in self.paths}
+        self.stats = {x: self.new_stats() for x in self.paths}
+
+    @staticmethod
+    def new_stats():
+        return {'hits': 0, 'loads': 0, 'load_seconds': 0.0, 'last_load_seconds': None, 'evictions': 0}
+
+    def names(self):
+        return sorted(self.paths)
+
+    def versions(self):
+        with self.lock:
+            return {x.version for x in self.datasets.values()}
+
+    def memory_bytes(self):
+        return sum(x.memory_bytes for x in self.datasets.values())
+
+    def put(self, dataset, pinned=False, load_seconds=None):
+        with self.lock:
+            if dataset.name not in self.paths:
+                self.paths[dataset.name] = dataset.path
+                self.load_locks[dataset.name] = threading.Lock()
+                self.stats[dataset.name] = self.new_stats()
+            if load_seconds is not None:
+                self.record_load(dataset.name, load_seconds)
+            previous = self.datasets.pop(dataset.name, None)
+            self.datasets[dataset.name] = dataset
+            if pinned:
+                self.pinned.add(dataset.name)
+            evicted = self.evict(dataset.name)
+        self.notify(evicted, previous if (previous is not None) and (previous.version != dataset.version) else None)
+
+    def get(self, name):
+        if name not in self.paths:
+            raise KeyError('Unknown dataset: {}'.format(name))
+        dataset = self.lookup(name)
+        if dataset is not None:
+            return dataset
+        with self.load_locks[name]:
+            # another request may have loaded the dataset while this one was waiting
+            dataset = self.lookup(name)
+            if dataset is not None:
+                return dataset
+            start = time.perf_counter()
+            dataset = self.loader(name, self.paths[name])
+            elapsed = time.perf_counter() - start
+            with self.lock:
+                self.record_load(name, elapsed)
+                previous = self.datasets.pop(name, None)
+                self.datasets[name] = dataset
+                evicted = self.evict(name)
+            self.notify(evicted, previous)
+            return dataset
+
+    def record_load(self, name, seconds):
+        stats = self.stats[name]
+        stats['loads'] += 1
+        stats['load_seconds'] += seconds
+        stats['last_load_seconds'] = seconds
+
+    def lookup(self, name):
+        with self.lock:
+            dataset = self.datasets.get(name)
+            if dataset is None:
+                return None
+            self.datasets.move_to_end(name)
+            self.stats[name]['hits'] += 1
+            return dataset
+
+    def evict(self, keep):
+        evicted = []
+        while self.memory_bytes() > self.memory_budget:
+            candidates = [x for x in self.datasets if (x != keep) and (x not in self.pinned)]
+            if not candidates:
+                break
+            dataset = self.datasets.pop(candidates[0])
+            self.stats[dataset.name]['evictions'] += 1
+            evicted.append(dataset)
+        return evicted
+
+    def notify(self, evicted, replaced=None):
+        # a dataset replaced by a new version of itself is notified apart from the evicted ones, as what is kept
+        # per dataset name stays valid
+        if self.on_evict is not None:
+            for dataset in evicted:
+                self.on_evict(dataset, replaced=False)
+            if replaced is not None:
+                self.on_evict(replaced, replaced=True)
+
+    def snapshot(self):
+        with self.lock:
+            return dict(
+                memory_bytes=self.memory_bytes(),
+                memory_budget=self.memory_budget,
+                loaded=list(self.datasets),
+                datasets={x: dict(self.stats[x], loaded=(x in self.datasets), pinned=(x in self.pinned),
+                                  memory_bytes=self.datasets[x].memory_bytes if x in self.datasets else 0)
+                          for x in self.names()}
+            )
@@ -0,0 +1,163 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import plotly.io as pio
+
+try:
+    import kaleido
+except ImportError:
+    kaleido = None
+
+os.environ.setdefault('WARMUP', 'false')
+os.environ['BACKGROUND_LOADING'] = 'false'
+os.environ['DATA_RELOAD_INTERVAL'] = '0'
+
+import app
+
+export_formats = ('png', 'svg', 'pdf')
+manifest_name = 'manifest.json'
+# the settings of the dashboard which change its figures
+figure_settings = ('data_backend', 'aggregated_figures', 'histogram_bins', 'sketch_k', 'exact_quantiles',
+                   'scatter_limit', 'approximate_sample_size', 'segment_min_support', 'segment_max_order',
+                   'segment_top_k')
+
+
+# Helper Functions
+
+def file_name(graph_id, values, fmt):
+    # e.g. the churn segments, which have no selected variables, the empty segment of the categorical figures is left
+    # out
+    name = '_'.join(re.sub(r'[^A-Za-z0-9]+', '-', str(x)).strip('-') for x in values if x != []) or 'all'
+    return os.path.join(graph_id, '{}.{}'.format(name, fmt))
+
+
+def build_figure(graph_id, values, background):
+    figure_function = app.figure_callbacks[graph_id][0]
+    fig = figure_function(None, *values)
+    fig = dict(fig) if isinstance(fig, dict) else fig.to_dict()
+    # the dashboard draws the figures on transparent cards, the exported files get an opaque background
+    fig['layout'] = dict(fig.get('layout', {}), paper_bgcolor=background)
+    return fig
+
+
+def source_version():
+    # the figures change with the code which draws them as well as with the data
+    sha1 = hashlib.sha1()
+    for module in ('app', 'data_source', 'quantile_sketch', 'segments', 'survival'):
+        with open(os.path.join(os.path.dirname(os.path.abspath(app.__file__)), module + '.py'), 'rb') as f:
+            sha1.update(f.read())
+    return sha1.hexdigest()
+
+
+def fingerprint(graph_id, values, fmt, options, version):
+    # the inputs of a figure, so that an unchanged figure is neither built nor rendered
+    settings = {x: getattr(app, x) for x in figure_settings}
+    content = json.dumps([app.data_version, version, settings, graph_id, values, fmt, options], sort_keys=True)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+def load_manifest(output):
+    try:
+        with open(os.path.join(output, manifest_name)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {'files': {}}
+
+
+def save_manifest(output, manifest):
+    with open(os.path.join(output, manifest_name), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+# Rendering
+
+def render(graph_id, values, fmt, path, options):
+    fig = build_figure(graph_id, values, options['background'])
+    if getattr(pio.kaleido.scope, 'mathjax', None) is not None:
+        # MathJax is fetched from a CDN, which is neither needed nor reachable offline
+        pio.kaleido.scope.mathjax = None
+    image = pio.to_image(fig, format=fmt, width=options['width'], height=options['height'],
+                         scale=options['scale'], validate=False)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(image)
+    os.replace(path + '.tmp', path)
+
+
+def export(output, formats, workers, options, force=False):
+    manifest = load_manifest(output)
+    if force or (manifest.get('options') != options):
+        manifest['files'] = {}
+    files = {}
+    stats = {'rendered': 0, 'cached': 0, 'failed': 0}
+
+    start = time.perf_counter()
+    version = source_version()
+    names = set()
+    # the workers import the dashboard again instead of forking it, a fork would copy the locks of its threads
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        futures = {}
+        for graph_id, values in app.figure_selections():
+            for fmt in formats:
+                name = file_name(graph_id, values, fmt)
+                path = os.path.join(output, name)
+                key = fingerprint(graph_id, values, fmt, options, version)
+                names.add(name)
+                if (manifest['files'].get(name) == key) and os.path.exists(path):
+                    files[name] = key
+                    stats['cached'] += 1
+                else:
+                    futures[executor.submit(render, graph_id, values, fmt, path, options)] = (name, key)
+        for future in as_completed(futures):
+            name, key = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                stats['failed'] += 1
+                print('Failed to render {}: {}'.format(name, e))
+            else:
+                files[name] = key
+                stats['rendered'] += 1
+
+    # files of selections which no longer exist in the dataset are removed
+    for name in set(manifest['files']) - names:
+        try:
+            os.remove(os.path.join(output, name))
+        except OSError:
+            pass
+
+    save_manifest(output, {'data_version': app.data_version, 'options': options, 'files': files})
+    stats['seconds'] = time.perf_counter() - start
+    return stats
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Render every figure of the dashboard to image files.')
+    parser.add_argument('--output', default='report', help='output directory (default: report)')
+    parser.add_argument('--format', nargs='+', choices=export_formats, default=['png'], dest='formats',
+                        help='output formats (default: png)')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of rendering processes')
+    parser.add_argument('--width', type=int, default=900, help='image width in pixels')
+    parser.add_argument('--height', type=int, default=500, help='image height in pixels')
+    parser.add_argument('--scale', type=float, default=2, help='scale factor of the raster images')
+    parser.add_argument('--background', default='white', help='background color of the images')
+    parser.add_argument('--force', action='store_true', help='render all figures, even the unchanged ones')
+    args = parser.parse_args()
+
+    if kaleido is None:
+        parser.error('the image export requires the kaleido package')
+    if app.data_error is not None:
+        parser.error('the dataset could not be loaded: {}'.format(app.data_error))
+
+    options = {'width': args.width, 'height': args.height, 'scale': args.scale, 'background': args.background}
+    os.makedirs(args.output, exist_ok=True)
+    stats = export(args.output, args.formats, args.workers, options, force=args.force)
+    print('Rendered {rendered}, unchanged {cached}, failed {failed} in {seconds:.1f} s'.format(**stats))
+    if stats['failed']:
+        raise SystemExit(1)
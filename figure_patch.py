@@ -0,0 +1,65 @@
+import numpy as np
+
+
+# Helper Functions
+
+def is_container(value):
+    # the dictionaries and the lists of dictionaries (traces, annotations, shapes) are patched item by item, the
+    # other values (numbers, strings, data arrays) are replaced as a whole
+    if isinstance(value, dict):
+        return True
+    elif isinstance(value, (list, tuple)):
+        return len(value) > 0 and all(isinstance(x, dict) for x in value)
+    return False
+
+
+def values_equal(a, b):
+    if a is b:
+        return True
+    elif isinstance(a, np.ndarray) or isinstance(b, np.ndarray):
+        a, b = np.asarray(a), np.asarray(b)
+        if a.shape != b.shape:
+            return False
+        elif (a.dtype.kind == 'f') and (b.dtype.kind in ('f', 'i', 'u')):
+            return bool(np.array_equal(a, b, equal_nan=True))
+        return bool(np.array_equal(a, b))
+    elif type(a) is not type(b):
+        return False
+    try:
+        return bool(a == b)
+    except ValueError:
+        return False
+
+
+# Figure Patch
+
+def figure_patch(base, figure):
+    # the operations which turn the base figure into the figure: [path, value] sets the value at the path and
+    # [path] deletes the key at the path, or truncates the list at the index
+    operations = []
+    diff_values(base, figure, [], operations)
+    return operations
+
+
+def diff_values(base, value, path, operations):
+    if base is value:
+        return
+    elif isinstance(base, dict) and isinstance(value, dict):
+        for key, item in value.items():
+            if key in base:
+                diff_values(base[key], item, path + [key], operations)
+            else:
+                operations.append([path + [key], item])
+        for key in base:
+            if key not in value:
+                operations.append([path + [key]])
+    elif is_container(base) and is_container(value):
+        for i, item in enumerate(value):
+            if i < len(base):
+                diff_values(base[i], item, path + [i], operations)
+            else:
+                operations.append([path + [i], item])
+        if len(base) > len(value):
+            operations.append([path + [len(value)]])
+    elif not values_equal(base, value):
+        operations.append([path, value])
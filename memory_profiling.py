@@ -0,0 +1,165 @@
+import inspect
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# the allocations of the profiler itself and of the imports are not part of the reports
+ignored_traces = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>')
+]
+
+
+# Helper Functions
+
+def read_rss():
+    # the current resident set size, the peak of resource.getrusage does not show a creep
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def deep_size(value, seen=None):
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        size = value.memory_usage(deep=True)
+        return int(size.sum() if isinstance(size, pd.Series) else size)
+    elif isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    elif isinstance(value, dict):
+        return sys.getsizeof(value) + sum(deep_size(x, seen) + deep_size(y, seen) for x, y in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(deep_size(x, seen) for x in value)
+    elif hasattr(value, '__dict__') and not inspect.isroutine(value) and not inspect.isclass(value):
+        return sys.getsizeof(value) + deep_size(vars(value), seen)
+    else:
+        return sys.getsizeof(value)
+
+
+def frame_location(frame):
+    return '{}:{}'.format(frame.filename, frame.lineno)
+
+
+# Memory Profiler
+
+class MemoryProfiler:
+
+    def __init__(self, frames=25, max_snapshots=10):
+        self.frames = frames
+        self.max_snapshots = max_snapshots
+        self.functions = {}
+        self.ranges = {}
+        self.snapshots = []
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self, interval=0):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+        if (interval > 0) and (self.thread is None):
+            self.thread = threading.Thread(target=self.run, args=(interval,), name='memory-snapshots', daemon=True)
+            self.thread.start()
+
+    def run(self, interval):
+        while True:
+            time.sleep(interval)
+            self.take_snapshot()
+
+    def register(self, function, name=None):
+        # the allocations are grouped by the innermost registered function of their traceback
+        function = inspect.unwrap(function)
+        if function.__code__ in self.functions:
+            return
+        lines, first = inspect.getsourcelines(function)
+        self.functions[function.__code__] = name or function.__name__
+        self.ranges.setdefault(function.__code__.co_filename, []).append(
+            (first, first + len(lines) - 1, name or function.__name__))
+
+    def callback_name(self, traceback):
+        # the frames of a traceback go from the oldest to the most recent one
+        for frame in reversed(traceback):
+            for first, last, name in self.ranges.get(frame.filename, ()):
+                if first <= frame.lineno <= last:
+                    return name, frame
+        return 'other', None
+
+    @staticmethod
+    def traced_memory():
+        return tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+
+    def snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(ignored_traces)
+
+    def take_snapshot(self):
+        snapshot = self.snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+        entry = dict(time=time.time(), rss=read_rss(), traced=traced, snapshot=snapshot)
+        with self.lock:
+            self.snapshots.append(entry)
+            del self.snapshots[:-self.max_snapshots]
+        return entry
+
+    def group(self, statistics, top):
+        groups = {}
+        for statistic in statistics:
+            size = getattr(statistic, 'size_diff', statistic.size)
+            count = getattr(statistic, 'count_diff', statistic.count)
+            if (size == 0) and (count == 0):
+                continue
+            name, frame = self.callback_name(statistic.traceback)
+            group = groups.setdefault(name, {'size': 0, 'count': 0, 'sites': {}})
+            group['size'] += size
+            group['count'] += count
+            site = (frame_location(statistic.traceback[-1]), frame_location(frame) if frame is not None else None)
+            totals = group['sites'].setdefault(site, [0, 0])
+            totals[0] += size
+            totals[1] += count
+        result = []
+        for name, group in sorted(groups.items(), key=lambda x: -abs(x[1]['size'])):
+            sites = sorted(group['sites'].items(), key=lambda x: -abs(x[1][0]))[:top]
+            result.append(dict(
+                callback=name,
+                size=group['size'],
+                count=group['count'],
+                sites=[dict(location=x[0], callback_line=x[1], size=y[0], count=y[1]) for x, y in sites]
+            ))
+        return result
+
+    def top_allocations(self, top=10):
+        return self.group(self.snapshot().statistics('traceback'), top)
+
+    def snapshot_list(self):
+        with self.lock:
+            return [dict(index=i, time=x['time'], rss=x['rss'], traced=x['traced'])
+                    for i, x in enumerate(self.snapshots)]
+
+    def diff(self, start=0, end=-1, top=10):
+        # the growth between two snapshots, e.g. the callbacks whose allocations are never released
+        with self.lock:
+            try:
+                first, last = self.snapshots[start], self.snapshots[end]
+            except IndexError:
+                return None
+        if first is last:
+            return None
+        rss = (last['rss'] - first['rss']) if (first['rss'] is not None) and (last['rss'] is not None) else None
+        return dict(
+            start=first['time'],
+            end=last['time'],
+            rss=rss,
+            traced=last['traced'] - first['traced'],
+            callbacks=self.group(last['snapshot'].compare_to(first['snapshot'], 'traceback'), top)
+        )
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+# the capacity of a compactor shrinks by this factor per level below the top one
+capacity_decay = 2 / 3
+
+
+# KLL Sketch
+
+class KLLSketch:
+    # A KLL quantile sketch (Karnin, Lang and Liberty, 2016). The values are kept in a hierarchy of compactors,
+    # the values of level h having a weight of 2 ** h. A full compactor is sorted and every other value is
+    # promoted to the next level, starting at a random offset, which keeps the rank of any value unbiased.
+    # Two sketches are merged by concatenating their levels, so the sketches of data chunks or of workers can
+    # be combined in any order. The normalized rank error is about 2.296 / k ** 0.9723 with 99% confidence
+    # (1.3% for k = 200), with O(k) values kept whatever the number of rows. Up to k values, the sketch keeps
+    # every value and its quantiles are exact.
+
+    def __init__(self, k=200, seed=0):
+        self.k = k
+        self.n = 0
+        self.min = None
+        self.max = None
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    @property
+    def exact(self):
+        return len(self.levels) == 1
+
+    def rank_error(self):
+        return 0.0 if self.exact else 2.296 / self.k ** 0.9723
+
+    def capacity(self, level):
+        return max(int(np.ceil(self.k * capacity_decay ** (len(self.levels) - level - 1))), 2)
+
+    def update(self, values):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.n += len(values)
+        self.min = float(values.min()) if self.min is None else min(self.min, float(values.min()))
+        self.max = float(values.max()) if self.max is None else max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self.compress()
+        return self
+
+    def merge(self, other):
+        if other.n == 0:
+            return self
+        self.n += other.n
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, values in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], values])
+        self.compress()
+        return self
+
+    def compress(self):
+        # the lowest full compactor first, a compaction may add a level and shrink the capacities below it
+        while True:
+            full = [x for x in range(len(self.levels)) if len(self.levels[x]) > self.capacity(x)]
+            if not full:
+                return
+            level = full[0]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            values = np.sort(self.levels[level])
+            # an odd value out stays at its level
+            pairs = len(values) - len(values) % 2
+            promoted = values[self.rng.integers(2):pairs:2]
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            self.levels[level] = values[pairs:]
+
+    def weighted_values(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(x), 2.0 ** i) for i, x in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    def quantiles(self, qs):
+        qs = np.asarray(qs, dtype='float64')
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        elif self.exact:
+            # the same linear interpolation as pandas' quantile
+            return np.quantile(self.levels[0], qs)
+        values, weights = self.weighted_values()
+        ranks = np.cumsum(weights)
+        result = values[np.minimum(np.searchsorted(ranks, qs * ranks[-1], 'left'), len(values) - 1)]
+        # the extremes are tracked exactly
+        result[qs <= 0] = self.min
+        result[qs >= 1] = self.max
+        return result
+
+    def min_at_least(self, value):
+        if self.min >= value:
+            return self.min
+        values = np.concatenate(self.levels)
+        values = values[values >= value]
+        return float(values.min()) if len(values) else None
+
+    def max_at_most(self, value):
+        if self.max <= value:
+            return self.max
+        values = np.concatenate(self.levels)
+        values = values[values <= value]
+        return float(values.max()) if len(values) else None
+
+    def to_dict(self):
+        return dict(k=self.k, n=self.n, min=self.min, max=self.max, levels=[x.tolist() for x in self.levels])
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['k'])
+        sketch.n = data['n']
+        sketch.min = data['min']
+        sketch.max = data['max']
+        sketch.levels = [np.asarray(x, dtype='float64') for x in data['levels']]
+        return sketch
+
+
+# Helper Functions
+
+def sketch_groups(frame, value_column, group_columns, k=200):
+    sketches = {}
+    for key, values in frame.groupby(group_columns, sort=False)[value_column]:
+        sketches[key if isinstance(key, tuple) else (key,)] = KLLSketch(k).update(values.values)
+    return sketches
+
+
+def merge_sketches(total, sketches):
+    for key, sketch in sketches.items():
+        if key in total:
+            total[key].merge(sketch)
+        else:
+            total[key] = sketch
+    return total
+
+
+def merged_sketch(sketches, k=200):
+    result = KLLSketch(k)
+    for sketch in sketches:
+        result.merge(sketch)
+    return result
+
+
+def freedman_diaconis_width(sketch):
+    # 2 * IQR / n ** (1 / 3), the bin width which minimizes the error of the histogram as a density estimate
+    if sketch.n < 2:
+        return None
+    q1, q3 = sketch.quantiles([0.25, 0.75])
+    return 2 * (q3 - q1) / sketch.n ** (1 / 3)
+
+
+def box_stats_frame(sketches, cat_column):
+    rows = []
+    for (churn, category), sketch in sorted(sketches.items(), key=lambda x: (str(x[0][0]), str(x[0][1]))):
+        if sketch.n == 0:
+            continue
+        q1, median, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        rows.append({'Churn': churn, cat_column: category, 'Count': sketch.n, 'Q1': q1, 'Median': median, 'Q3': q3,
+                     'Lower Fence': sketch.min_at_least(q1 - 1.5 * iqr),
+                     'Upper Fence': sketch.max_at_most(q3 + 1.5 * iqr), 'Rank Error': sketch.rank_error()})
+    return pd.DataFrame(rows)
@@ -0,0 +1,99 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+from data_source import PandasSource
+from survival import z_score
+
+key_column = '__sample_key'
+
+
+# Stratified Reservoir Sample
+
+class StratifiedReservoir:
+    # A uniform sample of at most `size` rows per stratum over a stream of chunks. Every row gets a random
+    # key and the rows with the smallest keys are kept, which is a reservoir sample of the rows seen so far.
+    # Two reservoirs are merged by keeping the smallest keys of both.
+
+    def __init__(self, column, size, seed=0):
+        self.column = column
+        self.size = size
+        self.rng = np.random.default_rng(seed)
+        self.samples = {}
+        self.counts = {}
+
+    def add(self, stratum, rows, count):
+        self.counts[stratum] = self.counts.get(stratum, 0) + count
+        if stratum in self.samples:
+            rows = pd.concat([self.samples[stratum], rows])
+        if len(rows) > self.size:
+            rows = rows.nsmallest(self.size, key_column)
+        self.samples[stratum] = rows
+
+    def update(self, chunk):
+        chunk = chunk.assign(**{key_column: self.rng.random(len(chunk))})
+        for stratum, rows in chunk.groupby(self.column, sort=False):
+            self.add(stratum, rows, len(rows))
+        return self
+
+    def merge(self, other):
+        for stratum, rows in other.samples.items():
+            self.add(stratum, rows, other.counts[stratum])
+        return self
+
+    def frame(self):
+        frames = [x.drop(columns=key_column) for x in self.samples.values()]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+# Sample Data Source
+
+class SampleSource(PandasSource):
+    # The aggregates of the sample, scaled to the full data by the inverse sampling fraction of each churn
+    # class. The estimated counts come with normal-approximation confidence intervals, with the finite
+    # population correction.
+    name = 'sample'
+    aggregated = True
+
+    def __init__(self, reservoir, z=z_score):
+        super().__init__(reservoir.frame())
+        self.z = z
+        self.population = dict(reservoir.counts)
+        self.sample_sizes = {x: len(y) for x, y in reservoir.samples.items()}
+
+    def churn_counts(self):
+        # the population of every churn class, for the whole sample and for a subset of it
+        return self.estimate(super().churn_counts())[['Churn', 'Count']]
+
+    def subset(self, filters):
+        # the sampled customers of a segment, scaled by the sampling fractions of the whole sample
+        source = copy.copy(self)
+        PandasSource.__init__(source, self.df.loc[self.filter_mask(filters)].reset_index(drop=True))
+        return source
+
+    def estimate(self, counts):
+        m = counts['Churn'].map(self.sample_sizes)
+        n = counts['Churn'].map(self.population)
+        share = counts['Count'] / m
+        correction = ((n - m) / (n - 1).clip(lower=1)).clip(lower=0)
+        margin = self.z * n * np.sqrt(share * (1 - share) / m * correction)
+        estimate = n * share
+        return counts.assign(Count=estimate.round().astype('int64'), Lower=(estimate - margin).clip(lower=0),
+                             Upper=estimate + margin)
+
+    def category_counts(self, column, churn=None):
+        counts = self.estimate(super().category_counts(column, churn))
+        return counts.sort_values('Count', ascending=False, kind='stable').reset_index(drop=True)
+
+    def histogram(self, column, start, size):
+        return self.estimate(super().histogram(column, start, size))
+
+    def survival_counts(self, column, time_column='Tenure'):
+        # weighted by the inverse sampling fractions, normalized to the sample size, so that the Greenwood
+        # bands keep the width of the sample
+        weights = self.df['Churn'].map({x: self.population[x] / y for x, y in self.sample_sizes.items()})
+        weights = weights * len(weights) / weights.sum()
+        data = self.df[[column, time_column]].assign(Events=(self.df['Churn'] == 'Yes') * weights, Count=weights)
+        counts = data.groupby([column, time_column]).agg(Events=('Events', 'sum'), Count=('Count', 'sum'))
+        return counts.reset_index().rename(columns={time_column: 'Tenure'})
@@ -0,0 +1,152 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+# Segment Miner
+
+class SegmentMiner:
+    # The churn rates of the segments defined by the values of up to max_order categorical variables, e.g.
+    # Internet Service = Fiber optic x Contract = Month-to-month x Payment Method = Electronic check. The values
+    # are integer codes, and the codes of a combination of variables are combined into one integer key (mixed
+    # radix), so that the customers and the churned customers of all the segments of a combination are counted by
+    # two bincounts over the distinct rows. The combinations are counted level by level: a segment can only have
+    # the minimum support if every segment with one variable less has it, so the values below the minimum support
+    # are dropped before counting, and a combination without any frequent segment below is not counted at all.
+
+    def __init__(self, categories, min_support, max_order=3):
+        self.columns = list(categories)
+        self.categories = [np.asarray(categories[x], dtype=object) for x in self.columns]
+        self.radix = [len(x) for x in self.categories]
+        self.min_support = min_support
+        self.max_order = max_order
+        self.codes = []
+        self.churned = []
+        self.counts = {}
+        self.total_customers = 0
+        self.total_churned = 0.0
+
+    def update(self, chunk):
+        # only the int8 codes of the rows are kept, -1 for a missing or unknown value
+        dtype = 'int8' if max(self.radix, default=0) < 128 else 'int32'
+        self.codes.append(np.column_stack([
+            pd.Categorical(chunk[x], categories=y).codes.astype(dtype) for x, y in zip(self.columns, self.categories)
+        ]) if self.columns else np.empty((len(chunk), 0), dtype=dtype))
+        self.churned.append((chunk['Churn'] == 'Yes').to_numpy())
+        return self
+
+    def drop_infrequent_values(self, codes):
+        # a value below the minimum support is in no frequent segment, without these values the key space of a
+        # combination has at most (rows / min_support) ** order keys
+        for i in range(len(self.columns)):
+            column = codes[:, i]
+            frequent = np.flatnonzero(np.bincount(column[column >= 0], minlength=self.radix[i]) >= self.min_support)
+            # the last item maps the code -1 to itself
+            mapping = np.full(self.radix[i] + 1, -1, dtype=codes.dtype)
+            mapping[frequent] = np.arange(len(frequent))
+            codes[:, i] = mapping[column]
+            self.categories[i] = self.categories[i][frequent]
+            self.radix[i] = len(frequent)
+
+    def patterns(self, codes, churned):
+        # the identical rows are counted once, with their numbers of customers and churned customers as weights.
+        # The codes are shifted by one, code 0 being a missing or dropped value.
+        codes = codes.astype('int64') + 1
+        if np.sum(np.log2(np.array(self.radix, dtype='float64') + 1)) < 62:
+            key = np.zeros(len(codes), dtype='int64')
+            for i in range(len(self.columns)):
+                key = key * (self.radix[i] + 1) + codes[:, i]
+            _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+        else:
+            rows = np.ascontiguousarray(codes.astype('int32'))
+            _, first, inverse = np.unique(rows.view(np.dtype((np.void, rows.shape[1] * 4))).ravel(),
+                                          return_index=True, return_inverse=True)
+        weights = np.bincount(inverse, minlength=len(first)), np.bincount(inverse, weights=churned,
+                                                                          minlength=len(first))
+        return np.asfortranarray(codes[first]), weights[0].astype('float64'), weights[1]
+
+    def count(self, codes, customers, churned, combination):
+        shape = [self.radix[i] + 1 for i in combination]
+        key = codes[:, combination[0]]
+        for i in combination[1:]:
+            key = key * (self.radix[i] + 1) + codes[:, i]
+        size = int(np.prod(shape))
+        # the keys with a missing value, at code 0 of any of the variables, are dropped
+        values = tuple(slice(1, None) for x in combination)
+        return [np.bincount(key, weights=x, minlength=size).reshape(shape)[values].ravel().round().astype('int64')
+                for x in (customers, churned)]
+
+    def mine(self):
+        codes = np.concatenate(self.codes) if self.codes else np.empty((0, len(self.columns)), dtype='int8')
+        churned = np.concatenate(self.churned).astype('float64') if self.churned else np.empty(0)
+        self.codes, self.churned = [], []
+        self.total_customers, self.total_churned = len(codes), float(churned.sum())
+        self.drop_infrequent_values(codes)
+        codes, customers, churned = self.patterns(codes, churned)
+        level = [(i,) for i in range(len(self.columns))]
+        for order in range(1, self.max_order + 1):
+            for combination in level:
+                segment_customers, segment_churned = self.count(codes, customers, churned, combination)
+                frequent = segment_customers >= self.min_support
+                if frequent.any():
+                    self.counts[combination] = (segment_customers, segment_churned, frequent)
+            # the candidates of the next level, whose every sub-combination has a frequent segment
+            level = [x for x in itertools.combinations(range(len(self.columns)), order + 1)
+                     if all(y in self.counts for y in itertools.combinations(x, order))]
+            if not level:
+                break
+        return self
+
+    def segments(self, productive=True):
+        # a segment is only kept when each of its values raises the churn rate of the segment without it, an
+        # extra value which does not is part of the smaller segment already
+        n = self.total_customers
+        rates = {x: y[1] / np.maximum(y[0], 1) for x, y in self.counts.items()}
+        frames = []
+        for combination, (customers, churned, frequent) in self.counts.items():
+            keys = np.flatnonzero(frequent)
+            codes = np.unravel_index(keys, [self.radix[i] for i in combination])
+            keep = np.ones(len(keys), dtype=bool)
+            if productive and len(combination) > 1:
+                for j in range(len(combination)):
+                    sub = combination[:j] + combination[j + 1:]
+                    parent = np.ravel_multi_index([codes[x] for x in range(len(combination)) if x != j],
+                                                  [self.radix[i] for i in sub])
+                    keep &= rates[combination][keys] > rates[sub][parent]
+            if not keep.any():
+                continue
+            keys = keys[keep]
+            codes = [x[keep] for x in codes]
+            values = [self.categories[i][x] for i, x in zip(combination, codes)]
+            frames.append(pd.DataFrame({
+                'Order': len(combination),
+                'Variables': [tuple(self.columns[i] for i in combination)] * len(keys),
+                'Values': list(zip(*values)),
+                'Customers': customers[keys].astype('int64'),
+                'Churned': churned[keys].round().astype('int64')
+            }))
+        columns = ['Segment', 'Order', 'Variables', 'Values', 'Customers', 'Churned', 'Churn Rate', 'Support', 'Lift']
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        result = pd.concat(frames, ignore_index=True)
+        result['Segment'] = [' × '.join('{} = {}'.format(x, y) for x, y in zip(a, b))
+                             for a, b in zip(result['Variables'], result['Values'])]
+        result['Churn Rate'] = result['Churned'] / result['Customers'] * 100
+        result['Support'] = result['Customers'] / max(n, 1) * 100
+        overall = self.total_churned / max(n, 1) * 100
+        result['Lift'] = result['Churn Rate'] / overall if overall > 0 else np.nan
+        result = result.sort_values(['Churn Rate', 'Customers'], ascending=False, kind='stable')
+        return result[columns].reset_index(drop=True)
+
+
+# Helper Functions
+
+def segment_categories(source, columns):
+    # the values of every categorical variable, in the order of their counts
+    categories = {}
+    for column in columns:
+        counts = source.category_counts(column)
+        totals = counts.groupby(column, sort=False)['Count'].sum().sort_values(ascending=False, kind='stable')
+        categories[column] = totals.index.tolist()
+    return categories
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from data_source import id_column
+
+
+# Helper Functions
+
+def segment_codes(frame, churned):
+    columns = [x for x in frame.columns if x not in (id_column, 'Churn')]
+    codes = pd.DataFrame({x: frame[x].astype('category').values for x in columns})
+    codes['Churned'] = churned
+    return codes
+
+
+def churn_groups(codes, column):
+    # the categories of the two snapshots differ, the groups are joined on the values
+    groups = codes.groupby(column, observed=True)['Churned'].agg(['size', 'mean'])
+    groups.index = groups.index.astype(object)
+    return groups
+
+
+# Snapshot Diff
+
+class SnapshotDiff:
+
+    def __init__(self, base, current):
+        # hash join of the current snapshot on the customer ids of the base snapshot, in one vectorized lookup.
+        # The hash table built by the uniqueness check is reused by the lookup.
+        index = pd.Index(base[id_column])
+        if not index.is_unique:
+            # a customer is expected once per snapshot, the last row wins otherwise
+            base = base.loc[~index.duplicated(keep='last')]
+            index = pd.Index(base[id_column])
+        position = index.get_indexer(current[id_column])
+        self.matched = position >= 0
+        base_churn = base['Churn'].values == 'Yes'
+        current_churn = current['Churn'].values == 'Yes'
+        previous_churn = np.where(self.matched, base_churn[np.maximum(position, 0)], False)
+        self.newly_churned = self.matched & current_churn & ~previous_churn
+        self.returned = self.matched & ~current_churn & previous_churn
+        # only the segment codes and the churn flags are kept, not the copies of the two snapshots
+        self.newly_churned_id_values = current[id_column].values[self.newly_churned]
+        self.base = segment_codes(base, base_churn)
+        self.current = segment_codes(current, current_churn)
+
+        self.summary = dict(
+            base_customers=len(self.base),
+            current_customers=len(self.current),
+            matched_customers=int(self.matched.sum()),
+            new_customers=int((~self.matched).sum()),
+            lost_customers=int(len(self.base) - self.matched.sum()),
+            newly_churned=int(self.newly_churned.sum()),
+            returned=int(self.returned.sum()),
+            base_churn_rate=float(base_churn.mean() * 100) if len(self.base) else None,
+            current_churn_rate=float(current_churn.mean() * 100) if len(self.current) else None
+        )
+        self.segments = {}
+
+    def segment_deltas(self, column):
+        if column not in self.segments:
+            base = churn_groups(self.base, column)
+            base.columns = ['Base Customers', 'Base Rate']
+            current = churn_groups(self.current, column)
+            current.columns = ['Current Customers', 'Current Rate']
+            churned = churn_groups(self.current.loc[self.newly_churned], column)['size'].rename('Newly Churned')
+            deltas = base.join(current, how='outer').join(churned).reset_index()
+            deltas[['Base Customers', 'Current Customers', 'Newly Churned']] = deltas[
+                ['Base Customers', 'Current Customers', 'Newly Churned']].fillna(0).astype('int64')
+            deltas[['Base Rate', 'Current Rate']] = deltas[['Base Rate', 'Current Rate']] * 100
+            deltas['Delta'] = deltas['Current Rate'] - deltas['Base Rate']
+            self.segments[column] = deltas.sort_values('Delta', ascending=False, kind='stable').reset_index(drop=True)
+        return self.segments[column]
+
+    def newly_churned_ids(self, limit=None):
+        ids = self.newly_churned_id_values
+        return ids.tolist() if limit is None else ids[:limit].tolist()
@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+z_score = 1.959963984540054
+
+
+# Kaplan-Meier Estimator
+
+def kaplan_meier(times, events, counts, z=z_score):
+    # times, events and counts are aggregated per tenure month: the number of churned customers and the
+    # total number of customers whose tenure ended at that month. The curve is computed with one sort and
+    # cumulative sums, i.e. O(n log n) in the number of distinct months.
+    order = np.argsort(times, kind='stable')
+    times = np.asarray(times, dtype='float64')[order]
+    events = np.asarray(events, dtype='float64')[order]
+    counts = np.asarray(counts, dtype='float64')[order]
+
+    at_risk = counts[::-1].cumsum()[::-1]
+    hazard = np.divide(events, at_risk, out=np.zeros_like(events), where=at_risk > 0)
+    survival = np.cumprod(1 - hazard)
+
+    # Greenwood variance with the log(-log) transform, so that the band stays within [0, 1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        greenwood = np.cumsum(np.where(at_risk > events, events / (at_risk * (at_risk - events)), 0.0))
+        log_survival = np.log(survival)
+        se = np.sqrt(greenwood) / np.abs(log_survival)
+        lower = np.exp(-np.exp(np.log(-log_survival) + z * se))
+        upper = np.exp(-np.exp(np.log(-log_survival) - z * se))
+    defined = (survival > 0) & (survival < 1) & (greenwood > 0)
+    lower = np.where(defined, lower, survival)
+    upper = np.where(defined, upper, survival)
+
+    return pd.DataFrame({
+        'Tenure': times,
+        'At Risk': at_risk.astype('int64'),
+        'Events': events.astype('int64'),
+        'Survival': survival,
+        'Lower': lower,
+        'Upper': upper
+    })
+
+
+def survival_curves(counts, segment):
+    curves = []
+    for value, group in counts.groupby(segment, sort=True):
+        curve = kaplan_meier(group['Tenure'].values, group['Events'].values, group['Count'].values)
+        curve.insert(0, segment, value)
+        curves.append(curve)
+    return pd.concat(curves, ignore_index=True)
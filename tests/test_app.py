@@ -0,0 +1,101 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+os.environ.setdefault('WARMUP', 'false')
+
+import app  # noqa: E402
+
+
+@pytest.fixture
+def client():
+    return app.app.server.test_client()
+
+
+@pytest.fixture
+def reload_data(tmp_path, monkeypatch):
+    # reloads the default dataset from a copy of the data file with the churn of its last customers changed
+    def reload(rows=20):
+        frame = pd.read_csv(app.data_file)
+        changed = frame.index[-rows:]
+        frame.loc[changed, 'Churn'] = frame.loc[changed, 'Churn'].map({'Yes': 'No', 'No': 'Yes'})
+        path = str(tmp_path / os.path.basename(app.data_file))
+        frame.to_csv(path, index=False)
+        monkeypatch.setattr(app, 'data_file', path)
+        app.load_data()
+
+    yield reload
+    monkeypatch.undo()
+    app.load_data()
+
+
+def figure_request(client, graph_id, values, base=None):
+    key = json.dumps([graph_id, values, app.data_version], separators=(',', ':'))
+    value = {'key': key, 'values': values}
+    if base is not None:
+        value['base'] = base
+    response = client.post('/_dash-update-component', json={
+        'output': '{}-server.data'.format(graph_id),
+        'outputs': {'id': '{}-server'.format(graph_id), 'property': 'data'},
+        'inputs': [{'id': '{}-request'.format(graph_id), 'property': 'data', 'value': value}],
+        'changedPropIds': ['{}-request.data'.format(graph_id)]
+    })
+    assert response.status_code == 200
+    return key, response.get_json()['response']['{}-server'.format(graph_id)]['data']
+
+
+def test_reload_keeps_patch_bases(client, reload_data):
+    # the churned customers per contract, a figure of counts
+    values = ['Contract', [], app.default_dataset_name]
+    base, reply = figure_request(client, 'no', values)
+    assert 'figure' in reply
+    version = app.data_version
+    reload_data()
+    assert app.data_version != version
+    assert base in app.figure_store
+    # the figure shown before the reload is the base of the new one, which only has other counts
+    key, reply = figure_request(client, 'no', values, base=base)
+    assert reply['base'] == base and 'patch' in reply and 'figure' not in reply
+    # the responses of the previous version can no longer be requested
+    assert all(x[0] == app.data_version for x in app.response_cache)
+
+
+def test_evicted_dataset_releases_its_figures(client):
+    values = ['Contract', [], app.default_dataset_name]
+    key, reply = figure_request(client, 'cat-main-body', values)
+    assert key in app.figure_store
+    app.evict_aggregates(app.get_dataset())
+    assert key not in app.figure_store
+    assert not [x for x in app.response_cache.values() if x.get('dataset') == app.default_dataset_name]
+
+
+def test_segment_drill(client):
+    segment = app.get_segments().iloc[0]
+    pairs = [[x, y] for x, y in zip(segment['Variables'], segment['Values'])]
+    assert len(pairs) > 1
+    response = client.post('/_dash-update-component', json={
+        'output': '..var.options...var.value...button.n_clicks...segment-filter.data..',
+        'outputs': [{'id': 'var', 'property': 'options'}, {'id': 'var', 'property': 'value'},
+                    {'id': 'button', 'property': 'n_clicks'}, {'id': 'segment-filter', 'property': 'data'}],
+        'inputs': [{'id': 'data-type', 'property': 'value', 'value': 'Categorical'},
+                   {'id': 'data-status', 'property': 'data', 'value': 'ready'},
+                   {'id': 'dataset', 'property': 'value', 'value': app.default_dataset_name},
+                   {'id': 'segment-selection', 'property': 'data', 'value': pairs}],
+        'state': [{'id': 'button', 'property': 'n_clicks', 'value': 3}],
+        'changedPropIds': ['segment-selection.data']
+    }).get_json()['response']
+    # the first variable is opened and applied within the whole segment
+    assert response['var']['value'] == pairs[0][0]
+    assert response['button']['n_clicks'] == 4
+    assert response['segment-filter']['data'] == pairs
+    # its values are counted over the customers with the segment's values of the other variables
+    frame = app.get_dataset().df
+    rows = frame.loc[(frame[pairs[1][0]] == pairs[1][1]) & (frame['Churn'] == 'Yes')]
+    for x, y in pairs[2:]:
+        rows = rows.loc[rows[x] == y]
+    key, reply = figure_request(client, 'yes', [pairs[0][0], pairs, app.default_dataset_name])
+    trace = reply['figure']['data'][0]
+    assert dict(zip(trace['labels'], trace['values'])) == rows[pairs[0][0]].value_counts().to_dict()
+    assert len(trace['labels']) > 1
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from churn_model import ChurnModel, FeatureEncoder, sigmoid
+
+data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Telco-Customer-Churn.csv')
+
+
+@pytest.fixture(scope='module')
+def telco():
+    frame = pd.read_csv(data_path)
+    frame['TotalCharges'] = pd.to_numeric(frame['TotalCharges'], errors='coerce')
+    return frame
+
+
+def synthetic(n=4000, seed=0):
+    # churn drawn from a known logistic model of one category and one number
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({'Contract': rng.choice(['Month', 'Year'], n), 'Tenure': rng.normal(0, 1, n)})
+    logit = -1.0 + 2.0 * (frame['Contract'] == 'Month') - 1.5 * frame['Tenure']
+    frame['Churn'] = np.where(rng.random(n) < sigmoid(logit.values), 'Yes', 'No')
+    return frame
+
+
+def test_encoder_one_hot_and_standardized():
+    frame = pd.DataFrame({'Contract': ['Month', 'Year', None], 'Tenure': [1.0, 2.0, 3.0]})
+    encoder = FeatureEncoder(['Contract'], ['Tenure']).fit(frame)
+    assert encoder.feature_names == ['Contract = Month', 'Contract = Year', 'Tenure']
+    matrix = encoder.transform(pd.DataFrame({'Contract': ['Year', 'Unknown'], 'Tenure': [2.0, np.nan]}))
+    # an unknown category has no column set, a missing number is at the mean
+    np.testing.assert_array_equal(matrix, [[0.0, 1.0, 0.0], [0.0, 0.0, 0.0]])
+
+
+def test_encoder_missing_fields():
+    encoder = FeatureEncoder(['Contract'], ['Tenure']).fit(pd.DataFrame({'Contract': ['Month'], 'Tenure': [1.0]}))
+    with pytest.raises(KeyError):
+        encoder.transform(pd.DataFrame({'Contract': ['Month']}))
+
+
+def test_fit_converges_to_the_penalised_optimum():
+    frame = synthetic()
+    model = ChurnModel(FeatureEncoder(['Contract'], ['Tenure']), l2=1.0).fit(frame)
+    assert model.iterations < 50
+    # the gradient of the penalised log-likelihood vanishes at the optimum
+    design = np.hstack([np.ones((len(frame), 1)), model.encoder.transform(frame)])
+    weights = np.concatenate([[model.intercept], model.coef])
+    target = (frame['Churn'] == 'Yes').values.astype('float64')
+    penalty = np.full(len(weights), model.l2)
+    penalty[0] = 0.0
+    gradient = design.T @ (sigmoid(design @ weights) - target) + penalty * weights
+    assert np.abs(gradient).max() < 1e-6
+
+
+def test_fit_recovers_the_model():
+    frame = synthetic(n=20000)
+    model = ChurnModel(FeatureEncoder(['Contract'], ['Tenure']), l2=1e-6).fit(frame)
+    month, year, tenure = model.coef
+    assert month - year == pytest.approx(2.0, abs=0.15)
+    assert tenure / frame['Tenure'].std() == pytest.approx(-1.5, abs=0.15)
+    assert model.top_features(1)[0]['feature'] == 'Tenure'
+
+
+def test_predictions_on_telco(telco):
+    cat_var = ['Contract', 'InternetService', 'PaymentMethod']
+    model = ChurnModel(FeatureEncoder(cat_var, ['tenure', 'MonthlyCharges'])).fit(telco)
+    prob = model.predict_proba(telco)
+    assert prob.shape == (len(telco),)
+    assert ((prob > 0) & (prob < 1)).all()
+    # the mean prediction of an unpenalised intercept matches the churn rate
+    assert prob.mean() == pytest.approx((telco['Churn'] == 'Yes').mean(), abs=1e-6)
+    churned = telco['Churn'] == 'Yes'
+    assert prob[churned.values].mean() > prob[~churned.values].mean() + 0.2
+    month = model.predict_proba(telco.assign(Contract='Month-to-month')).mean()
+    two_year = model.predict_proba(telco.assign(Contract='Two year')).mean()
+    assert month > two_year
@@ -0,0 +1,111 @@
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+os.environ.setdefault('WARMUP', 'false')
+
+import app  # noqa: E402
+from data_source import id_column  # noqa: E402
+
+filter_queries = [
+    '{Contract} eq "Month-to-month"',
+    '{Payment Method} contains "(automatic)" && {Tenure} lt 12',
+    '{Internet Service} ne DSL && {Monthly Charges} ge 70.35',
+    '{Multiple Lines} scontains phone',
+    '{Total Charges} le 0',
+    '{Gender} eq Female && {Senior Citizen} eq Yes && {Tenure} gt 60',
+    '{Customer ID} eq 7590-VHVEG',
+    '{Customer ID} datestartswith 75',
+    '{Unknown} eq 1 && {Tenure} eq 1',
+]
+
+
+@pytest.fixture(scope='module')
+def datasets(tmp_path_factory):
+    # the bundled dataset read by both backends, the sqlite database next to a copy of the data file
+    path = str(tmp_path_factory.mktemp('data') / os.path.basename(app.data_file))
+    shutil.copy(app.data_file, path)
+    loaded = {}
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        for backend in ('pandas', 'sqlite'):
+            monkeypatch.setattr(app, 'data_backend', backend)
+            loaded[backend] = app.read_dataset(app.default_dataset_name, path)
+    return loaded['pandas'], loaded['sqlite']
+
+
+def sorted_frame(frame, columns):
+    return frame.sort_values(columns).reset_index(drop=True)
+
+
+def test_schema(datasets):
+    pandas, sqlite = datasets
+    assert pandas.all_var == sqlite.all_var
+    assert (pandas.cat_var, pandas.num_var) == (sqlite.cat_var, sqlite.num_var)
+    pd.testing.assert_frame_equal(pandas.churn_table, sqlite.churn_table)
+
+
+def test_histograms(datasets):
+    pandas, sqlite = datasets
+    for column, start, size in [('Tenure', 0, 6), ('Monthly Charges', 18.25, 2.5), ('Total Charges', -10.0, 250.0)]:
+        pd.testing.assert_frame_equal(pandas.source.histogram(column, start, size),
+                                      sqlite.source.histogram(column, start, size), check_dtype=False)
+
+
+def test_category_counts(datasets):
+    pandas, sqlite = datasets
+    for column in ['Contract', 'Payment Method', 'Senior Citizen']:
+        for churn in (None, 'Yes'):
+            pd.testing.assert_frame_equal(
+                sorted_frame(pandas.source.category_counts(column, churn), ['Churn', column]),
+                sorted_frame(sqlite.source.category_counts(column, churn), ['Churn', column]))
+
+
+def test_box_stats(datasets):
+    pandas, sqlite = datasets
+    for cat_column, num_column in [('Contract', 'Tenure'), ('Payment Method', 'Monthly Charges'),
+                                   ('Internet Service', 'Total Charges')]:
+        pd.testing.assert_frame_equal(
+            sorted_frame(pandas.source.box_stats(cat_column, num_column), ['Churn', cat_column]),
+            sorted_frame(sqlite.source.box_stats(cat_column, num_column), ['Churn', cat_column]), check_dtype=False)
+
+
+@pytest.mark.parametrize('filter_query', filter_queries)
+def test_filter_queries(datasets, filter_query):
+    pandas, sqlite = datasets
+    filters = app.parse_filter_query(filter_query, pandas)
+    assert filters == app.parse_filter_query(filter_query, sqlite)
+    rows, total = pandas.source.records(filters, [], 0, len(pandas.df))
+    sql_rows, sql_total = sqlite.source.records(filters, [], 0, len(pandas.df))
+    assert total == sql_total == len(rows) > 0
+    pd.testing.assert_frame_equal(sorted_frame(rows, [id_column]), sorted_frame(sql_rows, [id_column]),
+                                  check_dtype=False)
+
+
+def test_records_pages(datasets):
+    pandas, sqlite = datasets
+    filters = app.parse_filter_query('{Contract} eq "Two year"', pandas)
+    for sort_by in ([(id_column, True)], [(id_column, False)], [('Monthly Charges', False), (id_column, True)]):
+        for offset in (0, 250, 1690):
+            rows, total = pandas.source.records(filters, sort_by, offset, 25)
+            sql_rows, sql_total = sqlite.source.records(filters, sort_by, offset, 25)
+            assert total == sql_total
+            pd.testing.assert_frame_equal(rows.reset_index(drop=True), sql_rows, check_dtype=False)
+
+
+@pytest.mark.parametrize('sort_by', [[], [('Contract', True)], [('Tenure', False), ('Gender', True)]])
+@pytest.mark.parametrize('backend', ['pandas', 'sqlite'])
+def test_pages_return_every_customer_once(datasets, backend, sort_by):
+    # the sorted columns have many ties, which must not move a customer across a page boundary
+    pandas = datasets[0]
+    dataset = dict(zip(['pandas', 'sqlite'], datasets))[backend]
+    for filters, page_size in [([], 250), (app.parse_filter_query('{Tenure} lt 24', dataset), 97)]:
+        ids = []
+        total = None
+        while (total is None) or (len(ids) < total):
+            rows, total = dataset.source.records(filters, sort_by, len(ids), page_size)
+            assert len(rows) == min(page_size, total - len(ids)) > 0
+            ids += rows[id_column].tolist()
+        assert len(ids) == len(set(ids)) == total
+        assert set(ids) == set(pandas.df.loc[pandas.source.filter_mask(filters), id_column])
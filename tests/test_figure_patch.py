@@ -0,0 +1,136 @@
+import json
+import os
+import shutil
+import subprocess
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.io as pio
+import pytest
+
+from figure_patch import figure_patch
+
+figure_cache_js = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets',
+                               'figure_cache.js')
+requires_node = pytest.mark.skipif(shutil.which('node') is None, reason='node is not installed')
+
+# applies the operations with applyPatch of assets/figure_cache.js, and checks that the base is not changed
+apply_script = """
+globalThis.window = {};
+var fs = require('fs');
+eval(fs.readFileSync(process.argv[1], 'utf8'));
+var input = JSON.parse(fs.readFileSync(0, 'utf8'));
+var base = JSON.stringify(input[0]);
+var result = window.dash_clientside.figure_cache.applyPatch(input[0], input[1]);
+process.stdout.write(JSON.stringify([result, JSON.stringify(input[0]) === base]));
+"""
+
+
+def apply_patch(figure, operations):
+    output = subprocess.run(['node', '-e', apply_script, figure_cache_js], check=True, capture_output=True,
+                            input=pio.json.to_json_plotly([figure, operations]).encode('utf-8')).stdout
+    result, unchanged = json.loads(output)
+    assert unchanged
+    return result
+
+
+def to_json(figure):
+    return json.loads(pio.to_json(figure, validate=False))
+
+
+def bar_figure(column, churn_only=False):
+    frame = pd.DataFrame({'Contract': ['Month', 'Month', 'Year', 'Two year'] * 5,
+                          'Payment': ['Check', 'Card', 'Card', 'Bank'] * 5,
+                          'Churn': ['Yes', 'No', 'No', 'Yes', 'No'] * 4})
+    if churn_only:
+        frame = frame.loc[frame['Churn'] == 'Yes']
+    counts = frame.groupby(['Churn', column]).size().rename('Count').reset_index()
+    return px.bar(counts, x=column, y='Count', color='Churn', barmode='group', title=column).to_dict()
+
+
+@requires_node
+def test_round_trip():
+    for base, figure in [(bar_figure('Contract'), bar_figure('Payment')),
+                         (bar_figure('Contract'), bar_figure('Contract', churn_only=True)),
+                         (bar_figure('Contract', churn_only=True), bar_figure('Payment'))]:
+        operations = figure_patch(base, figure)
+        assert operations
+        assert to_json(apply_patch(base, operations)) == to_json(figure)
+
+
+def test_unchanged():
+    assert figure_patch(bar_figure('Contract'), bar_figure('Contract')) == []
+
+
+@requires_node
+def test_operations():
+    base = {'data': [{'x': [1, 2], 'name': 'a'}, {'x': [3]}], 'layout': {'title': 't', 'height': 400}}
+    figure = {'data': [{'x': [1, 2], 'name': 'b'}], 'layout': {'title': 't', 'width': 600}}
+    operations = figure_patch(base, figure)
+    assert operations == [[['data', 0, 'name'], 'b'], [['data', 1]], [['layout', 'width'], 600],
+                          [['layout', 'height']]]
+    assert apply_patch(base, operations) == figure
+    # a longer list of traces gets the new traces appended
+    assert apply_patch(figure, figure_patch(figure, base)) == base
+
+
+def test_arrays():
+    base = {'x': np.array([1.0, np.nan]), 'y': np.array([1, 2]), 'z': [1, 2]}
+    # equal arrays with a missing value or another numeric type are not sent again, other types are
+    assert figure_patch(base, {'x': np.array([1.0, np.nan]), 'y': np.array([1.0, 2.0]), 'z': [1, 2]}) == []
+    assert figure_patch(base, dict(base, z=(1, 2))) == [[['z'], (1, 2)]]
+    # a data array is replaced as a whole
+    [[path, value]] = figure_patch(base, dict(base, y=np.array([1, 2, 3])))
+    assert path == ['y'] and value.tolist() == [1, 2, 3]
+
+
+def test_replaced_root():
+    assert figure_patch(1, 2) == [[[], 2]]
+
+
+@requires_node
+def test_replaced_root_applied():
+    assert apply_patch({'a': 1}, figure_patch({'a': 1}, [1])) == [1]
+
+
+@requires_node
+def test_patch_across_a_new_version(tmp_path):
+    os.environ.setdefault('WARMUP', 'false')
+    import app
+
+    values = ['Contract', [], app.default_dataset_name]
+    previous = app.get_dataset()
+
+    def request(version, base=None):
+        key = json.dumps(['no', values, version], separators=(',', ':'))
+        value = {'key': key, 'values': values, 'base': base}
+        return key, app.app.server.test_request_context('/_dash-update-component', method='POST', json={
+            'output': 'no-server.data', 'outputs': {'id': 'no-server', 'property': 'data'},
+            'inputs': [{'id': 'no-request', 'property': 'data', 'value': value}]})
+
+    base_key, context = request(previous.version)
+    with context:
+        app.store_figure(base_key, app.update_no(None, *values))
+    # a new version of the default dataset, with the churn of its last customers changed
+    frame = pd.read_csv(previous.path)
+    frame.loc[frame.index[-20:], 'Churn'] = frame['Churn'].iloc[-20:].map({'Yes': 'No', 'No': 'Yes'})
+    path = str(tmp_path / os.path.basename(previous.path))
+    frame.to_csv(path, index=False)
+    app.dataset_registry.put(app.read_dataset(app.default_dataset_name, path), pinned=True)
+    try:
+        assert app.get_dataset().version != previous.version
+        fig = app.update_no(None, *values)
+        key, context = request(app.get_dataset().version, base=base_key)
+        reply = {'key': key, 'figure': fig}
+        body = pio.json.to_json_plotly({'multi': True, 'response': {'no-server': {'data': reply}}}).encode('utf-8')
+        with context:
+            patched = app.patched_response_body(body, reply)
+        assert patched is not None and len(patched) < len(body)
+        patched_reply = json.loads(patched)['response']['no-server']['data']
+        assert patched_reply['base'] == base_key and 'figure' not in patched_reply
+        with app.figure_store_lock:
+            base = app.figure_store[base_key]
+        assert to_json(apply_patch(base, patched_reply['patch'])) == to_json(fig)
+    finally:
+        app.dataset_registry.put(previous, pinned=True)
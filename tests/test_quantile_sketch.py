@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from quantile_sketch import (KLLSketch, box_stats_frame, freedman_diaconis_width, merge_sketches, merged_sketch,
+                             sketch_groups)
+
+qs = np.linspace(0.01, 0.99, 99)
+
+
+def rank_errors(sketch, values):
+    # the normalized ranks of the quantiles of the sketch, against the ranks they should have
+    values = np.sort(values)
+    ranks = np.searchsorted(values, sketch.quantiles(qs), 'right') / len(values)
+    return np.abs(ranks - qs)
+
+
+def test_exact_up_to_k_values():
+    values = np.random.default_rng(0).normal(size=150)
+    sketch = KLLSketch(200).update(values)
+    assert sketch.exact and sketch.rank_error() == 0.0
+    np.testing.assert_allclose(sketch.quantiles([0.25, 0.5, 0.75]), pd.Series(values).quantile([0.25, 0.5, 0.75]))
+
+
+def test_empty_and_missing_values():
+    sketch = KLLSketch().update([np.nan])
+    assert sketch.n == 0
+    assert np.isnan(sketch.quantiles([0.5])).all()
+    assert freedman_diaconis_width(sketch) is None
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_rank_error_within_the_bound(seed):
+    values = np.random.default_rng(seed).lognormal(size=100000)
+    sketch = KLLSketch(200, seed=seed)
+    for chunk in np.array_split(values, 37):
+        sketch.update(chunk)
+    assert sketch.n == len(values)
+    assert not sketch.exact
+    assert rank_errors(sketch, values).max() <= sketch.rank_error()
+    # O(k) values are kept
+    assert sum(len(x) for x in sketch.levels) < 3 * sketch.k
+    assert sketch.quantiles([0, 1]).tolist() == [values.min(), values.max()]
+
+
+def test_merge_within_the_bound():
+    rng = np.random.default_rng(1)
+    parts = [rng.normal(loc, 1, 20000) for loc in range(5)]
+    sketch = merged_sketch([KLLSketch(200, seed=i).update(x) for i, x in enumerate(parts)])
+    values = np.concatenate(parts)
+    assert sketch.n == len(values)
+    assert (sketch.min, sketch.max) == (values.min(), values.max())
+    assert rank_errors(sketch, values).max() <= sketch.rank_error()
+
+
+def test_round_trip():
+    sketch = KLLSketch(50).update(np.arange(1000.0))
+    copy = KLLSketch.from_dict(sketch.to_dict())
+    np.testing.assert_array_equal(copy.quantiles(qs), sketch.quantiles(qs))
+
+
+def test_groups_and_box_stats():
+    rng = np.random.default_rng(2)
+    frame = pd.DataFrame({'Churn': rng.choice(['Yes', 'No'], 4000), 'Contract': rng.choice(['Month', 'Year'], 4000),
+                          'Tenure': rng.exponential(20, 4000)})
+    total = {}
+    for chunk in np.array_split(frame, 4):
+        merge_sketches(total, sketch_groups(chunk, 'Tenure', ['Churn', 'Contract']))
+    assert sorted(total) == [('No', 'Month'), ('No', 'Year'), ('Yes', 'Month'), ('Yes', 'Year')]
+    stats = box_stats_frame(total, 'Contract')
+    counts = frame.groupby(['Churn', 'Contract']).size()
+    for row in stats.to_dict('records'):
+        values = frame.loc[(frame['Churn'] == row['Churn']) & (frame['Contract'] == row['Contract']), 'Tenure']
+        assert row['Count'] == counts[(row['Churn'], row['Contract'])]
+        for q, x in zip([0.25, 0.5, 0.75], ['Q1', 'Median', 'Q3']):
+            assert abs((values <= row[x]).mean() - q) <= row['Rank Error'] + 1 / len(values)
+        # the fences are data points within 1.5 IQR of the quartiles
+        iqr = row['Q3'] - row['Q1']
+        assert row['Lower Fence'] in values.values and row['Lower Fence'] >= row['Q1'] - 1.5 * iqr
+        assert row['Upper Fence'] in values.values and row['Upper Fence'] <= row['Q3'] + 1.5 * iqr
+
+
+def test_freedman_diaconis_width():
+    values = np.arange(1000.0)
+    sketch = KLLSketch(2000).update(values)
+    q1, q3 = np.quantile(values, [0.25, 0.75])
+    assert freedman_diaconis_width(sketch) == pytest.approx(2 * (q3 - q1) / 1000 ** (1 / 3))
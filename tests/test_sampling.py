@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from sampling import SampleSource, StratifiedReservoir, key_column
+
+data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Telco-Customer-Churn.csv')
+columns = ['Contract', 'PaymentMethod', 'InternetService', 'gender', 'PaperlessBilling', 'TechSupport']
+size = 500
+
+
+@pytest.fixture(scope='module')
+def telco():
+    return pd.read_csv(data_path)
+
+
+def sample(frame, seed=0, chunks=7):
+    reservoir = StratifiedReservoir('Churn', size, seed=seed)
+    for chunk in np.array_split(frame, chunks):
+        reservoir.update(chunk)
+    return reservoir
+
+
+def test_strata_are_capped(telco):
+    reservoir = sample(telco)
+    assert reservoir.counts == telco['Churn'].value_counts().to_dict()
+    assert {x: len(y) for x, y in reservoir.samples.items()} == {'No': size, 'Yes': size}
+    # a stratum smaller than the reservoir is kept whole
+    small = sample(telco.iloc[:300])
+    assert {x: len(y) for x, y in small.samples.items()} == small.counts
+    assert len(small.frame()) == 300 and key_column not in small.frame().columns
+
+
+def test_merge_keeps_the_totals(telco):
+    first, second = telco.iloc[:3000], telco.iloc[3000:]
+    merged = sample(first, seed=1).merge(sample(second, seed=2))
+    assert merged.counts == telco['Churn'].value_counts().to_dict()
+    assert {x: len(y) for x, y in merged.samples.items()} == {'No': size, 'Yes': size}
+    # the merged sample keeps the smallest keys of both samples
+    for stratum, rows in merged.samples.items():
+        keys = pd.concat([sample(first, seed=1).samples[stratum], sample(second, seed=2).samples[stratum]])
+        assert sorted(rows[key_column]) == sorted(keys[key_column].nsmallest(size))
+    assert merged.frame()['customerID'].is_unique
+
+
+def test_churn_counts_are_exact(telco):
+    source = SampleSource(sample(telco))
+    counts = source.churn_counts().set_index('Churn')['Count']
+    assert counts.to_dict() == telco['Churn'].value_counts().to_dict()
+
+
+def test_intervals_contain_the_full_data(telco):
+    # 95% intervals: the proportions of the full data are in the intervals of most categories over a few samples
+    covered, total = 0, 0
+    for seed in range(10):
+        source = SampleSource(sample(telco, seed=seed))
+        for column in columns:
+            counts = source.category_counts(column)
+            exact = telco.groupby(['Churn', column]).size()
+            population = counts['Churn'].map(source.population)
+            assert sorted(zip(counts['Churn'], counts[column])) == sorted(exact.index)
+            assert (counts['Lower'] <= counts['Count']).all() and (counts['Count'] <= counts['Upper']).all()
+            proportion = pd.Series([exact[x] for x in zip(counts['Churn'], counts[column])]) / population
+            covered += ((counts['Lower'] / population <= proportion) &
+                        (proportion <= counts['Upper'] / population)).sum()
+            total += len(counts)
+    assert covered / total >= 0.9
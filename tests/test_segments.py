@@ -0,0 +1,84 @@
+import itertools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_source import PandasSource
+from segments import SegmentMiner, segment_categories
+
+data_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'Telco-Customer-Churn.csv')
+columns = ['Contract', 'InternetService', 'PaymentMethod', 'gender', 'SeniorCitizen']
+min_support = 150
+
+
+@pytest.fixture(scope='module')
+def telco():
+    frame = pd.read_csv(data_path)
+    frame['SeniorCitizen'] = frame['SeniorCitizen'].map({0: 'No', 1: 'Yes'})
+    # a few missing values, which are in no segment
+    frame.loc[::97, 'PaymentMethod'] = None
+    return frame
+
+
+def mine(frame, productive):
+    miner = SegmentMiner(segment_categories(PandasSource(frame), columns), min_support, max_order=3)
+    for chunk in np.array_split(frame, 5):
+        miner.update(chunk)
+    return miner.mine().segments(productive=productive)
+
+
+def expected_segments(frame):
+    rows = []
+    for order in range(1, 4):
+        for combination in itertools.combinations(columns, order):
+            groups = frame.groupby(list(combination))['Churn'].agg(
+                Customers='size', Churned=lambda x: int((x == 'Yes').sum()))
+            for values, row in groups.loc[groups['Customers'] >= min_support].iterrows():
+                rows.append((combination, values if isinstance(values, tuple) else (values,), row['Customers'],
+                             row['Churned']))
+    return pd.DataFrame(rows, columns=['Variables', 'Values', 'Customers', 'Churned'])
+
+
+def test_counts_match_a_groupby(telco):
+    segments = mine(telco, productive=False)
+    expected = expected_segments(telco)
+    key = ['Variables', 'Values']
+    merged = segments.merge(expected, on=key, how='outer', suffixes=('', ' Expected'), indicator=True)
+    assert (merged['_merge'] == 'both').all()
+    assert (merged['Customers'] == merged['Customers Expected']).all()
+    assert (merged['Churned'] == merged['Churned Expected']).all()
+    assert (segments['Customers'] >= min_support).all()
+    assert segments['Order'].max() == 3
+
+
+def test_rates_and_order(telco):
+    segments = mine(telco, productive=False)
+    overall = (telco['Churn'] == 'Yes').mean() * 100
+    np.testing.assert_allclose(segments['Churn Rate'], segments['Churned'] / segments['Customers'] * 100)
+    np.testing.assert_allclose(segments['Support'], segments['Customers'] / len(telco) * 100)
+    np.testing.assert_allclose(segments['Lift'], segments['Churn Rate'] / overall)
+    assert segments['Churn Rate'].is_monotonic_decreasing
+    assert segments['Order'].tolist() == segments['Variables'].map(len).tolist()
+
+
+def test_productive_segments(telco):
+    every = mine(telco, productive=False)
+    rates = dict(zip(zip(every['Variables'], every['Values']), every['Churn Rate']))
+    segments = mine(telco, productive=True)
+    assert 0 < len(segments) < len(every)
+    # the segments of one variable are all kept, a larger segment only when each of its values raises the rate
+    assert (segments['Order'] == 1).sum() == (every['Order'] == 1).sum()
+    larger = segments.loc[segments['Order'] > 1]
+    for variables, values, rate in zip(larger['Variables'], larger['Values'], larger['Churn Rate']):
+        for i in range(len(variables)):
+            parent = variables[:i] + variables[i + 1:], values[:i] + values[i + 1:]
+            assert rate > rates[parent]
+
+
+def test_no_frequent_segment(telco):
+    miner = SegmentMiner(segment_categories(PandasSource(telco), columns), len(telco) + 1)
+    segments = miner.update(telco).mine().segments()
+    assert segments.empty
+    assert 'Segment' in segments.columns
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_source import id_column
+from snapshot_diff import SnapshotDiff
+
+
+def snapshot(rows):
+    return pd.DataFrame(rows, columns=[id_column, 'Contract', 'Churn'])
+
+
+@pytest.fixture
+def diff():
+    base = snapshot([
+        ['a', 'Month', 'No'],
+        ['b', 'Month', 'Yes'],
+        ['c', 'Year', 'No'],
+        ['d', 'Year', 'No'],
+        # the last row of a customer wins
+        ['c', 'Month', 'Yes'],
+    ])
+    current = snapshot([
+        ['a', 'Month', 'Yes'],
+        ['b', 'Month', 'No'],
+        ['c', 'Month', 'Yes'],
+        ['e', 'Two year', 'Yes'],
+    ])
+    return SnapshotDiff(base, current)
+
+
+def test_summary(diff):
+    assert diff.summary == dict(
+        base_customers=4, current_customers=4, matched_customers=3, new_customers=1, lost_customers=1,
+        newly_churned=1, returned=1, base_churn_rate=50.0, current_churn_rate=75.0
+    )
+
+
+def test_newly_churned_ids(diff):
+    # e is new and c was churned already
+    assert diff.newly_churned_ids() == ['a']
+    assert diff.newly_churned_ids(limit=0) == []
+
+
+def test_segment_deltas(diff):
+    deltas = diff.segment_deltas('Contract').set_index('Contract')
+    assert sorted(deltas.index) == ['Month', 'Two year', 'Year']
+    assert deltas.loc['Month', 'Base Customers'] == 3
+    assert deltas.loc['Month', 'Base Rate'] == pytest.approx(200 / 3)
+    assert deltas.loc['Month', 'Current Customers'] == 3
+    assert deltas.loc['Month', 'Newly Churned'] == 1
+    # a segment of one snapshot only has the customers of the other at 0 and no rate
+    assert deltas.loc['Two year', 'Base Customers'] == 0
+    assert np.isnan(deltas.loc['Two year', 'Delta'])
+    assert deltas.loc['Year', 'Current Customers'] == 0
+    assert deltas.loc['Year', 'Base Rate'] == 0.0
+    assert diff.segment_deltas('Contract') is diff.segment_deltas('Contract')
+
+
+def test_matches_a_merge():
+    rng = np.random.default_rng(0)
+    base = snapshot({id_column: rng.permutation(1000)[:800].astype(str), 'Contract': rng.choice(['Month', 'Year'], 800),
+                     'Churn': rng.choice(['Yes', 'No'], 800)})
+    current = snapshot({id_column: rng.permutation(1000)[:900].astype(str),
+                        'Contract': rng.choice(['Month', 'Year'], 900), 'Churn': rng.choice(['Yes', 'No'], 900)})
+    diff = SnapshotDiff(base, current)
+    merged = current.merge(base, on=id_column, how='left', suffixes=('', ' Base'), indicator=True)
+    matched = merged['_merge'] == 'both'
+    newly_churned = matched & (merged['Churn'] == 'Yes') & (merged['Churn Base'] == 'No')
+    assert diff.summary['matched_customers'] == matched.sum()
+    assert diff.summary['lost_customers'] == len(base) - matched.sum()
+    assert diff.newly_churned_ids() == merged.loc[newly_churned, id_column].tolist()
+    assert diff.summary['returned'] == (matched & (merged['Churn'] == 'No') & (merged['Churn Base'] == 'Yes')).sum()
@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from survival import kaplan_meier, survival_curves, z_score
+
+# 10 customers: 3 leave at month 1 (1 churned), 2 at month 2 (both churned, a tie), 3 at month 4 (1 churned) and 2
+# are still customers at month 5, the last month, i.e. censored
+times = [4, 1, 5, 2]
+events = [1, 1, 0, 2]
+counts = [3, 3, 2, 2]
+
+
+def test_hand_computed_curve():
+    curve = kaplan_meier(times, events, counts)
+    assert curve['Tenure'].tolist() == [1, 2, 4, 5]
+    assert curve['At Risk'].tolist() == [10, 7, 5, 2]
+    assert curve['Events'].tolist() == [1, 2, 1, 0]
+    expected = [9 / 10, 9 / 10 * 5 / 7, 9 / 10 * 5 / 7 * 4 / 5, 9 / 10 * 5 / 7 * 4 / 5]
+    np.testing.assert_allclose(curve['Survival'], expected)
+
+
+def test_greenwood_log_log_band():
+    curve = kaplan_meier(times, events, counts)
+    greenwood = np.cumsum([1 / (10 * 9), 2 / (7 * 5), 1 / (5 * 4), 0])
+    survival = curve['Survival'].values
+    se = np.sqrt(greenwood) / np.abs(np.log(survival))
+    np.testing.assert_allclose(curve['Lower'], survival ** np.exp(z_score * se))
+    np.testing.assert_allclose(curve['Upper'], survival ** np.exp(-z_score * se))
+    assert ((0 < curve['Lower']) & (curve['Lower'] <= curve['Survival'])).all()
+    assert ((curve['Survival'] <= curve['Upper']) & (curve['Upper'] <= 1)).all()
+    # the censored customers of the last month change neither the curve nor its band
+    assert curve['Lower'].iloc[-1] == curve['Lower'].iloc[-2]
+    assert curve['Upper'].iloc[-1] == curve['Upper'].iloc[-2]
+
+
+def test_band_without_variance():
+    # every customer churns at the last month, the survival drops to 0 and the band to the curve
+    curve = kaplan_meier([1, 2], [0, 3], [2, 3])
+    assert curve['Survival'].tolist() == [1.0, 0.0]
+    assert curve['Lower'].tolist() == curve['Survival'].tolist()
+    assert curve['Upper'].tolist() == curve['Survival'].tolist()
+
+
+def test_matches_the_customers():
+    # the aggregated counts give the curve of the individual customers
+    rng = np.random.default_rng(0)
+    tenure = rng.integers(1, 24, 500)
+    churned = rng.random(500) < 0.3
+    grouped = pd.DataFrame({'Tenure': tenure, 'Events': churned}).groupby('Tenure').agg(
+        Events=('Events', 'sum'), Count=('Events', 'size')).reset_index()
+    curve = kaplan_meier(grouped['Tenure'].values, grouped['Events'].values, grouped['Count'].values)
+    survival = 1.0
+    for t, value in zip(curve['Tenure'], curve['Survival']):
+        survival *= 1 - (churned & (tenure == t)).sum() / (tenure >= t).sum()
+        assert value == pytest.approx(survival)
+
+
+def test_survival_curves_per_segment():
+    frame = pd.DataFrame({'Contract': ['Month'] * 4 + ['Year'] * 2, 'Tenure': times + [3, 6],
+                          'Events': events + [1, 0], 'Count': counts + [4, 4]})
+    curves = survival_curves(frame, 'Contract')
+    assert curves['Contract'].tolist() == ['Month'] * 4 + ['Year'] * 2
+    np.testing.assert_allclose(curves.loc[curves['Contract'] == 'Month', 'Survival'],
+                               kaplan_meier(times, events, counts)['Survival'])
+    np.testing.assert_allclose(curves.loc[curves['Contract'] == 'Year', 'Survival'], [7 / 8, 7 / 8])